@@ -1,4 +1,5 @@
 from database import get_database
+from cache import async_cached
 from typing import List, Dict, Optional
 from datetime import datetime
 import phonenumbers
@@ -6,7 +7,51 @@ import pycountry
 from collections import defaultdict
 import httpx
 import os
-
+import re
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# First run of digits in a non-numeric cell tower id
+_CELL_ID_DIGITS = re.compile(r'\d+')
+
+# Pure-Python classification over fetched records runs in worker processes so it
+# neither blocks the event loop nor serializes concurrent analyses on one core.
+# Every call pickles its records to a worker, so the pool stays small
+COMPUTE_WORKERS = min(int(os.getenv("COMPUTE_WORKERS", "4")), os.cpu_count() or 1)
+_compute_pool: Optional[ProcessPoolExecutor] = None
+
+# Below this many records, pickling them to a worker costs more than the work itself
+COMPUTE_INLINE_MAX_RECORDS = 5000
+
+
+def _get_compute_pool() -> ProcessPoolExecutor:
+    """Create the worker pool on first use (spawned, so no event loop state is forked)"""
+    global _compute_pool
+    if _compute_pool is None:
+        _compute_pool = ProcessPoolExecutor(
+            max_workers=COMPUTE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _compute_pool
+
+
+async def _run_compute(func, records: List[Dict]):
+    """Run a CPU-bound helper over records, in the worker pool unless the batch is small"""
+    if len(records) <= COMPUTE_INLINE_MAX_RECORDS:
+        return func(records)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_compute_pool(), func, records)
+
+
+def shutdown_compute_pool():
+    """Stop the worker pool - called on application shutdown"""
+    global _compute_pool
+    if _compute_pool is not None:
+        _compute_pool.shutdown(wait=False, cancel_futures=True)
+        _compute_pool = None
+
+@async_cached
 async def analyze_imei(suspect_name: str) -> Dict:
     """Analyze IMEI usage for a suspect"""
     db = await get_database()
@@ -130,10 +175,9 @@ async def decode_cell_id(cell_tower_id: str, mcc: Optional[int] = None, mnc: Opt
                 cell_id_int = int(cell_id_str)
             else:
                 # Try to extract numbers from string
-                import re
-                numbers = re.findall(r'\d+', cell_id_str)
-                if numbers:
-                    cell_id_int = int(numbers[0])
+                match = _CELL_ID_DIGITS.search(cell_id_str)
+                if match:
+                    cell_id_int = int(match.group(0))
 
             if cell_id_int:
                 # Import here to avoid circular imports
@@ -146,6 +190,7 @@ async def decode_cell_id(cell_tower_id: str, mcc: Optional[int] = None, mnc: Opt
     # For now, return None - will use existing lat/lon from records
     return None
 
+@async_cached
 async def analyze_cell_towers(suspect_name: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Dict:
     """Analyze cell tower usage for a suspect with optional date filters"""
     db = await get_database()
@@ -227,6 +272,7 @@ async def analyze_cell_towers(suspect_name: str, start_date: Optional[datetime]
         }
     }
 
+@async_cached
 async def analyze_contacts(suspect_name: str) -> Dict:
     """Analyze contact patterns for a suspect"""
     db = await get_database()
@@ -383,27 +429,11 @@ async def analyze_contacts(suspect_name: str) -> Dict:
         "longest_calls": longest_calls_serialized
     }
 
+@async_cached
 async def analyze_sms_services(suspect_name: str) -> Dict:
     """Detect services from SMS patterns"""
     db = await get_database()
 
-    # SMS service patterns
-    service_patterns = {
-        "WhatsApp": ["whatsapp", "wa.me", "whatsapp.com"],
-        "Uber": ["uber", "uber.com"],
-        "Swiggy": ["swiggy", "swiggy.com"],
-        "Zomato": ["zomato", "zomato.com"],
-        "Paytm": ["paytm", "paytm.com"],
-        "Bank": ["bank", "otp", "pin", "verification", "transaction"],
-        "PayPal": ["paypal"],
-        "Amazon": ["amazon", "aws"],
-        "Google": ["google", "gmail", "goog"],
-        "Facebook": ["facebook", "fb.com", "messenger"],
-        "Telegram": ["telegram"],
-        "Instagram": ["instagram", "ig"],
-        "Twitter": ["twitter", "x.com"]
-    }
-
     pipeline = [
         {"$match": {
             "suspect_name": suspect_name,
@@ -413,7 +443,9 @@ async def analyze_sms_services(suspect_name: str) -> Dict:
                 {"called_number": {"$exists": True, "$ne": None}}
             ]
         }},
+        # Only the fields the classifier reads are shipped to the worker
         {"$project": {
+            "_id": 0,
             "sms_content": 1,
             "called_number": 1,
             "call_start_time": 1
@@ -422,6 +454,36 @@ async def analyze_sms_services(suspect_name: str) -> Dict:
 
     sms_records = await db.cdr_records.aggregate(pipeline).to_list(length=None)
 
+    return {
+        "suspect_name": suspect_name,
+        "services_detected": await _run_compute(_detect_sms_services, sms_records)
+    }
+
+# SMS service patterns
+SMS_SERVICE_PATTERNS = {
+    "WhatsApp": ["whatsapp", "wa.me", "whatsapp.com"],
+    "Uber": ["uber", "uber.com"],
+    "Swiggy": ["swiggy", "swiggy.com"],
+    "Zomato": ["zomato", "zomato.com"],
+    "Paytm": ["paytm", "paytm.com"],
+    "Bank": ["bank", "otp", "pin", "verification", "transaction"],
+    "PayPal": ["paypal"],
+    "Amazon": ["amazon", "aws"],
+    "Google": ["google", "gmail", "goog"],
+    "Facebook": ["facebook", "fb.com", "messenger"],
+    "Telegram": ["telegram"],
+    "Instagram": ["instagram", "ig"],
+    "Twitter": ["twitter", "x.com"]
+}
+
+# One compiled alternation per service, checked in the same order as the patterns
+_SMS_SERVICE_REGEXES = [
+    (service, re.compile("|".join(re.escape(pattern) for pattern in patterns)))
+    for service, patterns in SMS_SERVICE_PATTERNS.items()
+]
+
+def _detect_sms_services(sms_records: List[Dict]) -> Dict:
+    """Classify SMS records by service (runs in a worker process)"""
     service_detections = defaultdict(list)
 
     for record in sms_records:
@@ -429,8 +491,8 @@ async def analyze_sms_services(suspect_name: str) -> Dict:
         number = str(record.get("called_number", "")).lower()
         combined = f"{content} {number}"
 
-        for service, patterns in service_patterns.items():
-            if any(pattern in combined for pattern in patterns):
+        for service, pattern in _SMS_SERVICE_REGEXES:
+            if pattern.search(combined):
                 service_detections[service].append({
                     "timestamp": record.get("call_start_time"),
                     "called_number": record.get("called_number"),
@@ -439,23 +501,23 @@ async def analyze_sms_services(suspect_name: str) -> Dict:
                 break
 
     return {
-        "suspect_name": suspect_name,
-        "services_detected": {
-            service: {
-                "count": len(detections),
-                "detections": detections
-            }
-            for service, detections in service_detections.items()
+        service: {
+            "count": len(detections),
+            "detections": detections
         }
+        for service, detections in service_detections.items()
     }
 
+@async_cached
 async def analyze_international_calls(suspect_name: str) -> Dict:
     """Analyze international calls by country"""
     db = await get_database()
 
     pipeline = [
         {"$match": {"suspect_name": suspect_name}},
+        # Only the fields the summary reads are shipped to the worker
         {"$project": {
+            "_id": 0,
             "called_number": 1,
             "calling_number": 1,
             "call_start_time": 1,
@@ -467,8 +529,32 @@ async def analyze_international_calls(suspect_name: str) -> Dict:
 
     records = await db.cdr_records.aggregate(pipeline).to_list(length=None)
 
+    return {
+        "suspect_name": suspect_name,
+        "countries": await _run_compute(_summarize_countries, records)
+    }
+
+def _country_for_number(number: str) -> Optional[str]:
+    """Country name for an international-format number, or None if it has no region"""
+    try:
+        # Parse phone number
+        parsed = phonenumbers.parse(number, None)
+        country_code = phonenumbers.region_code_for_number(parsed)
+    except Exception:
+        return None
+
+    if not country_code:
+        return None
+    country_name = pycountry.countries.get(alpha_2=country_code)
+    return country_name.name if country_name else country_code
+
+def _summarize_countries(records: List[Dict]) -> Dict:
+    """Group calls by the country of the other party's number (runs in a worker process)"""
     country_stats = defaultdict(lambda: {"count": 0, "total_duration": 0, "calls": []})
 
+    # Each distinct number is parsed once; None marks numbers without a resolvable country
+    country_by_number = {}
+
     for record in records:
         number = record.get("called_number") if record.get("direction") == "outgoing" else record.get("calling_number")
 
@@ -476,14 +562,12 @@ async def analyze_international_calls(suspect_name: str) -> Dict:
             continue
 
         try:
-            # Parse phone number
-            parsed = phonenumbers.parse(number, None)
-            country_code = phonenumbers.region_code_for_number(parsed)
-
-            if country_code:
-                country_name = pycountry.countries.get(alpha_2=country_code)
-                country = country_name.name if country_name else country_code
+            if number in country_by_number:
+                country = country_by_number[number]
+            else:
+                country = country_by_number[number] = _country_for_number(number)
 
+            if country:
                 country_stats[country]["count"] += 1
                 country_stats[country]["total_duration"] += record.get("duration_seconds", 0)
                 country_stats[country]["calls"].append({
@@ -496,17 +580,15 @@ async def analyze_international_calls(suspect_name: str) -> Dict:
             continue
 
     return {
-        "suspect_name": suspect_name,
-        "countries": {
-            country: {
-                "call_count": stats["count"],
-                "total_duration_seconds": stats["total_duration"],
-                "calls": stats["calls"][:10]  # Limit to 10 calls per country
-            }
-            for country, stats in sorted(country_stats.items(), key=lambda x: x[1]["count"], reverse=True)
+        country: {
+            "call_count": stats["count"],
+            "total_duration_seconds": stats["total_duration"],
+            "calls": stats["calls"][:10]  # Limit to 10 calls per country
         }
+        for country, stats in sorted(country_stats.items(), key=lambda x: x[1]["count"], reverse=True)
     }
 
+@async_cached
 async def find_common_numbers(suspect_names: List[str]) -> Dict:
     """Find common numbers between multiple suspects (network graph) with detailed metrics"""
     db = await get_database()
@@ -618,6 +700,7 @@ async def find_common_numbers(suspect_names: List[str]) -> Dict:
         ]
     }
 
+@async_cached
 async def find_common_towers(suspect_names: List[str]) -> Dict:
     """Find common cell towers between multiple suspects with color coding"""
     db = await get_database()
@@ -717,6 +800,7 @@ async def find_common_towers(suspect_names: List[str]) -> Dict:
         "all_towers": all_towers  # For map visualization with colors
     }
 
+@async_cached
 async def find_common_imei(suspect_names: List[str]) -> Dict:
     """Find common IMEI devices between multiple suspects"""
     db = await get_database()
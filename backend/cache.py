@@ -0,0 +1,59 @@
+"""
+In-process response cache for analytics generators
+Entries expire after a TTL and are dropped wholesale whenever new CDR records are ingested.
+Meant for aggregated views: functions returning whole-session record lists are not cached.
+"""
+
+from collections import OrderedDict
+from copy import deepcopy
+from functools import wraps
+from typing import Any, Tuple
+import inspect
+import time
+
+ANALYTICS_CACHE_SIZE = 512
+ANALYTICS_CACHE_TTL_SECONDS = 300
+
+# key -> (expires_at, value); ordered oldest-used first for LRU eviction.
+# Only touched between awaits on the event loop, so no lock is needed.
+_entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+
+
+def _freeze(value: Any) -> Any:
+    """Turn dict/list arguments (e.g. a match query) into a hashable key part"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def async_cached(func):
+    """Memoize an async analytics generator on its arguments"""
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        # Bind to the signature so positional and keyword calls share one entry
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__qualname__, _freeze(bound.arguments))
+        entry = _entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            _entries.move_to_end(key)
+            # Callers get their own copy so mutating a response never alters the cache
+            return deepcopy(entry[1])
+
+        value = await func(*args, **kwargs)
+        _entries[key] = (time.monotonic() + ANALYTICS_CACHE_TTL_SECONDS, deepcopy(value))
+        _entries.move_to_end(key)
+        while len(_entries) > ANALYTICS_CACHE_SIZE:
+            _entries.popitem(last=False)
+        return value
+
+    return wrapper
+
+
+def invalidate_analytics_cache():
+    """Drop every cached response - called after records are ingested"""
+    _entries.clear()
@@ -3,29 +3,30 @@ Comprehensive CDR Analytics Module
 Generates all 10 analytical views as specified in the requirements
 """
 
-from database import get_database
+from database import get_database, get_latest_session_id
+from cache import async_cached
 from typing import Dict, List, Optional
 from datetime import datetime, date
 from collections import defaultdict
+import asyncio
 import re
 
 async def _build_match_query(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
     """Helper to build match query - prefer session_id, fallback to suspect_name"""
     match_query = {}
-    latest = None
     if session_id:
         match_query["session_id"] = session_id
     elif suspect_name:
         match_query["suspect_name"] = suspect_name
     else:
         # Get most recent session
-        db = await get_database()
-        latest = await db.cdr_records.find_one(sort=[("call_start_time", -1)])
-        if latest and latest.get("session_id"):
-            match_query["session_id"] = latest["session_id"]
+        latest_session_id = await get_latest_session_id()
+        if latest_session_id:
+            match_query["session_id"] = latest_session_id
     return match_query
 
 
+@async_cached
 async def generate_summary(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
     """
     1. SUMMARY - Compute total calls, incoming vs outgoing, unique B-numbers,
@@ -107,6 +108,7 @@ async def generate_summary(session_id: Optional[str] = None, suspect_name: Optio
     }
 
 
+# Not cached: returns every valid record of the session
 async def generate_corrected(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> List[Dict]:
     """
     2. CORRECTED - Cleaned and validated dataset with only valid MSISDN rows
@@ -173,6 +175,7 @@ async def generate_corrected(session_id: Optional[str] = None, suspect_name: Opt
     return corrected
 
 
+@async_cached
 async def generate_max_call(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
     """
     3. MAX CALL - Identify B-number contacted most frequently
@@ -216,6 +219,7 @@ async def generate_max_call(session_id: Optional[str] = None, suspect_name: Opti
     }
 
 
+@async_cached
 async def generate_max_circle_call(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
     """
     4. MAX CIRCLE CALL - Identify telecom circle/state with highest activity
@@ -258,6 +262,7 @@ async def generate_max_circle_call(session_id: Optional[str] = None, suspect_nam
     }
 
 
+@async_cached
 async def generate_daily_first_last(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> List[Dict]:
     """
     5. DAILY FIRST & LAST CALL - For each date:
@@ -270,21 +275,18 @@ async def generate_daily_first_last(session_id: Optional[str] = None, suspect_na
     if not match_query:
         return []
 
+    # Sorting before the group lets $first/$last pick each day's first and
+    # last call server-side instead of shipping every call to Python
+    b_number = {"$ifNull": ["$msisdn_b", "$called_number"]}
     pipeline = [
         {"$match": match_query},
+        {"$sort": {"call_start_time": 1}},
         {"$group": {
-            "_id": {
-                "$dateToString": {
-                    "format": "%Y-%m-%d",
-                    "date": "$call_start_time"
-                }
-            },
-            "first_call": {"$min": "$call_start_time"},
-            "last_call": {"$max": "$call_start_time"},
-            "calls": {"$push": {
-                "time": "$call_start_time",
-                "b_number": {"$ifNull": ["$msisdn_b", "$called_number"]}
-            }}
+            "_id": "$date_str",
+            "first_time": {"$first": "$call_start_time"},
+            "first_b_number": {"$first": b_number},
+            "last_time": {"$last": "$call_start_time"},
+            "last_b_number": {"$last": b_number}
         }},
         {"$sort": {"_id": 1}}
     ]
@@ -293,31 +295,21 @@ async def generate_daily_first_last(session_id: Optional[str] = None, suspect_na
 
     daily_data = []
     for item in result:
-        date_str = item["_id"]
-        calls = item.get("calls", [])
-
-        if not calls:
-            continue
-
-        # Find first call
-        first_call = min(calls, key=lambda x: x["time"] if x["time"] else datetime.max)
-        # Find last call
-        last_call = max(calls, key=lambda x: x["time"] if x["time"] else datetime.min)
-
-        first_time = first_call["time"]
-        last_time = last_call["time"]
+        first_time = item.get("first_time")
+        last_time = item.get("last_time")
 
         daily_data.append({
-            "date": date_str,
+            "date": item["_id"],
             "first_call_time": first_time.isoformat() if isinstance(first_time, datetime) else (str(first_time) if first_time else ""),
-            "first_call_b_number": first_call.get("b_number") or "",
+            "first_call_b_number": item.get("first_b_number") or "",
             "last_call_time": last_time.isoformat() if isinstance(last_time, datetime) else (str(last_time) if last_time else ""),
-            "last_call_b_number": last_call.get("b_number") or ""
+            "last_call_b_number": item.get("last_b_number") or ""
         })
 
     return daily_data
 
 
+@async_cached
 async def generate_max_duration(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
     """
     6. MAX DURATION - Single longest call
@@ -349,12 +341,7 @@ async def generate_max_duration(session_id: Optional[str] = None, suspect_name:
             "duration": {
                 "$ifNull": ["$call_duration_sec", "$duration_seconds"]
             },
-            "date": {
-                "$dateToString": {
-                    "format": "%Y-%m-%d",
-                    "date": "$call_start_time"
-                }
-            },
+            "date": "$date_str",
             "call_start_time": 1,
             "cell_id": {"$ifNull": ["$cell_id", "$cell_tower_id"]},
             "location_description": 1
@@ -386,6 +373,7 @@ async def generate_max_duration(session_id: Optional[str] = None, suspect_name:
     }
 
 
+@async_cached
 async def generate_max_imei(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
     """
     7. MAX IMEI - IMEI with highest call volume
@@ -446,6 +434,7 @@ async def generate_max_imei(session_id: Optional[str] = None, suspect_name: Opti
     }
 
 
+@async_cached
 async def generate_daily_imei_tracking(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> List[Dict]:
     """
     8. DAILY IMEI TRACKING - For each date:
@@ -465,12 +454,7 @@ async def generate_daily_imei_tracking(session_id: Optional[str] = None, suspect
         }},
         {"$group": {
             "_id": {
-                "date": {
-                    "$dateToString": {
-                        "format": "%Y-%m-%d",
-                        "date": "$call_start_time"
-                    }
-                },
+                "date": "$date_str",
                 "imei": "$imei"
             },
             "call_count": {"$sum": 1}
@@ -497,6 +481,7 @@ async def generate_daily_imei_tracking(session_id: Optional[str] = None, suspect
     return daily_imei_data
 
 
+@async_cached
 async def generate_max_location(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
     """
     9. MAX LOCATION - Most frequently used Cell ID / location
@@ -539,6 +524,7 @@ async def generate_max_location(session_id: Optional[str] = None, suspect_name:
     }
 
 
+@async_cached
 async def generate_daily_first_last_location(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> List[Dict]:
     """
     10. DAILY FIRST & LAST LOCATION - For each date:
@@ -552,6 +538,12 @@ async def generate_daily_first_last_location(session_id: Optional[str] = None, s
     if not match_query:
         return []
 
+    # First/last location per day are picked server-side after sorting by time
+    location = {
+        "time": "$call_start_time",
+        "cell_id": {"$ifNull": ["$cell_id", "$cell_tower_id"]},
+        "location_description": "$location_description"
+    }
     pipeline = [
         {"$match": {
             **match_query,
@@ -560,18 +552,11 @@ async def generate_daily_first_last_location(session_id: Optional[str] = None, s
                 {"cell_tower_id": {"$exists": True, "$ne": None, "$ne": ""}}
             ]
         }},
+        {"$sort": {"call_start_time": 1}},
         {"$group": {
-            "_id": {
-                "$dateToString": {
-                    "format": "%Y-%m-%d",
-                    "date": "$call_start_time"
-                }
-            },
-            "locations": {"$push": {
-                "time": "$call_start_time",
-                "cell_id": {"$ifNull": ["$cell_id", "$cell_tower_id"]},
-                "location_description": "$location_description"
-            }}
+            "_id": "$date_str",
+            "first_location": {"$first": location},
+            "last_location": {"$last": location}
         }},
         {"$sort": {"_id": 1}}
     ]
@@ -580,22 +565,14 @@ async def generate_daily_first_last_location(session_id: Optional[str] = None, s
 
     daily_location_data = []
     for item in result:
-        date_str = item["_id"]
-        locations = item.get("locations", [])
-
-        if not locations:
-            continue
-
-        # Find first location
-        first_location = min(locations, key=lambda x: x["time"] if x["time"] else datetime.max)
-        # Find last location
-        last_location = max(locations, key=lambda x: x["time"] if x["time"] else datetime.min)
+        first_location = item.get("first_location") or {}
+        last_location = item.get("last_location") or {}
 
-        first_time = first_location["time"]
-        last_time = last_location["time"]
+        first_time = first_location.get("time")
+        last_time = last_location.get("time")
 
         daily_location_data.append({
-            "date": date_str,
+            "date": item["_id"],
             "first_location": {
                 "cell_id": first_location.get("cell_id") or "",
                 "time": first_time.isoformat() if isinstance(first_time, datetime) else (str(first_time) if first_time else ""),
@@ -611,20 +588,40 @@ async def generate_daily_first_last_location(session_id: Optional[str] = None, s
     return daily_location_data
 
 
+# View name -> generator, in the order views are presented and exported
+ANALYTICS_VIEWS = {
+    "Summary": generate_summary,
+    "Corrected": generate_corrected,
+    "MaxCall": generate_max_call,
+    "MaxCircleCall": generate_max_circle_call,
+    "DailyFirstLast": generate_daily_first_last,
+    "MaxDuration": generate_max_duration,
+    "MaxIMEI": generate_max_imei,
+    "DailyIMEIATracking": generate_daily_imei_tracking,
+    "MaxLocation": generate_max_location,
+    "DailyFirstLastLocation": generate_daily_first_last_location
+}
+
+
+# Not cached itself: it carries the Corrected record list; the other views hit their own cache
 async def generate_all_analytics(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
     """
     Generate all 10 analytical views at once
     Returns structured data for JSON and Excel export
     """
-    return {
-        "Summary": await generate_summary(session_id, suspect_name),
-        "Corrected": await generate_corrected(session_id, suspect_name),
-        "MaxCall": await generate_max_call(session_id, suspect_name),
-        "MaxCircleCall": await generate_max_circle_call(session_id, suspect_name),
-        "DailyFirstLast": await generate_daily_first_last(session_id, suspect_name),
-        "MaxDuration": await generate_max_duration(session_id, suspect_name),
-        "MaxIMEI": await generate_max_imei(session_id, suspect_name),
-        "DailyIMEIATracking": await generate_daily_imei_tracking(session_id, suspect_name),
-        "MaxLocation": await generate_max_location(session_id, suspect_name),
-        "DailyFirstLastLocation": await generate_daily_first_last_location(session_id, suspect_name)
-    }
+    # Resolve the latest session once instead of once per view
+    if not session_id and not suspect_name:
+        session_id = (await _build_match_query()).get("session_id")
+
+    # The views share no state, so their aggregations can run concurrently
+    results = await asyncio.gather(
+        *(generate(session_id, suspect_name) for generate in ANALYTICS_VIEWS.values())
+    )
+    return dict(zip(ANALYTICS_VIEWS, results))
+
+
+async def warm_analytics_cache(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
+    """Compute the cached views for a session so the first tab requests are cache hits"""
+    await asyncio.gather(
+        *(generate(session_id, suspect_name) for generate in ANALYTICS_VIEWS.values() if generate is not generate_corrected)
+    )
@@ -1,17 +1,37 @@
 import pandas as pd
+import asyncio
 from datetime import datetime
 from typing import Dict, Optional
 import re
 import uuid
 import os
 import json
+import orjson
 from models import CDRRecord, VENDOR_FORMATS, CallType, CallDirection, CallStatus
-from database import get_database
+from database import get_database, invalidate_latest_session
+from cache import invalidate_analytics_cache
 from shapely.geometry import Point, Polygon
+from pydantic import TypeAdapter
+from pymongo import WriteConcern
+
+# Compiled once at import; validating through the adapter avoids rebuilding
+# the validator on every record in the ingest loops
+_CDR_RECORD_ADAPTER = TypeAdapter(CDRRecord)
+
+# Validated records are flushed to MongoDB in windows of this size so the
+# insert buffer stays bounded regardless of file size
+INSERT_BATCH_SIZE = 1000
+
+# Upper bound on documents per insert_many call
+INSERT_CHUNK_SIZE = 5000
+
+# insert_many calls kept in flight at once, so the next chunk is sent while
+# earlier ones are still being written
+INSERT_CONCURRENCY = 8
 
 async def check_geofence_breach(record, manager):
     db = await get_database()
-    geofences = await db.geofences.find({"suspect_name": record["suspect_name"]}).to_list(1000)
+    geofences = await db.geofences.find({"suspect_name": record.get("suspect_name")}).to_list(1000)
 
     if "location_lat" in record and "location_lon" in record:
         point = Point(record["location_lon"], record["location_lat"])
@@ -20,7 +40,7 @@ async def check_geofence_breach(record, manager):
             if polygon.contains(point):
                 alert_message = {
                     "type": "geofence_breach",
-                    "suspect_name": record["suspect_name"],
+                    "suspect_name": record.get("suspect_name"),
                     "geofence_name": geofence["name"],
                     "timestamp": record["call_start_time"].isoformat(),
                     "location": {
@@ -30,6 +50,40 @@ async def check_geofence_breach(record, manager):
                 }
                 await manager.broadcast(json.dumps(alert_message))
 
+async def update_session_stats(db, session_id: str, inserted: int):
+    """Accumulate the session's record count so readers can skip counting"""
+    await db.sessions.update_one(
+        {"session_id": session_id},
+        {"$inc": {"total_calls": inserted}, "$set": {"updated_at": datetime.now()}},
+        upsert=True
+    )
+    invalidate_latest_session()
+    invalidate_analytics_cache()
+
+async def insert_records(db, records, fast_insert: bool = False) -> int:
+    """
+    Insert records unordered in concurrent chunks and return how many were written.
+    fast_insert uses an unacknowledged (w=0) write concern: the server does not
+    confirm the writes, so the count is what was sent rather than what was stored.
+    It is for scripted bulk loads only - the upload API never sets it, and nothing
+    may warm the analytics cache right after such a write.
+    """
+    collection = db.cdr_records
+    if fast_insert:
+        collection = collection.with_options(write_concern=WriteConcern(w=0))
+
+    semaphore = asyncio.Semaphore(INSERT_CONCURRENCY)
+
+    async def insert_chunk(chunk) -> int:
+        async with semaphore:
+            result = await collection.insert_many(chunk, ordered=False)
+        return len(chunk) if fast_insert else len(result.inserted_ids)
+
+    chunks = [records[start:start + INSERT_CHUNK_SIZE] for start in range(0, len(records), INSERT_CHUNK_SIZE)]
+    if len(chunks) == 1:
+        return await insert_chunk(chunks[0])
+    return sum(await asyncio.gather(*(insert_chunk(chunk) for chunk in chunks)))
+
 async def detect_format(file_path: str) -> Optional[Dict]:
     """Auto-detect CDR file format and vendor"""
     try:
@@ -93,6 +147,20 @@ def clean_value(value):
             return None
     return value
 
+def _is_iso_layout(value: str) -> bool:
+    """Whether value has one of the zero-padded ISO layouts in parse_datetime's format list
+    (fromisoformat alone would also take compact/week dates, missing seconds and comma fractions)"""
+    if len(value) < 10 or value[4] != '-' or value[7] != '-':
+        return False
+    if len(value) == 10:
+        return True
+    if len(value) < 19 or value[13] != ':' or value[16] != ':':
+        return False
+    if len(value) == 19:
+        return value[10] in ' T'
+    # Fractions of 1-6 digits, space-separated only
+    return 21 <= len(value) <= 26 and value[10] == ' ' and value[19] == '.'
+
 def parse_datetime(value) -> Optional[datetime]:
     """Parse various datetime formats"""
     try:
@@ -124,6 +192,16 @@ def parse_datetime(value) -> Optional[datetime]:
         if (value.startswith("'") and value.endswith("'")) or (value.startswith('"') and value.endswith('"')):
             value = value[1:-1].strip()
 
+        # Fast path: the ISO layouts of the format list (the JSON export format) parse
+        # in C without trying each strptime format; timezone-aware results fall through
+        if _is_iso_layout(value):
+            try:
+                result = datetime.fromisoformat(value)
+                if result.tzinfo is None:
+                    return result
+            except ValueError:
+                pass
+
     for fmt in formats:
         try:
             if isinstance(value, str):
@@ -184,7 +262,8 @@ async def process_cdr_file(
     suspect_name: Optional[str] = None,
     format_info: Optional[Dict] = None,
     manager=None,
-    session_id: Optional[str] = None
+    session_id: Optional[str] = None,
+    fast_insert: bool = False
 ) -> Dict:
     """Process CDR file and insert into database"""
     try:
@@ -195,7 +274,7 @@ async def process_cdr_file(
 
         # Handle JSON files
         if file_path.endswith('.json'):
-            return await process_json_file(file_path, suspect_name, manager, session_id)
+            return await process_json_file(file_path, suspect_name, manager, session_id, fast_insert)
 
         # Read file with header detection
         if file_path.endswith('.csv'):
@@ -588,12 +667,12 @@ async def process_cdr_file(
                     else:
                         record_data["imsi"] = str(record_data["imsi"])
 
-                # Create CDR record
-                cdr_record = CDRRecord(**record_data)
-                records.append(cdr_record.dict())
+                # Validate and serialize once, reuse for insert and geofence check
+                record_dict = _CDR_RECORD_ADAPTER.validate_python(record_data).model_dump(exclude_none=True)
+                records.append(record_dict)
 
                 if manager:
-                    await check_geofence_breach(cdr_record.dict(), manager)
+                    await check_geofence_breach(record_dict, manager)
 
             except Exception as e:
                 validation_failures["other"] += 1
@@ -602,9 +681,10 @@ async def process_cdr_file(
 
         # Insert into database
         if records:
-            result = await db.cdr_records.insert_many(records)
+            inserted = await insert_records(db, records, fast_insert)
+            await update_session_stats(db, session_id, inserted)
             return {
-                "records_inserted": len(result.inserted_ids),
+                "records_inserted": inserted,
                 "session_id": session_id,
                 "suspect_name": suspect_name,
                 "format_detected": format_info
@@ -624,12 +704,13 @@ async def process_json_file(
     file_path: str,
     suspect_name: Optional[str] = None,
     manager=None,
-    session_id: Optional[str] = None
+    session_id: Optional[str] = None,
+    fast_insert: bool = False
 ) -> Dict:
     """Process JSON CDR file and insert into database"""
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = orjson.loads(f.read())
 
         # Handle different JSON structures
         if isinstance(data, dict):
@@ -651,6 +732,9 @@ async def process_json_file(
 
         db = await get_database()
         records = []
+        inserted = 0
+        # One timestamp per import for session/call_id fallbacks
+        now = datetime.now()
 
         for record_data in records_data:
             try:
@@ -676,7 +760,7 @@ async def process_json_file(
 
                 # Set session_id and optional suspect_name
                 if not session_id:
-                    session_id = f"session_{uuid.uuid4().hex[:12]}_{int(datetime.now().timestamp())}"
+                    session_id = f"session_{uuid.uuid4().hex[:12]}_{int(now.timestamp())}"
                 record_data['session_id'] = session_id
                 if suspect_name:
                     record_data['suspect_name'] = suspect_name
@@ -686,9 +770,9 @@ async def process_json_file(
                 # Generate call_id if missing
                 if 'call_id' not in record_data or not record_data['call_id']:
                     calling = record_data.get('calling_number', 'unknown')
-                    timestamp = record_data.get('call_start_time', datetime.now())
+                    timestamp = record_data.get('call_start_time') or now
                     if isinstance(timestamp, str):
-                        timestamp = parse_datetime(timestamp) or datetime.now()
+                        timestamp = parse_datetime(timestamp) or now
                     record_data['call_id'] = f"{calling}_{timestamp.timestamp()}"
 
                 # Validate required fields
@@ -697,33 +781,35 @@ async def process_json_file(
                 if not record_data.get('call_start_time'):
                     continue
 
-                # Create CDR record
-                cdr_record = CDRRecord(**record_data)
-                records.append(cdr_record.dict())
+                # Validate and serialize once, reuse for insert and geofence check
+                record_dict = _CDR_RECORD_ADAPTER.validate_python(record_data).model_dump(exclude_none=True)
+                records.append(record_dict)
 
                 if manager:
-                    await check_geofence_breach(cdr_record.dict(), manager)
+                    await check_geofence_breach(record_dict, manager)
 
             except Exception as e:
                 print(f"Error processing JSON record: {e}")
                 continue
 
-        # Insert into database
+            # Insert in batches
+            if len(records) >= INSERT_BATCH_SIZE:
+                inserted += await insert_records(db, records, fast_insert)
+                records = []
+
+        # Insert remaining records
         if records:
-            result = await db.cdr_records.insert_many(records)
-            return {
-                "records_inserted": len(result.inserted_ids),
-                "session_id": session_id,
-                "suspect_name": suspect_name,
-                "format_detected": {"vendor": "json", "type": "json_import"}
-            }
-        else:
-            return {
-                "records_inserted": 0,
-                "session_id": session_id,
-                "suspect_name": suspect_name,
-                "format_detected": {"vendor": "json", "type": "json_import"}
-            }
+            inserted += await insert_records(db, records, fast_insert)
+
+        if inserted:
+            await update_session_stats(db, session_id, inserted)
+
+        return {
+            "records_inserted": inserted,
+            "session_id": session_id,
+            "suspect_name": suspect_name,
+            "format_detected": {"vendor": "json", "type": "json_import"}
+        }
 
     except Exception as e:
         raise Exception(f"Error processing JSON file: {str(e)}")
@@ -0,0 +1,102 @@
+"""
+Response compression middleware
+Gzips text responses (JSON, NDJSON, CSV, KML, frontend assets) for clients that accept it.
+Binary exports (xlsx, pdf) are already compressed formats and anything that already
+carries a Content-Encoding (pre-compressed .gz frontend sidecars) passes through.
+"""
+
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+# wbits for zlib.compressobj that produce a gzip container
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+# Media types worth compressing; everything else is sent as-is
+COMPRESSIBLE_MEDIA_TYPES = frozenset({
+    "application/json",
+    "application/x-ndjson",
+    "application/vnd.google-earth.kml+xml",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/csv",
+    "text/css",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+})
+
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows encoding, honouring q-values (q=0 refuses)"""
+    wildcard = None
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        name = name.strip()
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name == encoding:
+            return quality > 0
+        if name == "*":
+            wildcard = quality > 0
+    return bool(wildcard)
+
+
+class GZipMiddleware:
+    """Gzip text response bodies, streaming chunk by chunk, unless they are already encoded"""
+
+    def __init__(self, app, minimum_size: int = 1024, compresslevel: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    def should_compress(self, headers: MutableHeaders) -> bool:
+        """Whether a response with these headers may be gzipped here"""
+        if "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        return media_type in COMPRESSIBLE_MEDIA_TYPES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not accepts_encoding(Headers(scope=scope).get("accept-encoding", ""), "gzip"):
+            await self.app(scope, receive, send)
+            return
+
+        # The start message is held back until the first body chunk shows whether to compress
+        state = {"start": None, "compressor": None}
+
+        async def send_compressed(message):
+            if message["type"] == "http.response.start":
+                state["start"] = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            start = state["start"]
+            if start is not None:
+                state["start"] = None
+                headers = MutableHeaders(raw=start["headers"])
+                if self.should_compress(headers) and (more_body or len(body) >= self.minimum_size):
+                    state["compressor"] = zlib.compressobj(self.compresslevel, zlib.DEFLATED, GZIP_WBITS)
+                    headers["Content-Encoding"] = "gzip"
+                    headers.add_vary_header("Accept-Encoding")
+                    if "content-length" in headers:
+                        del headers["content-length"]
+                await send(start)
+
+            compressor = state["compressor"]
+            if compressor is not None:
+                # Sync-flush streamed chunks so clients can decode them as they arrive
+                body = compressor.compress(body) + compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,28 +1,55 @@
 import os
+import asyncio
+import time
+from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConnectionFailure
 from dotenv import load_dotenv
+from cache import async_cached
 
 load_dotenv()
 
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "cdr_intelligence")
 
+# Connection pool sized for concurrent bulk inserts (upload chunks, migration workers)
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
+MONGODB_MAX_IDLE_TIME_MS = 60000
+
+# Wire compression for repetitive CDR documents; pymongo skips zstd when the
+# zstandard package is not installed and falls back to zlib
+MONGODB_COMPRESSORS = os.getenv("MONGODB_COMPRESSORS", "zstd,zlib")
+
 client = None
 database = None
 
+# Most recent session id, shared by analytics calls made without an explicit session
+LATEST_SESSION_TTL_SECONDS = 30
+_latest_session = {"session_id": None, "expires": 0.0}
+_latest_session_lock = asyncio.Lock()
+
 async def get_database():
     """Get MongoDB database instance"""
     global client, database
 
     if database is None:
         try:
-            client = AsyncIOMotorClient(MONGODB_URL)
+            client = AsyncIOMotorClient(
+                MONGODB_URL,
+                maxPoolSize=MONGODB_MAX_POOL_SIZE,
+                minPoolSize=MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+                compressors=MONGODB_COMPRESSORS
+            )
             database = client[DATABASE_NAME]
 
             # Create indexes for performance
             await create_indexes(database)
 
+            # One-off data fixes, each applied once per database
+            await apply_data_migrations(database)
+
         except Exception as e:
             raise ConnectionFailure(f"Failed to connect to MongoDB: {e}")
 
@@ -44,18 +71,88 @@ async def create_indexes(db):
 
         # Compound indexes for common queries
         await db.cdr_records.create_index([("session_id", 1), ("call_start_time", -1)])
-        await db.cdr_records.create_index([("session_id", 1), ("imei", 1)])
+        await db.cdr_records.create_index([("session_id", 1), ("imei", 1), ("call_start_time", 1)])
         await db.cdr_records.create_index([("calling_number", 1), ("called_number", 1)])
         await db.cdr_records.create_index([("session_id", 1), ("cell_tower_id", 1)])
+        await db.cdr_records.create_index([("session_id", 1), ("cell_id", 1), ("call_start_time", 1)])
         await db.cdr_records.create_index([("suspect_name", 1), ("call_start_time", -1)])  # Legacy support
+        await db.cdr_records.create_index([("session_id", 1), ("hour_of_day", 1)])
+        await db.cdr_records.create_index([("session_id", 1), ("date_str", 1)])
+        await db.cdr_records.create_index([("session_id", 1), ("direction", 1), ("call_start_time", 1)])
 
         # Geospatial index for location queries
         await db.cdr_records.create_index([("location_lat", 1), ("location_lon", 1)])
 
+        # Per-session metadata (cached record counts)
+        await db.sessions.create_index("session_id", unique=True)
+
+        # Geolocated cell towers, keyed by (mcc, mnc, lac, cell_id)
+        await db.cell_tower_cache.create_index(
+            [("mcc", 1), ("mnc", 1), ("lac", 1), ("cell_id", 1)], unique=True
+        )
+
         print("✓ Database indexes created successfully")
     except Exception as e:
         print(f"Warning: Index creation failed: {e}")
 
+async def backfill_time_buckets(db):
+    """Derive hour_of_day/date_str for records ingested before they were stored"""
+    await db.cdr_records.update_many(
+        {
+            "$or": [{"hour_of_day": {"$exists": False}}, {"date_str": {"$exists": False}}],
+            "call_start_time": {"$type": "date"}
+        },
+        [{"$set": {
+            "hour_of_day": {"$hour": "$call_start_time"},
+            "date_str": {"$dateToString": {"format": "%Y-%m-%d", "date": "$call_start_time"}}
+        }}]
+    )
+
+# Data migrations in application order, recorded by name in the migrations collection
+DATA_MIGRATIONS = (
+    ("time_buckets_backfill", backfill_time_buckets),
+)
+
+async def apply_data_migrations(db):
+    """Run the data migrations this database has not recorded yet"""
+    try:
+        applied = set(await db.migrations.distinct("_id"))
+        for name, migration in DATA_MIGRATIONS:
+            if name in applied:
+                continue
+            await migration(db)
+            await db.migrations.update_one(
+                {"_id": name},
+                {"$set": {"applied_at": datetime.now()}},
+                upsert=True
+            )
+            print(f"✓ Data migration applied: {name}")
+    except Exception as e:
+        print(f"Warning: Data migration failed: {e}")
+
+async def get_latest_session_id():
+    """Return the session of the most recent call, memoized for a short TTL"""
+    async with _latest_session_lock:
+        if time.monotonic() >= _latest_session["expires"]:
+            db = await get_database()
+            latest = await db.cdr_records.find_one(
+                {}, {"session_id": 1}, sort=[("call_start_time", -1)]
+            )
+            _latest_session["session_id"] = latest.get("session_id") if latest else None
+            _latest_session["expires"] = time.monotonic() + LATEST_SESSION_TTL_SECONDS
+        return _latest_session["session_id"]
+
+def invalidate_latest_session():
+    """Force the next get_latest_session_id call to query MongoDB"""
+    _latest_session["expires"] = 0.0
+
+@async_cached
+async def get_suspect_names():
+    """Distinct non-empty suspect names, cached until the next ingest"""
+    db = await get_database()
+    # Answered from the suspect_name index; empty names are dropped server-side
+    return await db.cdr_records.distinct("suspect_name", {"suspect_name": {"$nin": [None, ""]}})
+
 async def test_connection():
     """Test MongoDB connection"""
     try:
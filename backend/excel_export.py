@@ -8,11 +8,23 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 from datetime import datetime
+from functools import partial
+from itertools import chain, islice
+from operator import itemgetter
 import os
-from typing import Dict, List
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Sequence
 from cdr_analytics import generate_all_analytics
+from paths import EXPORTS_DIR
 from typing import Optional
 
+# Column widths are sized from the first rows of each sheet rather than a
+# second pass over every cell
+WIDTH_SAMPLE_ROWS = 1000
+MAX_COLUMN_WIDTH = 50
+
+# Letters for the first 26 columns, enough for every sheet in SHEET_SPECS
+COLUMN_LETTERS = tuple(get_column_letter(idx) for idx in range(1, 27))
+
 
 async def export_to_excel(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> str:
     """
@@ -24,266 +36,106 @@ async def export_to_excel(session_id: Optional[str] = None, suspect_name: Option
     # Generate all analytics
     analytics_data = await generate_all_analytics(session_id, suspect_name)
 
-    # Create exports directory
-    exports_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "exports")
-    os.makedirs(exports_dir, exist_ok=True)
-
     # Create filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     name_part = session_id or suspect_name or "cdr"
-    filename = os.path.join(exports_dir, f"{name_part}_cdr_analysis_{timestamp}.xlsx")
+    filename = os.path.join(EXPORTS_DIR, f"{name_part}_cdr_analysis_{timestamp}.xlsx")
 
     # Create workbook
     wb = Workbook()
     wb.remove(wb.active)  # Remove default sheet
 
-    # Define sheet order and names
-    sheet_names = [
-        "Summary",
-        "Corrected",
-        "MaxCall",
-        "MaxCircleCall",
-        "DailyFirstLast",
-        "MaxDuration",
-        "MaxIMEI",
-        "DailyIMEIATracking",
-        "MaxLocation",
-        "DailyFirstLastLocation"
-    ]
-
-    # Create and format each sheet
-    for sheet_name in sheet_names:
-        data = analytics_data.get(sheet_name, {})
+    # Create and format each sheet in SHEET_SPECS order
+    for sheet_name, spec in SHEET_SPECS.items():
         ws = wb.create_sheet(title=sheet_name)
-
-        if sheet_name == "Summary":
-            _write_summary_sheet(ws, data)
-        elif sheet_name == "Corrected":
-            _write_corrected_sheet(ws, data)
-        elif sheet_name == "MaxCall":
-            _write_max_call_sheet(ws, data)
-        elif sheet_name == "MaxCircleCall":
-            _write_max_circle_call_sheet(ws, data)
-        elif sheet_name == "DailyFirstLast":
-            _write_daily_first_last_sheet(ws, data)
-        elif sheet_name == "MaxDuration":
-            _write_max_duration_sheet(ws, data)
-        elif sheet_name == "MaxIMEI":
-            _write_max_imei_sheet(ws, data)
-        elif sheet_name == "DailyIMEIATracking":
-            _write_daily_imei_tracking_sheet(ws, data)
-        elif sheet_name == "MaxLocation":
-            _write_max_location_sheet(ws, data)
-        elif sheet_name == "DailyFirstLastLocation":
-            _write_daily_first_last_location_sheet(ws, data)
+        _write_sheet(ws, spec, analytics_data.get(sheet_name, {}))
 
     # Save workbook
     wb.save(filename)
     return filename
 
 
-def _write_summary_sheet(ws, data: Dict):
-    """Write Summary sheet with KPI summary and tabular breakdown"""
-    ws.append(["CDR Analysis Summary"])
-    ws.append([])
-
-    # KPI Summary
-    ws.append(["Metric", "Value"])
-    ws.append(["Total Calls", data.get("total_calls", 0)])
-    ws.append(["Incoming Calls", data.get("incoming_count", 0)])
-    ws.append(["Outgoing Calls", data.get("outgoing_count", 0)])
-    ws.append(["Unique B-Numbers", data.get("unique_b_numbers", 0)])
-    ws.append(["Unique IMEIs", data.get("unique_imeis", 0)])
-    ws.append(["Unique Locations", data.get("unique_locations", 0)])
-    ws.append(["First Activity Date", data.get("first_activity_date", "N/A")])
-    ws.append(["Last Activity Date", data.get("last_activity_date", "N/A")])
-
-    _format_header_row(ws, 3)
-    _auto_adjust_columns(ws)
-
-
-def _write_corrected_sheet(ws, data: List[Dict]):
-    """Write Corrected sheet with cleaned dataset"""
-    if not data or len(data) == 0:
-        ws.append(["No corrected records found"])
-        _auto_adjust_columns(ws)
-        return
-
-    # Headers
-    headers = [
-        "record_id", "msisdn_a", "msisdn_b", "call_type", "call_date",
-        "call_start_time", "call_duration_sec", "imei", "imsi", "cell_id",
-        "lac", "operator", "circle", "location_description", "raw_row_reference"
-    ]
-    ws.append(headers)
-    _format_header_row(ws, 1)
-
-    # Data rows
-    for record in data:
-        ws.append([
-            record.get("record_id", ""),
-            record.get("msisdn_a", ""),
-            record.get("msisdn_b", ""),
-            record.get("call_type", ""),
-            record.get("call_date", ""),
-            record.get("call_start_time", ""),
-            record.get("call_duration_sec", 0),
-            record.get("imei", ""),
-            record.get("imsi", ""),
-            record.get("cell_id", ""),
-            record.get("lac", ""),
-            record.get("operator", ""),
-            record.get("circle", ""),
-            record.get("location_description", ""),
-            record.get("raw_row_reference", "")
-        ])
-
-    _auto_adjust_columns(ws)
-
-
-def _write_max_call_sheet(ws, data: Dict):
-    """Write MaxCall sheet"""
-    ws.append(["Most Frequently Called Number"])
-    ws.append([])
-    ws.append(["B-Number", "Total Call Count"])
-    ws.append([data.get("b_number", "N/A"), data.get("total_call_count", 0)])
-
-    _format_header_row(ws, 3)
-    _auto_adjust_columns(ws)
-
-
-def _write_max_circle_call_sheet(ws, data: Dict):
-    """Write MaxCircleCall sheet"""
-    ws.append(["Circle/State with Highest Activity"])
-    ws.append([])
-    ws.append(["Circle", "Activity Count"])
-    ws.append([data.get("circle", "N/A"), data.get("activity_count", 0)])
-
-    _format_header_row(ws, 3)
-    _auto_adjust_columns(ws)
-
-
-def _write_daily_first_last_sheet(ws, data: List[Dict]):
-    """Write DailyFirstLast sheet"""
-    if not data or len(data) == 0:
-        ws.append(["No daily call data found"])
-        _auto_adjust_columns(ws)
-        return
-
-    headers = [
-        "Date", "First Call Time", "First Call B-Number",
-        "Last Call Time", "Last Call B-Number"
+class SheetSpec(NamedTuple):
+    """
+    Declarative layout for one analytical sheet
+    kind "kv": title row, blank row, optional header row, then rows(data)
+    kind "table": header row then rows(data), or empty_message when data is empty
+    """
+    kind: str
+    headers: Optional[List[str]]
+    rows: Callable[[Any], Iterable[Sequence]]
+    title: Optional[str] = None
+    empty_message: Optional[str] = None
+    header_row: Optional[int] = None  # Overrides the default header row position
+
+
+CORRECTED_HEADERS = [
+    "record_id", "msisdn_a", "msisdn_b", "call_type", "call_date",
+    "call_start_time", "call_duration_sec", "imei", "imsi", "cell_id",
+    "lac", "operator", "circle", "location_description", "raw_row_reference"
+]
+
+DAILY_FIRST_LAST_KEYS = [
+    "date", "first_call_time", "first_call_b_number",
+    "last_call_time", "last_call_b_number"
+]
+
+
+def _summary_rows(data: Dict) -> Iterable[Sequence]:
+    return [
+        ["Total Calls", data.get("total_calls", 0)],
+        ["Incoming Calls", data.get("incoming_count", 0)],
+        ["Outgoing Calls", data.get("outgoing_count", 0)],
+        ["Unique B-Numbers", data.get("unique_b_numbers", 0)],
+        ["Unique IMEIs", data.get("unique_imeis", 0)],
+        ["Unique Locations", data.get("unique_locations", 0)],
+        ["First Activity Date", data.get("first_activity_date", "N/A")],
+        ["Last Activity Date", data.get("last_activity_date", "N/A")]
     ]
-    ws.append(headers)
-    _format_header_row(ws, 1)
 
-    for item in data:
-        ws.append([
-            item.get("date", ""),
-            item.get("first_call_time", ""),
-            item.get("first_call_b_number", ""),
-            item.get("last_call_time", ""),
-            item.get("last_call_b_number", "")
-        ])
-
-    _auto_adjust_columns(ws)
-
-
-def _write_max_duration_sheet(ws, data: Dict):
-    """Write MaxDuration sheet"""
-    ws.append(["Longest Duration Call"])
-    ws.append([])
-    ws.append(["Field", "Value"])
-    ws.append(["B-Number", data.get("b_number", "N/A")])
-    ws.append(["Duration (seconds)", data.get("duration_seconds", 0)])
-    ws.append(["Date", data.get("date", "N/A")])
-    ws.append(["Call Start Time", data.get("call_start_time", "N/A")])
-    ws.append(["Cell ID", data.get("cell_id", "N/A")])
-    ws.append(["Location Description", data.get("location_description", "N/A")])
-
-    _format_header_row(ws, 3)
-    _auto_adjust_columns(ws)
-
-
-def _write_max_imei_sheet(ws, data: Dict):
-    """Write MaxIMEI sheet"""
-    ws.append(["IMEI Analysis"])
-    ws.append([])
-    ws.append(["Max IMEI", data.get("max_imei", "N/A")])
-    ws.append(["Max IMEI Call Count", data.get("max_imei_call_count", 0)])
-    ws.append(["Total IMEIs", data.get("total_imeis", 0)])
-    ws.append(["Multi-Device Usage", "Yes" if data.get("multi_device_usage", False) else "No"])
-    ws.append([])
-
-    # IMEI Ranking
-    ws.append(["IMEI Ranking"])
-    ws.append(["IMEI", "Call Count"])
-    _format_header_row(ws, 7)
 
-    for item in data.get("imei_ranking", []):
-        ws.append([item.get("imei", ""), item.get("call_count", 0)])
+def _max_duration_rows(data: Dict) -> Iterable[Sequence]:
+    return [
+        ["B-Number", data.get("b_number", "N/A")],
+        ["Duration (seconds)", data.get("duration_seconds", 0)],
+        ["Date", data.get("date", "N/A")],
+        ["Call Start Time", data.get("call_start_time", "N/A")],
+        ["Cell ID", data.get("cell_id", "N/A")],
+        ["Location Description", data.get("location_description", "N/A")]
+    ]
 
-    _auto_adjust_columns(ws)
 
+def _max_imei_rows(data: Dict) -> Iterable[Sequence]:
+    yield ["Max IMEI", data.get("max_imei", "N/A")]
+    yield ["Max IMEI Call Count", data.get("max_imei_call_count", 0)]
+    yield ["Total IMEIs", data.get("total_imeis", 0)]
+    yield ["Multi-Device Usage", "Yes" if data.get("multi_device_usage", False) else "No"]
+    yield []
 
-def _write_daily_imei_tracking_sheet(ws, data: List[Dict]):
-    """Write DailyIMEIATracking sheet"""
-    if not data or len(data) == 0:
-        ws.append(["No daily IMEI tracking data found"])
-        _auto_adjust_columns(ws)
-        return
+    # IMEI Ranking
+    yield ["IMEI Ranking"]
+    yield ["IMEI", "Call Count"]
+    for item in data.get("imei_ranking", []):
+        yield [item.get("imei", ""), item.get("call_count", 0)]
 
-    ws.append(["Date", "IMEI", "Call Count"])
-    _format_header_row(ws, 1)
 
+def _daily_imei_tracking_rows(data: List[Dict]) -> Iterable[Sequence]:
     for item in data:
         date_str = item.get("date", "")
         imeis = item.get("imeis", [])
 
         if not imeis:
-            ws.append([date_str, "N/A", 0])
+            yield [date_str, "N/A", 0]
         else:
             for imei_data in imeis:
-                ws.append([
-                    date_str,
-                    imei_data.get("imei", ""),
-                    imei_data.get("call_count", 0)
-                ])
+                yield [date_str, imei_data.get("imei", ""), imei_data.get("call_count", 0)]
 
-    _auto_adjust_columns(ws)
-
-
-def _write_max_location_sheet(ws, data: Dict):
-    """Write MaxLocation sheet"""
-    ws.append(["Most Frequently Used Location"])
-    ws.append([])
-    ws.append(["Cell ID", "Usage Count"])
-    ws.append([data.get("cell_id", "N/A"), data.get("usage_count", 0)])
-
-    _format_header_row(ws, 3)
-    _auto_adjust_columns(ws)
-
-
-def _write_daily_first_last_location_sheet(ws, data: List[Dict]):
-    """Write DailyFirstLastLocation sheet"""
-    if not data or len(data) == 0:
-        ws.append(["No daily location data found"])
-        _auto_adjust_columns(ws)
-        return
-
-    headers = [
-        "Date", "First Location Cell ID", "First Location Time",
-        "First Location Description", "Last Location Cell ID",
-        "Last Location Time", "Last Location Description"
-    ]
-    ws.append(headers)
-    _format_header_row(ws, 1)
 
+def _daily_first_last_location_rows(data: List[Dict]) -> Iterable[Sequence]:
     for item in data:
         first_loc = item.get("first_location", {})
         last_loc = item.get("last_location", {})
-
-        ws.append([
+        yield [
             item.get("date", ""),
             first_loc.get("cell_id", ""),
             first_loc.get("time", ""),
@@ -291,9 +143,103 @@ def _write_daily_first_last_location_sheet(ws, data: List[Dict]):
             last_loc.get("cell_id", ""),
             last_loc.get("time", ""),
             last_loc.get("location_description", "")
-        ])
+        ]
+
+
+# Sheet names must match the analytical view keys exactly; dict order is sheet order
+SHEET_SPECS: Dict[str, SheetSpec] = {
+    "Summary": SheetSpec(
+        kind="kv",
+        title="CDR Analysis Summary",
+        headers=["Metric", "Value"],
+        rows=_summary_rows
+    ),
+    # Corrected records always carry every header key, so rows are plain tuples
+    "Corrected": SheetSpec(
+        kind="table",
+        headers=CORRECTED_HEADERS,
+        rows=partial(map, itemgetter(*CORRECTED_HEADERS)),
+        empty_message="No corrected records found"
+    ),
+    "MaxCall": SheetSpec(
+        kind="kv",
+        title="Most Frequently Called Number",
+        headers=["B-Number", "Total Call Count"],
+        rows=lambda data: [[data.get("b_number", "N/A"), data.get("total_call_count", 0)]]
+    ),
+    "MaxCircleCall": SheetSpec(
+        kind="kv",
+        title="Circle/State with Highest Activity",
+        headers=["Circle", "Activity Count"],
+        rows=lambda data: [[data.get("circle", "N/A"), data.get("activity_count", 0)]]
+    ),
+    "DailyFirstLast": SheetSpec(
+        kind="table",
+        headers=[
+            "Date", "First Call Time", "First Call B-Number",
+            "Last Call Time", "Last Call B-Number"
+        ],
+        rows=partial(map, itemgetter(*DAILY_FIRST_LAST_KEYS)),
+        empty_message="No daily call data found"
+    ),
+    "MaxDuration": SheetSpec(
+        kind="kv",
+        title="Longest Duration Call",
+        headers=["Field", "Value"],
+        rows=_max_duration_rows
+    ),
+    # The ranking table header follows the four KPI rows, a blank and its caption, so it is
+    # row 9 (the cell layout is unchanged; the old writer styled the blank row 7 by mistake)
+    "MaxIMEI": SheetSpec(
+        kind="kv",
+        title="IMEI Analysis",
+        headers=None,
+        rows=_max_imei_rows,
+        header_row=9
+    ),
+    "DailyIMEIATracking": SheetSpec(
+        kind="table",
+        headers=["Date", "IMEI", "Call Count"],
+        rows=_daily_imei_tracking_rows,
+        empty_message="No daily IMEI tracking data found"
+    ),
+    "MaxLocation": SheetSpec(
+        kind="kv",
+        title="Most Frequently Used Location",
+        headers=["Cell ID", "Usage Count"],
+        rows=lambda data: [[data.get("cell_id", "N/A"), data.get("usage_count", 0)]]
+    ),
+    "DailyFirstLastLocation": SheetSpec(
+        kind="table",
+        headers=[
+            "Date", "First Location Cell ID", "First Location Time",
+            "First Location Description", "Last Location Cell ID",
+            "Last Location Time", "Last Location Description"
+        ],
+        rows=_daily_first_last_location_rows,
+        empty_message="No daily location data found"
+    )
+}
+
+
+def _write_sheet(ws, spec: SheetSpec, data):
+    """Write one analytical sheet according to its SheetSpec"""
+    if spec.kind == "table":
+        if not data:
+            _apply_column_widths(ws, _write_rows(ws, [[spec.empty_message]]))
+            return
+        head = [spec.headers]
+        header_row = 1
+    else:
+        head = [[spec.title], []]
+        if spec.headers:
+            head.append(spec.headers)
+        header_row = 3
+
+    widths = _write_rows(ws, chain(head, spec.rows(data)))
 
-    _auto_adjust_columns(ws)
+    _format_header_row(ws, spec.header_row or header_row)
+    _apply_column_widths(ws, widths)
 
 
 def _format_header_row(ws, row_num: int):
@@ -314,18 +260,34 @@ def _format_header_row(ws, row_num: int):
         cell.border = border
 
 
-def _auto_adjust_columns(ws):
-    """Auto-adjust column widths"""
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
+def _write_rows(ws, rows: Iterable[Sequence]) -> List[int]:
+    """
+    Append all rows in one pass and return the tracked column widths
+    Widths are measured over the first WIDTH_SAMPLE_ROWS rows; the rest are
+    appended in a bare loop
+    """
+    append = ws.append
+    widths = []
+    rows = iter(rows)
+
+    for row in islice(rows, WIDTH_SAMPLE_ROWS):
+        append(row)
+        for idx, value in enumerate(row):
+            length = len(str(value)) if value is not None else 0
+            if idx >= len(widths):
+                widths.append(length)
+            elif length > widths[idx]:
+                widths[idx] = length
+
+    for row in rows:
+        append(row)
+
+    return widths
+
+
+def _apply_column_widths(ws, widths: List[int]):
+    """Set column widths from the lengths tracked while writing rows"""
+    column_dimensions = ws.column_dimensions
+    for idx, max_length in enumerate(widths):
+        letter = COLUMN_LETTERS[idx] if idx < len(COLUMN_LETTERS) else get_column_letter(idx + 1)
+        column_dimensions[letter].width = min(max_length + 2, MAX_COLUMN_WIDTH)
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException, WebSocket
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import List, Dict, Optional, Set
 from geojson import Polygon
 from datetime import datetime
 from database import get_database
 import asyncio
 from bson.objectid import ObjectId
+from pymongo import ReturnDocument
 
 router = APIRouter()
 
@@ -29,6 +30,15 @@ class GeofenceCreate(BaseModel):
     class Config:
         arbitrary_types_allowed = True
 
+class GeofenceUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    geometry: Optional[Polygon] = None
+    suspect_name: Optional[str] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
 @router.post("/geofences", response_model=Geofence)
 async def create_geofence(geofence: GeofenceCreate):
     db = await get_database()
@@ -46,10 +56,18 @@ async def get_geofences():
     return geofences
 
 @router.put("/geofences/{geofence_id}", response_model=Geofence)
-async def update_geofence(geofence_id: str, geofence: Geofence):
+async def update_geofence(geofence_id: str, geofence: GeofenceUpdate):
     db = await get_database()
-    await db.geofences.update_one({"_id": geofence_id}, {"$set": geofence.dict(by_alias=True)})
-    updated_geofence = await db.geofences.find_one({"_id": geofence_id})
+    # Only fields sent by the client are validated and written
+    patch = geofence.dict(exclude_unset=True, by_alias=True)
+    if patch:
+        updated_geofence = await db.geofences.find_one_and_update(
+            {"_id": geofence_id},
+            {"$set": patch},
+            return_document=ReturnDocument.AFTER
+        )
+    else:
+        updated_geofence = await db.geofences.find_one({"_id": geofence_id})
     if updated_geofence is None:
         raise HTTPException(status_code=404, detail="Geofence not found")
     return updated_geofence
@@ -65,18 +83,25 @@ async def delete_geofence(geofence_id: str):
 # WebSocket for real-time alerts
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        self.active_connections.discard(websocket)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        # Send to all clients concurrently; drop sockets whose send failed
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *[connection.send_text(message) for connection in connections],
+            return_exceptions=True
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.active_connections.discard(connection)
 
 manager = ConnectionManager()
 
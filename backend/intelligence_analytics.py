@@ -3,12 +3,34 @@ Intelligence-Grade CDR Analytics Module
 Generates advanced intelligence insights for law enforcement and national security agencies
 """
 
-from database import get_database
+from database import get_database, get_latest_session_id
+from cache import async_cached
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from collections import defaultdict
+from itertools import chain
+import numpy as np
+import asyncio
 import re
 
+HEATMAP_HOURS = list(range(24))
+
+# Cursor batch size for pipelines consumed document by document
+CURSOR_BATCH_SIZE = 1000
+
+# Movement-map layers: (filter for points on a path, expression naming the path)
+MOVEMENT_PATH_KEYS = {
+    "day": (
+        {"call_start_time": {"$type": "date"}},
+        "$date_str"
+    ),
+    "imei": (
+        {"imei": {"$nin": [None, ""]}},
+        "$imei"
+    )
+}
+
+
 async def _build_match_query(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
     """Helper to build match query - prefer session_id, fallback to suspect_name"""
     match_query = {}
@@ -18,23 +40,31 @@ async def _build_match_query(session_id: Optional[str] = None, suspect_name: Opt
         match_query["suspect_name"] = suspect_name
     else:
         # Get most recent session
-        db = await get_database()
-        latest = await db.cdr_records.find_one(sort=[("call_start_time", -1)])
-        if latest and latest.get("session_id"):
-            match_query["session_id"] = latest["session_id"]
+        latest_session_id = await get_latest_session_id()
+        if latest_session_id:
+            match_query["session_id"] = latest_session_id
     return match_query
 
 
-async def generate_intelligence_overview(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
+def _case_id() -> str:
+    """Case reference for the current day, e.g. CDR_INV_2024_0131"""
+    today = datetime.now()
+    return f"CDR_INV_{today:%Y}_{today:%m%d}"
+
+
+@async_cached
+async def generate_intelligence_overview(session_id: Optional[str] = None, suspect_name: Optional[str] = None, match_query: Optional[Dict] = None) -> Dict:
     """
     Generate intelligence overview with KPIs, story, and alerts
     """
     db = await get_database()
-    match_query = await _build_match_query(session_id, suspect_name)
+    if match_query is None:
+        match_query = await _build_match_query(session_id, suspect_name)
+    case_id = _case_id()
 
     if not match_query:
         return {
-            "case_id": f"CDR_INV_{datetime.now().strftime('%Y')}_{datetime.now().strftime('%m%d')}",
+            "case_id": case_id,
             "target_msisdn": None,
             "total_calls": 0,
             "unique_contacts": 0,
@@ -50,23 +80,33 @@ async def generate_intelligence_overview(session_id: Optional[str] = None, suspe
     target_msisdn = target_record.get("msisdn_a") or target_record.get("calling_number") if target_record else None
 
     # Get summary stats
+    # Summary stats and night-time count share a single scan of the session
     pipeline = [
         {"$match": match_query},
-        {"$group": {
-            "_id": None,
-            "total_calls": {"$sum": 1},
-            "unique_contacts": {"$addToSet": {"$ifNull": ["$msisdn_b", "$called_number"]}},
-            "unique_imeis": {"$addToSet": "$imei"},
-            "unique_locations": {"$addToSet": {"$ifNull": ["$cell_id", "$cell_tower_id"]}},
-            "first_activity": {"$min": "$call_start_time"},
-            "last_activity": {"$max": "$call_start_time"}
+        {"$facet": {
+            "summary": [
+                {"$group": {
+                    "_id": None,
+                    "total_calls": {"$sum": 1},
+                    "unique_contacts": {"$addToSet": {"$ifNull": ["$msisdn_b", "$called_number"]}},
+                    "unique_imeis": {"$addToSet": "$imei"},
+                    "unique_locations": {"$addToSet": {"$ifNull": ["$cell_id", "$cell_tower_id"]}},
+                    "first_activity": {"$min": "$call_start_time"},
+                    "last_activity": {"$max": "$call_start_time"}
+                }}
+            ],
+            "night": [
+                {"$match": {"hour_of_day": {"$gte": 22, "$lte": 23}}},
+                {"$count": "night_calls"}
+            ]
         }}
     ]
 
     result = await db.cdr_records.aggregate(pipeline).to_list(length=1)
+    facets = result[0] if result else {}
 
-    if result and result[0]:
-        data = result[0]
+    if facets.get("summary"):
+        data = facets["summary"][0]
         unique_contacts = len([x for x in data.get("unique_contacts", []) if x])
         unique_imeis = len([x for x in data.get("unique_imeis", []) if x])
         unique_locations = len([x for x in data.get("unique_locations", []) if x])
@@ -110,15 +150,7 @@ async def generate_intelligence_overview(session_id: Optional[str] = None, suspe
             })
 
         # Check for night-time activity spikes
-        night_pipeline = [
-            {"$match": {**match_query, "call_start_time": {"$exists": True}}},
-            {"$project": {
-                "hour": {"$hour": "$call_start_time"}
-            }},
-            {"$match": {"hour": {"$gte": 22, "$lte": 23}}},
-            {"$count": "night_calls"}
-        ]
-        night_result = await db.cdr_records.aggregate(night_pipeline).to_list(length=1)
+        night_result = facets.get("night")
         night_calls = night_result[0].get("night_calls", 0) if night_result else 0
 
         if night_calls > 50:
@@ -130,7 +162,7 @@ async def generate_intelligence_overview(session_id: Optional[str] = None, suspe
             })
 
         return {
-            "case_id": f"CDR_INV_{datetime.now().strftime('%Y')}_{datetime.now().strftime('%m%d')}",
+            "case_id": case_id,
             "target_msisdn": target_msisdn,
             "total_calls": data.get("total_calls", 0),
             "unique_contacts": unique_contacts,
@@ -142,7 +174,7 @@ async def generate_intelligence_overview(session_id: Optional[str] = None, suspe
         }
 
     return {
-        "case_id": f"CDR_INV_{datetime.now().strftime('%Y')}_{datetime.now().strftime('%m%d')}",
+        "case_id": case_id,
         "target_msisdn": target_msisdn,
         "total_calls": 0,
         "unique_contacts": 0,
@@ -154,116 +186,60 @@ async def generate_intelligence_overview(session_id: Optional[str] = None, suspe
     }
 
 
-async def generate_contact_network(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
+@async_cached
+async def generate_contact_network(session_id: Optional[str] = None, suspect_name: Optional[str] = None, match_query: Optional[Dict] = None) -> Dict:
     """
     Generate contact network graph for single suspect
     """
     db = await get_database()
-    match_query = await _build_match_query(session_id, suspect_name)
+    if match_query is None:
+        match_query = await _build_match_query(session_id, suspect_name)
 
     if not match_query:
         return {"nodes": [], "edges": []}
 
     # Get target MSISDN - try multiple fields
     target_record = await db.cdr_records.find_one(match_query)
-    target_msisdn = None
-    if target_record:
-        target_msisdn = (target_record.get("msisdn_a") or
-                        target_record.get("calling_number") or
-                        target_record.get("msisdn_b") or
-                        target_record.get("called_number"))
-
-    if not target_msisdn:
-        # Try to get from any record
-        any_record = await db.cdr_records.find_one(match_query)
-        if any_record:
-            target_msisdn = (any_record.get("msisdn_a") or
-                           any_record.get("calling_number") or
-                           "Target")
-
-    if not target_msisdn:
+    if not target_record:
         return {"nodes": [], "edges": []}
 
-    # Get all contacts - both incoming and outgoing
-    # For outgoing: msisdn_b or called_number is the contact
+    target_msisdn = (target_record.get("msisdn_a") or
+                     target_record.get("calling_number") or
+                     target_record.get("msisdn_b") or
+                     target_record.get("called_number") or
+                     "Target")
+
+    # Get all contacts - both incoming and outgoing - in a single pass
+    # For outgoing (or unspecified direction): msisdn_b or called_number is the contact
     # For incoming: msisdn_a or calling_number is the contact
-    pipeline_outgoing = [
-        {"$match": {
-            **match_query,
-            "$and": [
-                {
-                    "$or": [
-                        {"direction": "outgoing"},
-                        {"direction": {"$exists": False}}  # Default to outgoing if not specified
-                    ]
-                },
-                {
-                    "$or": [
-                        {"msisdn_b": {"$exists": True, "$ne": None, "$ne": ""}},
-                        {"called_number": {"$exists": True, "$ne": None, "$ne": ""}}
-                    ]
-                }
-            ]
-        }},
+    pipeline = [
+        {"$match": match_query},
+        # Records stored without a direction count as outgoing (the CDRRecord default)
+        {"$set": {"direction": {"$ifNull": ["$direction", "outgoing"]}}},
         {"$project": {
-            "contact": {"$ifNull": ["$msisdn_b", "$called_number"]},
+            "_id": 0,
+            "contact": {"$cond": [
+                {"$eq": ["$direction", "incoming"]},
+                {"$ifNull": ["$msisdn_a", "$calling_number"]},
+                {"$ifNull": ["$msisdn_b", "$called_number"]}
+            ]},
+            "is_incoming": {"$eq": ["$direction", "incoming"]},
             "duration": {"$ifNull": ["$call_duration_sec", "$duration_seconds", 0]}
         }},
-        {"$match": {"contact": {"$ne": None, "$ne": ""}}},
+        {"$match": {"contact": {"$nin": [None, "", target_msisdn]}}},
         {"$group": {
             "_id": "$contact",
             "call_count": {"$sum": 1},
-            "total_duration": {"$sum": "$duration"}
-        }}
-    ]
-
-    pipeline_incoming = [
-        {"$match": {
-            **match_query,
-            "direction": "incoming",
-            "$or": [
-                {"msisdn_a": {"$exists": True, "$ne": None, "$ne": ""}},
-                {"calling_number": {"$exists": True, "$ne": None, "$ne": ""}}
-            ]
+            "total_duration": {"$sum": "$duration"},
+            "incoming": {"$sum": {"$cond": ["$is_incoming", 1, 0]}},
+            "outgoing": {"$sum": {"$cond": ["$is_incoming", 0, 1]}}
         }},
-        {"$project": {
-            "contact": {"$ifNull": ["$msisdn_a", "$calling_number"]},
-            "duration": {"$ifNull": ["$call_duration_sec", "$duration_seconds", 0]}
-        }},
-        {"$match": {"contact": {"$ne": None, "$ne": ""}}},
-        {"$group": {
-            "_id": "$contact",
-            "call_count": {"$sum": 1},
-            "total_duration": {"$sum": "$duration"}
-        }}
+        # Top 50 contacts by call count, selected server-side
+        {"$sort": {"call_count": -1}},
+        {"$limit": 50}
     ]
 
-    results_outgoing = await db.cdr_records.aggregate(pipeline_outgoing).to_list(length=None)
-    results_incoming = await db.cdr_records.aggregate(pipeline_incoming).to_list(length=None)
-
-    # Combine and aggregate contacts
-    contact_stats = {}
-
-    for result in results_outgoing:
-        contact = result["_id"]
-        if contact and contact != target_msisdn:
-            if contact not in contact_stats:
-                contact_stats[contact] = {"call_count": 0, "total_duration": 0, "incoming": 0, "outgoing": 0}
-            contact_stats[contact]["call_count"] += result.get("call_count", 0)
-            contact_stats[contact]["total_duration"] += result.get("total_duration", 0)
-            contact_stats[contact]["outgoing"] += result.get("call_count", 0)
-
-    for result in results_incoming:
-        contact = result["_id"]
-        if contact and contact != target_msisdn:
-            if contact not in contact_stats:
-                contact_stats[contact] = {"call_count": 0, "total_duration": 0, "incoming": 0, "outgoing": 0}
-            contact_stats[contact]["call_count"] += result.get("call_count", 0)
-            contact_stats[contact]["total_duration"] += result.get("total_duration", 0)
-            contact_stats[contact]["incoming"] += result.get("call_count", 0)
-
-    # Sort by call count and take top 50
-    sorted_contacts = sorted(contact_stats.items(), key=lambda x: x[1]["call_count"], reverse=True)[:50]
+    top_contacts = await db.cdr_records.aggregate(pipeline).to_list(length=50)
 
     nodes = []
     edges = []
@@ -279,7 +255,8 @@ async def generate_contact_network(session_id: Optional[str] = None, suspect_nam
     })
 
     # Add contact nodes and edges
-    for contact, stats in sorted_contacts:
+    for stats in top_contacts:
+        contact = stats["_id"]
         if not contact:
             continue
 
@@ -312,137 +289,145 @@ async def generate_contact_network(session_id: Optional[str] = None, suspect_nam
     }
 
 
-async def generate_temporal_heatmap(session_id: Optional[str] = None, suspect_name: Optional[str] = None, call_type: str = "all") -> Dict:
+@async_cached
+async def generate_temporal_heatmap(session_id: Optional[str] = None, suspect_name: Optional[str] = None, call_type: str = "all", match_query: Optional[Dict] = None) -> Dict:
     """
     Generate temporal activity heatmap (Date x Hour)
     """
     db = await get_database()
-    match_query = await _build_match_query(session_id, suspect_name)
+    if match_query is None:
+        match_query = await _build_match_query(session_id, suspect_name)
 
     if not match_query:
         return {"x": [], "y": [], "z": []}
 
     # Add call type filter
     if call_type != "all":
+        match_query = {**match_query}
         if call_type == "incoming":
             match_query["direction"] = "incoming"
         elif call_type == "outgoing":
-            match_query["direction"] = "outgoing"
+            # A missing direction means outgoing (the CDRRecord default)
+            match_query["direction"] = {"$in": ["outgoing", None]}
         elif call_type == "sms":
             match_query["call_type"] = "sms"
 
     pipeline = [
-        {"$match": match_query},
-        {"$project": {
-            "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$call_start_time"}},
-            "hour": {"$hour": "$call_start_time"}
-        }},
+        {"$match": {**match_query, "call_start_time": {"$type": "date"}}},
+        # Stored time buckets, derived on the fly for records the backfill has not reached
         {"$group": {
-            "_id": {"date": "$date", "hour": "$hour"},
+            "_id": {
+                "date": {"$ifNull": ["$date_str", {"$dateToString": {"format": "%Y-%m-%d", "date": "$call_start_time"}}]},
+                "hour": {"$ifNull": ["$hour_of_day", {"$hour": "$call_start_time"}]}
+            },
             "count": {"$sum": 1}
-        }}
+        }},
+        # One row per date carrying its (hour, count) pairs
+        {"$group": {
+            "_id": "$_id.date",
+            "hours": {"$push": "$_id.hour"},
+            "counts": {"$push": "$count"}
+        }},
+        {"$sort": {"_id": 1}}
     ]
 
     results = await db.cdr_records.aggregate(pipeline).to_list(length=None)
 
-    # Build heatmap data
-    date_set = set()
-    hour_set = set()
-    data_map = {}
-
-    for result in results:
-        date = result["_id"]["date"]
-        hour = result["_id"]["hour"]
-        count = result.get("count", 0)
-
-        date_set.add(date)
-        hour_set.add(hour)
-        data_map[(date, hour)] = count
-
-    # Sort dates and hours
-    sorted_dates = sorted(list(date_set))
-    sorted_hours = sorted(list(hour_set))
-
-    # Build z matrix
-    z = []
-    for date in sorted_dates:
-        row = []
-        for hour in sorted_hours:
-            row.append(data_map.get((date, hour), 0))
-        z.append(row)
+    # Build z matrix over the fixed 0-23 hour axis with a single scatter
+    sorted_dates = [result["_id"] for result in results]
+    z = np.zeros((len(results), len(HEATMAP_HOURS)), dtype=np.int64)
+    if results:
+        rows = np.repeat(np.arange(len(results)), [len(result["hours"]) for result in results])
+        cols = np.fromiter(chain.from_iterable(result["hours"] for result in results), dtype=np.intp, count=len(rows))
+        z[rows, cols] = np.fromiter(chain.from_iterable(result["counts"] for result in results), dtype=np.int64, count=len(rows))
 
     return {
-        "x": sorted_hours,
+        "x": HEATMAP_HOURS,
         "y": sorted_dates,
-        "z": z
+        "z": z.tolist()
     }
 
 
-async def generate_imei_timeline(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
+@async_cached
+async def generate_imei_timeline(session_id: Optional[str] = None, suspect_name: Optional[str] = None, match_query: Optional[Dict] = None) -> Dict:
     """
     Generate IMEI switch timeline and device behavior
     """
     db = await get_database()
-    match_query = await _build_match_query(session_id, suspect_name)
+    if match_query is None:
+        match_query = await _build_match_query(session_id, suspect_name)
 
     if not match_query:
         return {"timeline": [], "switches": []}
 
-    pipeline = [
-        {"$match": {
-            **match_query,
-            "imei": {"$exists": True, "$ne": None, "$ne": ""}
-        }},
-        {"$sort": {"call_start_time": 1}},
+    imei_match = {
+        **match_query,
+        "imei": {"$nin": [None, ""]},
+        "call_start_time": {"$type": "date"}
+    }
+
+    # Switches and per-day counts run as two concurrent aggregations; a $facet would
+    # return both in one document, which must fit the 16 MB BSON limit
+    switches_pipeline = [
+        {"$match": imei_match},
         {"$project": {
+            "_id": 0,
             "imei": 1,
             "call_start_time": 1,
             "cell_id": {"$ifNull": ["$cell_id", "$cell_tower_id"]}
-        }}
+        }},
+        # Detect IMEI switches by comparing each call with the previous one
+        {"$setWindowFields": {
+            "sortBy": {"call_start_time": 1},
+            "output": {"previous_imei": {"$shift": {"output": "$imei", "by": -1}}}
+        }},
+        {"$match": {"$expr": {"$and": [
+            {"$ne": ["$previous_imei", None]},
+            {"$ne": ["$previous_imei", "$imei"]}
+        ]}}}
+    ]
+    # Calls per IMEI and date, one row per IMEI in order of first use
+    timeline_pipeline = [
+        {"$match": imei_match},
+        {"$group": {
+            "_id": {
+                "imei": "$imei",
+                "date": "$date_str"
+            },
+            "count": {"$sum": 1},
+            "first_seen": {"$min": "$call_start_time"}
+        }},
+        {"$sort": {"_id.date": 1}},
+        {"$group": {
+            "_id": "$_id.imei",
+            "dates": {"$push": "$_id.date"},
+            "call_counts": {"$push": "$count"},
+            "first_seen": {"$min": "$first_seen"}
+        }},
+        {"$sort": {"first_seen": 1}}
     ]
 
-    results = await db.cdr_records.aggregate(pipeline).to_list(length=None)
+    timeline_rows, switch_rows = await asyncio.gather(
+        db.cdr_records.aggregate(timeline_pipeline).to_list(length=None),
+        db.cdr_records.aggregate(switches_pipeline).to_list(length=None)
+    )
 
-    if not results:
+    if not timeline_rows:
         return {"timeline": [], "switches": []}
 
-    # Group by IMEI and date
-    imei_data = defaultdict(lambda: defaultdict(list))
-    previous_imei = None
-    switches = []
-
-    for result in results:
-        imei = result.get("imei")
-        call_time = result.get("call_start_time")
-        cell_id = result.get("cell_id")
-
-        if not imei or not call_time:
-            continue
-
-        if isinstance(call_time, datetime):
-            date_str = call_time.strftime("%Y-%m-%d")
-            imei_data[imei][date_str].append(call_time)
-
-        # Detect IMEI switch
-        if previous_imei and previous_imei != imei:
-            switches.append({
-                "timestamp": call_time.isoformat() if isinstance(call_time, datetime) else str(call_time),
-                "from_imei": previous_imei,
-                "to_imei": imei,
-                "location": cell_id or "Unknown"
-            })
-
-        previous_imei = imei
-
-    # Build timeline for each IMEI
-    timeline = []
-    for imei, dates_dict in imei_data.items():
-        dates = sorted(dates_dict.keys())
-        timeline.append({
-            "imei": imei,
-            "dates": dates,
-            "call_counts": [len(dates_dict[d]) for d in dates]
-        })
+    timeline = [
+        {"imei": row["_id"], "dates": row["dates"], "call_counts": row["call_counts"]}
+        for row in timeline_rows
+    ]
+    switches = [
+        {
+            "timestamp": switch["call_start_time"].isoformat(),
+            "from_imei": switch["previous_imei"],
+            "to_imei": switch["imei"],
+            "location": switch.get("cell_id") or "Unknown"
+        }
+        for switch in switch_rows
+    ]
 
     return {
         "timeline": timeline,
@@ -450,82 +435,106 @@ async def generate_imei_timeline(session_id: Optional[str] = None, suspect_name:
     }
 
 
-async def generate_movement_map(session_id: Optional[str] = None, suspect_name: Optional[str] = None, layer: str = "day") -> Dict:
+@async_cached
+async def generate_movement_map(session_id: Optional[str] = None, suspect_name: Optional[str] = None, layer: str = "day", match_query: Optional[Dict] = None) -> Dict:
     """
     Generate geo-spatial movement map
     """
     db = await get_database()
-    match_query = await _build_match_query(session_id, suspect_name)
+    if match_query is None:
+        match_query = await _build_match_query(session_id, suspect_name)
 
     if not match_query:
         return {"paths": [], "markers": []}
 
-    pipeline = [
+    located_stages = [
         {"$match": {
             **match_query,
-            "$or": [
-                {"location_lat": {"$exists": True, "$ne": None}},
-                {"location_lon": {"$exists": True, "$ne": None}}
-            ]
+            "location_lat": {"$nin": [None, 0]},
+            "location_lon": {"$nin": [None, 0]}
         }},
-        {"$sort": {"call_start_time": 1}},
         {"$project": {
+            "_id": 0,
             "lat": "$location_lat",
             "lon": "$location_lon",
             "call_start_time": 1,
             "cell_id": {"$ifNull": ["$cell_id", "$cell_tower_id"]},
             "imei": 1,
-            "msisdn_b": {"$ifNull": ["$msisdn_b", "$called_number"]}
+            # Day path key; derived for records the time-bucket backfill has not reached
+            "date_str": {"$ifNull": ["$date_str", {"$cond": [
+                {"$eq": [{"$type": "$call_start_time"}, "date"]},
+                {"$dateToString": {"format": "%Y-%m-%d", "date": "$call_start_time"}},
+                None
+            ]}]}
         }}
     ]
 
-    results = await db.cdr_records.aggregate(pipeline).to_list(length=None)
+    # One marker per cell at its first sighting, first 20 cells only
+    markers_pipeline = [
+        *located_stages,
+        {"$sort": {"call_start_time": 1}},
+        {"$group": {
+            "_id": "$cell_id",
+            "lat": {"$first": "$lat"},
+            "lon": {"$first": "$lon"},
+            "call_start_time": {"$first": "$call_start_time"}
+        }},
+        {"$sort": {"call_start_time": 1}},
+        {"$limit": 20}
+    ]
+    aggregations = [db.cdr_records.aggregate(markers_pipeline).to_list(length=20)]
+
+    # Markers and paths run as two concurrent aggregations; under a $facet every path
+    # would share one output document, which must fit the 16 MB BSON limit
+    if layer in MOVEMENT_PATH_KEYS:
+        path_filter, path_key = MOVEMENT_PATH_KEYS[layer]
+        # Keep only points where the cell changes within each path; one document per path
+        paths_pipeline = [
+            *located_stages,
+            {"$match": path_filter},
+            {"$set": {"path_key": path_key}},
+            {"$setWindowFields": {
+                "partitionBy": "$path_key",
+                "sortBy": {"call_start_time": 1},
+                "output": {"previous_cell": {"$shift": {"output": "$cell_id", "by": -1}}}
+            }},
+            {"$match": {"$expr": {"$or": [
+                {"$eq": [{"$ifNull": ["$cell_id", None]}, None]},
+                {"$ne": ["$cell_id", "$previous_cell"]}
+            ]}}},
+            {"$group": {
+                "_id": "$path_key",
+                "coordinates": {"$push": ["$lon", "$lat"]},
+                "first_seen": {"$min": "$call_start_time"}
+            }},
+            {"$sort": {"first_seen": 1}}
+        ]
+        aggregations.append(db.cdr_records.aggregate(paths_pipeline).to_list(length=None))
+
+    marker_rows, *path_results = await asyncio.gather(*aggregations)
+    path_rows = path_results[0] if path_results else []
 
     paths = []
-    markers = []
-
-    if layer == "day":
-        # Group by date
-        daily_paths = defaultdict(list)
-        for result in results:
-            if result.get("lat") and result.get("lon") and result.get("call_start_time"):
-                date_str = result["call_start_time"].strftime("%Y-%m-%d") if isinstance(result["call_start_time"], datetime) else str(result["call_start_time"])[:10]
-                daily_paths[date_str].append([result["lon"], result["lat"]])
-
-        colors = ["#6366f1", "#ec4899", "#10b981", "#f59e0b", "#3b82f6"]
-        for idx, (date, coords) in enumerate(daily_paths.items()):
-            if len(coords) > 1:
-                paths.append({
-                    "coordinates": coords,
-                    "color": colors[idx % len(colors)],
-                    "label": date
-                })
-
-    elif layer == "imei":
-        # Group by IMEI
-        imei_paths = defaultdict(list)
-        for result in results:
-            if result.get("lat") and result.get("lon") and result.get("imei"):
-                imei_paths[result["imei"]].append([result["lon"], result["lat"]])
-
-        colors = ["#6366f1", "#ec4899", "#10b981", "#f59e0b", "#3b82f6"]
-        for idx, (imei, coords) in enumerate(imei_paths.items()):
-            if len(coords) > 1:
-                paths.append({
-                    "coordinates": coords,
-                    "color": colors[idx % len(colors)],
-                    "label": imei[:12] + "..."
-                })
+    colors = ["#6366f1", "#ec4899", "#10b981", "#f59e0b", "#3b82f6"]
+    for idx, path in enumerate(path_rows):
+        if len(path["coordinates"]) > 1:
+            label = path["_id"] if layer == "day" else path["_id"][:12] + "..."
+            paths.append({
+                "coordinates": path["coordinates"],
+                "color": colors[idx % len(colors)],
+                "label": label
+            })
 
     # Add markers for key locations
-    for result in results[:20]:  # Limit to first 20 for performance
-        if result.get("lat") and result.get("lon"):
-            markers.append({
-                "coordinates": [result["lon"], result["lat"]],
-                "color": "#ec4899",
-                "title": f"Cell: {result.get('cell_id', 'Unknown')}",
-                "description": f"Time: {result.get('call_start_time')}"
-            })
+    markers = [
+        {
+            "coordinates": [marker["lon"], marker["lat"]],
+            "color": "#ec4899",
+            "title": f"Cell: {marker['_id'] or 'Unknown'}",
+            "description": f"Time: {marker.get('call_start_time')}"
+        }
+        for marker in marker_rows
+    ]
 
     return {
         "paths": paths,
@@ -533,12 +542,14 @@ async def generate_movement_map(session_id: Optional[str] = None, suspect_name:
     }
 
 
-async def generate_colocation_analysis(session_id: Optional[str] = None, suspect_name: Optional[str] = None, window_minutes: int = 15) -> List[Dict]:
+@async_cached
+async def generate_colocation_analysis(session_id: Optional[str] = None, suspect_name: Optional[str] = None, window_minutes: int = 15, match_query: Optional[Dict] = None) -> List[Dict]:
     """
     Detect co-locations (multiple MSISDNs at same cell ID within time window)
     """
     db = await get_database()
-    match_query = await _build_match_query(session_id, suspect_name)
+    if match_query is None:
+        match_query = await _build_match_query(session_id, suspect_name)
 
     if not match_query:
         return []
@@ -551,69 +562,65 @@ async def generate_colocation_analysis(session_id: Optional[str] = None, suspect
     pipeline = [
         {"$match": {
             **match_query,
+            "call_start_time": {"$type": "date"},
             "$or": [
-                {"cell_id": {"$exists": True, "$ne": None, "$ne": ""}},
-                {"cell_tower_id": {"$exists": True, "$ne": None, "$ne": ""}}
+                {"cell_id": {"$nin": [None, ""]}},
+                {"cell_tower_id": {"$nin": [None, ""]}}
             ]
         }},
         {"$project": {
+            "_id": 0,
             "cell_id": {"$ifNull": ["$cell_id", "$cell_tower_id"]},
-            "call_start_time": 1,
+            # Windows span ±window_minutes, i.e. 2 * window_minutes, as reported in time_window
+            "bucket": {"$dateTrunc": {"date": "$call_start_time", "unit": "minute", "binSize": 2 * window_minutes}},
             "msisdn_b": {"$ifNull": ["$msisdn_b", "$called_number"]}
         }},
-        {"$sort": {"call_start_time": 1}}
+        # Bucket each cell's activity into fixed time windows server-side
+        {"$group": {
+            "_id": {"cell_id": "$cell_id", "bucket": "$bucket"},
+            "msisdns": {"$addToSet": "$msisdn_b"}
+        }},
+        {"$sort": {"_id.bucket": 1}}
     ]
 
-    results = await db.cdr_records.aggregate(pipeline).to_list(length=None)
-
-    # Group by cell ID and time window
-    colocations = []
+    # Keep windows with multiple MSISDNs, grouped by cell in order of first activity
     cell_groups = defaultdict(list)
-
-    for result in results:
-        cell_id = result.get("cell_id")
-        call_time = result.get("call_start_time")
-        msisdn_b = result.get("msisdn_b")
-
-        if not cell_id or not call_time:
+    async for result in db.cdr_records.aggregate(pipeline, batchSize=CURSOR_BATCH_SIZE):
+        cell_id = result["_id"].get("cell_id")
+        bucket = result["_id"].get("bucket")
+        if not cell_id or not bucket:
             continue
 
-        # Check if within window of existing records
-        found_group = False
-        for group in cell_groups[cell_id]:
-            time_diff = abs((call_time - group["time"]).total_seconds() / 60)
-            if time_diff <= window_minutes:
-                group["msisdns"].add(msisdn_b)
-                found_group = True
-                break
-
-        if not found_group:
-            cell_groups[cell_id].append({
-                "time": call_time,
-                "msisdns": {target_msisdn, msisdn_b} if target_msisdn else {msisdn_b}
-            })
+        msisdns = set(result["msisdns"])
+        if target_msisdn:
+            msisdns.add(target_msisdn)
+        if len(msisdns) > 1:
+            cell_groups[cell_id].append((bucket, msisdns))
 
     # Convert to result format
+    colocations = []
     for cell_id, groups in cell_groups.items():
-        for group in groups:
-            if len(group["msisdns"]) > 1:  # Only if multiple MSISDNs
-                colocations.append({
-                    "date": group["time"].strftime("%Y-%m-%d") if isinstance(group["time"], datetime) else str(group["time"])[:10],
-                    "time_window": f"±{window_minutes} minutes",
-                    "location": cell_id,
-                    "msisdns": list(group["msisdns"]),
-                    "repeated": len([g for g in groups if len(g["msisdns"]) > 1]) > 1
-                })
+        repeated = len(groups) > 1
+        for bucket, msisdns in groups:
+            colocations.append({
+                "date": bucket.strftime("%Y-%m-%d"),
+                "time_window": f"±{window_minutes} minutes",
+                "location": cell_id,
+                "msisdns": list(msisdns),
+                "repeated": repeated
+            })
 
     return colocations
 
 
-async def generate_anomalies(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> List[Dict]:
+@async_cached
+async def generate_anomalies(session_id: Optional[str] = None, suspect_name: Optional[str] = None, match_query: Optional[Dict] = None) -> List[Dict]:
     """
     Detect anomalies in CDR data
     """
     db = await get_database()
-    match_query = await _build_match_query(session_id, suspect_name)
+    if match_query is None:
+        match_query = await _build_match_query(session_id, suspect_name)
 
     if not match_query:
         return []
@@ -624,7 +631,7 @@ async def generate_anomalies(session_id: Optional[str] = None, suspect_name: Opt
     imei_pipeline = [
         {"$match": {
             **match_query,
-            "imei": {"$exists": True, "$ne": None, "$ne": ""}
+            "imei": {"$nin": [None, ""]}
         }},
         {"$sort": {"call_start_time": 1}},
         {"$group": {
@@ -645,13 +652,15 @@ async def generate_anomalies(session_id: Optional[str] = None, suspect_name: Opt
             "supporting_data": [{"imei": r["_id"], "first_seen": str(r["first_seen"]), "last_seen": str(r["last_seen"])} for r in imei_results]
         })
 
-    # Check for sudden silence
+    # Check for sudden silence - densify so days without calls count as zero
     pipeline = [
-        {"$match": match_query},
+        {"$match": {**match_query, "call_start_time": {"$type": "date"}}},
         {"$group": {
-            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$call_start_time"}},
+            "_id": {"$dateTrunc": {"date": "$call_start_time", "unit": "day"}},
             "count": {"$sum": 1}
         }},
+        {"$densify": {"field": "_id", "range": {"step": 1, "unit": "day", "bounds": "full"}}},
+        {"$set": {"count": {"$ifNull": ["$count", 0]}}},
         {"$sort": {"_id": 1}}
     ]
 
@@ -674,12 +683,12 @@ async def generate_anomalies(session_id: Optional[str] = None, suspect_name: Opt
         {"$match": {
             **match_query,
             "$or": [
-                {"cell_id": {"$exists": True, "$ne": None, "$ne": ""}},
-                {"cell_tower_id": {"$exists": True, "$ne": None, "$ne": ""}}
+                {"cell_id": {"$nin": [None, ""]}},
+                {"cell_tower_id": {"$nin": [None, ""]}}
             ]
         }},
         {"$group": {
-            "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$call_start_time"}},
+            "_id": "$date_str",
             "unique_locations": {"$addToSet": {"$ifNull": ["$cell_id", "$cell_tower_id"]}}
         }},
         {"$project": {
@@ -704,12 +713,13 @@ async def generate_anomalies(session_id: Optional[str] = None, suspect_name: Opt
     return anomalies
 
 
-async def generate_audit_trail(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
+async def generate_audit_trail(session_id: Optional[str] = None, suspect_name: Optional[str] = None, match_query: Optional[Dict] = None) -> Dict:
     """
     Generate forensic audit trail
     """
     db = await get_database()
-    match_query = await _build_match_query(session_id, suspect_name)
+    if match_query is None:
+        match_query = await _build_match_query(session_id, suspect_name)
 
     if not match_query:
         return {"trail": []}
@@ -728,8 +738,14 @@ async def generate_audit_trail(session_id: Optional[str] = None, suspect_name: O
         }
     ]
 
-    # Get record count
-    count = await db.cdr_records.count_documents(match_query)
+    # Get record count - cached on the session at ingest, counted only as a fallback
+    session = None
+    if "session_id" in match_query:
+        session = await db.sessions.find_one({"session_id": match_query["session_id"]}, {"total_calls": 1})
+    if session and "total_calls" in session:
+        count = session["total_calls"]
+    else:
+        count = await db.cdr_records.count_documents(match_query)
     trail.append({
         "timestamp": datetime.now().isoformat(),
         "action": "Data Loaded",
@@ -737,3 +753,23 @@ async def generate_audit_trail(session_id: Optional[str] = None, suspect_name: O
     })
 
     return {"trail": trail}
+
+
+async def generate_dashboard(session_id: Optional[str] = None, suspect_name: Optional[str] = None) -> Dict:
+    """
+    Generate every intelligence view concurrently against one resolved match query
+    """
+    match_query = await _build_match_query(session_id, suspect_name)
+
+    views = {
+        "overview": generate_intelligence_overview,
+        "network": generate_contact_network,
+        "timeline": generate_temporal_heatmap,
+        "imei": generate_imei_timeline,
+        "location": generate_movement_map,
+        "colocation": generate_colocation_analysis,
+        "anomalies": generate_anomalies,
+        "audit": generate_audit_trail
+    }
+    results = await asyncio.gather(*(generate(match_query=match_query) for generate in views.values()))
+    return dict(zip(views, results))
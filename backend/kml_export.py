@@ -2,22 +2,153 @@
 KML Export Module for CDR Data
 Converts CDR records to KML format for Google Earth visualization
 """
-from typing import List, Dict
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Optional, Set, Tuple
+from collections import deque
 from datetime import datetime
 from database import get_database
-import os
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from pymongo import UpdateOne
+import asyncio
+import httpx
+import io
+import re
+import time
+import lxml.etree as ET
+
+KML_NAMESPACE = "http://www.opengis.net/kml/2.2"
+
+# Records per cursor batch and per coordinate write-back bulk_write
+KML_CURSOR_BATCH_SIZE = 1000
+
+# Fields read by the export; _id is kept for coordinate write-backs
+KML_RECORD_PROJECTION = {
+    "location_lat": 1, "location_lon": 1,
+    "mcc": 1, "mnc": 1, "lac": 1, "cell_tower_id": 1,
+    "call_start_time": 1, "call_type": 1, "direction": 1,
+    "called_number": 1, "duration_seconds": 1
+}
+
+# Maximum cell-tower requests in flight, and the shared client's connection pool size
+LOOKUP_CONCURRENCY = 10
+LOOKUP_MAX_CONNECTIONS = 20
+
+# Provider rate limiting: requests per rolling minute, minimum spacing between
+# requests, and AIMD concurrency (grow +0.5 on fast successes, halve on 429/timeout)
+LOOKUP_REQUESTS_PER_MINUTE = 300
+LOOKUP_MIN_INTERVAL_SECONDS = 0.05
+LOOKUP_LATENCY_TARGET_SECONDS = 2.0
+LOOKUP_MAX_ATTEMPTS = 3
+LOOKUP_BACKOFF_BASE_SECONDS = 1.0
+LOOKUP_BACKOFF_CAP_SECONDS = 30.0
+
+# Resolved towers are persisted in cell_tower_cache and memoized in-process
+CELL_TOWER_KEY_FIELDS = ("mcc", "mnc", "lac", "cell_id")
+CELL_TOWER_CACHE_PROJECTION = {"_id": 0, "mcc": 0, "mnc": 0, "lac": 0, "cell_id": 0, "ts": 0}
+CELL_TOWER_MEMO_SIZE = 10000
+_cell_tower_memo: Dict[Tuple[int, int, int, int], Dict] = {}
+
+# Per-placemark description table, filled with str.format_map
+_DESC_TMPL = """
+            <table>
+                <tr><td><b>Time:</b></td><td>{time_str}</td></tr>
+                <tr><td><b>Type:</b></td><td>{call_type}</td></tr>
+                <tr><td><b>Direction:</b></td><td>{direction}</td></tr>
+                <tr><td><b>Called:</b></td><td>{called_number}</td></tr>
+                <tr><td><b>Duration:</b></td><td>{duration_seconds}s</td></tr>
+                <tr><td><b>Cell ID:</b></td><td>{cell_tower_id}</td></tr>
+                <tr><td><b>LAC:</b></td><td>{lac}</td></tr>
+            </table>
+            """
+
+# First run of digits in a non-numeric cell tower id (e.g. "CELL-1234")
+_CELL_ID_DIGITS = re.compile(r'\d+')
+
+
+class RateLimiter:
+    """Sliding-window RPM cap, leaky-bucket spacing and AIMD concurrency for provider calls"""
+
+    def __init__(self, requests_per_minute: int = LOOKUP_REQUESTS_PER_MINUTE,
+                 min_interval: float = LOOKUP_MIN_INTERVAL_SECONDS,
+                 max_concurrency: int = LOOKUP_CONCURRENCY):
+        self.requests_per_minute = requests_per_minute
+        self.min_interval = min_interval
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self._in_flight = 0
+        self._timestamps = deque()
+        self._last_request = 0.0
+        self._pace_lock = asyncio.Lock()
+        self._slots = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait for a concurrency slot, then for the rate limits to allow a request"""
+        async with self._slots:
+            await self._slots.wait_for(lambda: self._in_flight < max(1, int(self.concurrency)))
+            self._in_flight += 1
+        await self.wait_if_throttled()
+
+    async def release(self, throttled: bool, elapsed: float):
+        """Free the slot and adapt concurrency to how the request went"""
+        if throttled:
+            self.concurrency = max(1.0, self.concurrency * 0.5)
+        elif elapsed < LOOKUP_LATENCY_TARGET_SECONDS:
+            self.concurrency = min(float(self.max_concurrency), self.concurrency + 0.5)
+        async with self._slots:
+            self._in_flight -= 1
+            self._slots.notify_all()
+
+    async def wait_if_throttled(self):
+        """Sleep until both the per-minute window and the minimum interval allow a request"""
+        async with self._pace_lock:
+            while True:
+                now = time.monotonic()
+                while self._timestamps and now - self._timestamps[0] >= 60:
+                    self._timestamps.popleft()
+
+                delay = self._last_request + self.min_interval - now
+                if len(self._timestamps) >= self.requests_per_minute:
+                    delay = max(delay, 60 - (now - self._timestamps[0]))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+
+            self._timestamps.append(now)
+            self._last_request = now
+
+
+# Shared by every lookup so provider limits hold across concurrent exports
+_provider_limiter = RateLimiter()
+
+
+async def _send_with_backoff(send: Callable[[], Awaitable[httpx.Response]]) -> Optional[httpx.Response]:
+    """Send a provider request under the rate limiter, retrying 429s and timeouts with backoff"""
+    response = None
+    for attempt in range(LOOKUP_MAX_ATTEMPTS):
+        await _provider_limiter.acquire()
+        started = time.monotonic()
+        throttled = True
+        try:
+            response = await send()
+            throttled = response.status_code == 429
+        except httpx.TimeoutException:
+            response = None
+        finally:
+            await _provider_limiter.release(throttled, time.monotonic() - started)
+
+        if not throttled:
+            return response
+        if attempt + 1 < LOOKUP_MAX_ATTEMPTS:
+            await asyncio.sleep(min(LOOKUP_BACKOFF_BASE_SECONDS * 2 ** attempt, LOOKUP_BACKOFF_CAP_SECONDS))
+
+    return response
 
 
 def prettify_xml(elem):
     """Return a pretty-printed XML string for the Element."""
-    rough_string = ET.tostring(elem, 'utf-8')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ")
+    return ET.tostring(elem, pretty_print=True, xml_declaration=True, encoding="utf-8").decode("utf-8")
 
 
-async def lookup_cell_tower_coordinates(mcc: int, mnc: int, lac: int, cell_id: int, api_key: str = None) -> Dict:
+async def lookup_cell_tower_coordinates(mcc: int, mnc: int, lac: int, cell_id: int, api_key: str = None,
+                                        client: Optional[httpx.AsyncClient] = None) -> Dict:
     """
     Lookup cell tower coordinates using OpenCellID API or similar service
 
@@ -27,239 +158,361 @@ async def lookup_cell_tower_coordinates(mcc: int, mnc: int, lac: int, cell_id: i
         lac: Location Area Code
         cell_id: Cell ID
         api_key: Optional API key for OpenCellID
+        client: Optional shared HTTP client; a short-lived one is created if omitted
 
     Returns:
         Dict with 'lat' and 'lon' keys, or None if not found
     """
-    import httpx
+    cell = (mcc, mnc, lac, cell_id)
+    if cell in _cell_tower_memo:
+        return _cell_tower_memo[cell]
+
+    # Previously resolved towers are served from the cell_tower_cache collection
+    db = await get_database()
+    cell_query = dict(zip(CELL_TOWER_KEY_FIELDS, cell))
+    cached = await db.cell_tower_cache.find_one(cell_query, CELL_TOWER_CACHE_PROJECTION)
+    if cached:
+        _remember_cell_tower(cell, cached)
+        return cached
 
+    if client is None:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            coords = await _query_cell_tower(mcc, mnc, lac, cell_id, api_key, client)
+    else:
+        coords = await _query_cell_tower(mcc, mnc, lac, cell_id, api_key, client)
+
+    if coords:
+        _remember_cell_tower(cell, coords)
+        await db.cell_tower_cache.update_one(
+            cell_query,
+            {"$set": {**coords, "ts": datetime.now()}},
+            upsert=True
+        )
+    return coords
+
+
+def _remember_cell_tower(cell: Tuple[int, int, int, int], coords: Dict):
+    """Keep a resolved tower in the in-process memo, bounded in size"""
+    if len(_cell_tower_memo) >= CELL_TOWER_MEMO_SIZE:
+        _cell_tower_memo.clear()
+    _cell_tower_memo[cell] = coords
+
+
+async def _query_cell_tower(mcc: int, mnc: int, lac: int, cell_id: int, api_key: Optional[str],
+                            client: httpx.AsyncClient) -> Optional[Dict]:
+    """Query OpenCellID, then Mozilla Location Service, for a tower's position"""
     # Try OpenCellID API first
     if api_key:
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                # OpenCellID API endpoint
-                url = "https://opencellid.org/cell/get"
-                params = {
-                    "key": api_key,
-                    "mcc": mcc,
-                    "mnc": mnc,
-                    "lac": lac,
-                    "cellid": cell_id,
-                    "format": "json"
-                }
-                response = await client.get(url, params=params)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get("status") == "ok" and "lat" in data and "lon" in data:
-                        return {
-                            "lat": float(data["lat"]),
-                            "lon": float(data["lon"]),
-                            "range": data.get("range", 0),
-                            "source": "opencellid"
-                        }
-        except Exception as e:
-            print(f"OpenCellID API error: {e}")
-
-    # Try alternative: Mozilla Location Service (no API key required)
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            url = "https://location.services.mozilla.com/v1/geolocate"
-            payload = {
-                "cellTowers": [{
-                    "mobileCountryCode": mcc,
-                    "mobileNetworkCode": mnc,
-                    "locationAreaCode": lac,
-                    "cellId": cell_id
-                }]
+            # OpenCellID API endpoint
+            url = "https://opencellid.org/cell/get"
+            params = {
+                "key": api_key,
+                "mcc": mcc,
+                "mnc": mnc,
+                "lac": lac,
+                "cellid": cell_id,
+                "format": "json"
             }
-            response = await client.post(url, json=payload)
+            response = await _send_with_backoff(lambda: client.get(url, params=params))
 
-            if response.status_code == 200:
+            if response is not None and response.status_code == 200:
                 data = response.json()
-                if "location" in data:
+                if data.get("status") == "ok" and "lat" in data and "lon" in data:
                     return {
-                        "lat": float(data["location"]["lat"]),
-                        "lon": float(data["location"]["lng"]),
-                        "accuracy": data.get("accuracy", 0),
-                        "source": "mozilla"
+                        "lat": float(data["lat"]),
+                        "lon": float(data["lon"]),
+                        "range": data.get("range", 0),
+                        "source": "opencellid"
                     }
+        except Exception as e:
+            print(f"OpenCellID API error: {e}")
+
+    # Try alternative: Mozilla Location Service (no API key required)
+    try:
+        url = "https://location.services.mozilla.com/v1/geolocate"
+        payload = {
+            "cellTowers": [{
+                "mobileCountryCode": mcc,
+                "mobileNetworkCode": mnc,
+                "locationAreaCode": lac,
+                "cellId": cell_id
+            }]
+        }
+        response = await _send_with_backoff(lambda: client.post(url, json=payload))
+
+        if response is not None and response.status_code == 200:
+            data = response.json()
+            if "location" in data:
+                return {
+                    "lat": float(data["location"]["lat"]),
+                    "lon": float(data["location"]["lng"]),
+                    "accuracy": data.get("accuracy", 0),
+                    "source": "mozilla"
+                }
     except Exception as e:
         print(f"Mozilla Location Service error: {e}")
 
     return None
 
 
-async def export_to_kml(suspect_name: str, api_key: str = None, lookup_coordinates: bool = True) -> str:
+def _cell_tower_key(record: Dict) -> Optional[Tuple[int, int, int, int]]:
+    """Parse (mcc, mnc, lac, cell_id) from a record, or None if incomplete"""
+    if not (record.get("mcc") and record.get("mnc") and record.get("lac") and record.get("cell_tower_id")):
+        return None
+
+    mcc = int(record.get("mcc"))
+    mnc = int(record.get("mnc"))
+    lac = int(record.get("lac"))
+    cell_id_str = str(record.get("cell_tower_id"))
+    # Try to extract numeric cell ID
+    cell_id = None
+    if cell_id_str.isdigit():
+        cell_id = int(cell_id_str)
+    else:
+        # Try to extract numbers from string
+        match = _CELL_ID_DIGITS.search(cell_id_str)
+        if match:
+            cell_id = int(match.group(0))
+
+    return (mcc, mnc, lac, cell_id) if cell_id else None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the keep-alive HTTP client shared by cell tower lookups for the app's lifetime"""
+    limits = httpx.Limits(
+        max_connections=LOOKUP_MAX_CONNECTIONS,
+        max_keepalive_connections=LOOKUP_MAX_CONNECTIONS
+    )
+    return httpx.AsyncClient(timeout=10.0, limits=limits)
+
+
+async def _lookup_cell_towers(cells: Set[Tuple[int, int, int, int]], api_key: str = None,
+                              client: Optional[httpx.AsyncClient] = None) -> Dict:
+    """Look up many cell towers concurrently over one shared HTTP client"""
+    if not cells:
+        return {}
+
+    if client is None:
+        async with create_http_client() as client:
+            return await _lookup_cell_towers(cells, api_key, client)
+
+    cells = list(cells)
+    # Concurrency and pacing are enforced per HTTP call by the shared rate limiter
+    results = await asyncio.gather(*(
+        lookup_cell_tower_coordinates(*cell, api_key=api_key, client=client)
+        for cell in cells
+    ))
+
+    return dict(zip(cells, results))
+
+
+async def iter_kml_bytes(suspect_name: str, api_key: str = None, lookup_coordinates: bool = True,
+                         client: Optional[httpx.AsyncClient] = None) -> AsyncIterator[bytes]:
     """
     Export CDR data to KML format for Google Earth visualization
 
     Args:
         suspect_name: Name of the suspect
         api_key: Optional OpenCellID API key for cell tower lookup
+        lookup_coordinates: Resolve coordinates for records without them from their cell tower
+        client: Optional shared HTTP client for cell tower lookups
 
-    Returns:
-        Path to the generated KML file
+    Yields:
+        Chunks of the KML document, in order, as they are generated
     """
     db = await get_database()
 
-    # Get all records for suspect, ordered by time
-    cursor = db.cdr_records.find(
-        {"suspect_name": suspect_name}
-    ).sort("call_start_time", 1)
-
-    records = await cursor.to_list(length=None)
-
-    if not records:
-        raise ValueError(f"No records found for suspect: {suspect_name}")
-
-    # Create KML root element
-    kml = ET.Element("kml", xmlns="http://www.opengis.net/kml/2.2")
-    document = ET.SubElement(kml, "Document")
+    # Resolve each distinct cell tower once, concurrently, for records without coordinates.
+    # Only the tower fields of unlocated records are read in this first pass.
+    cells = set()
+    if lookup_coordinates:
+        unlocated = db.cdr_records.find(
+            {
+                "suspect_name": suspect_name,
+                "$or": [{"location_lat": {"$in": [None, 0]}}, {"location_lon": {"$in": [None, 0]}}]
+            },
+            {"mcc": 1, "mnc": 1, "lac": 1, "cell_tower_id": 1}
+        ).batch_size(KML_CURSOR_BATCH_SIZE)
+        async for record in unlocated:
+            try:
+                cell = _cell_tower_key(record)
+            except (ValueError, TypeError) as e:
+                print(f"Error parsing cell tower data for record {record['_id']}: {e}")
+                continue
+            if cell:
+                cells.add(cell)
+
+    cell_coordinates = await _lookup_cell_towers(cells, api_key, client)
+    location_updates = []
+
+    # Get all records for suspect, ordered by time (then _id, so ties keep one order), streamed in batches.
+    # Placemarks are named "Call N" after each record's position in that full order.
+    if cell_coordinates:
+        cursor = db.cdr_records.find(
+            {"suspect_name": suspect_name},
+            KML_RECORD_PROJECTION
+        ).sort([("call_start_time", 1), ("_id", 1)]).batch_size(KML_CURSOR_BATCH_SIZE)
+    else:
+        # With no tower coordinates to fill in, only already-located records can be plotted,
+        # so MongoDB drops the rest after numbering every record instead of sending them here
+        cursor = db.cdr_records.aggregate([
+            {"$match": {"suspect_name": suspect_name}},
+            {"$setWindowFields": {
+                "sortBy": {"call_start_time": 1, "_id": 1},
+                "output": {"call_number": {"$documentNumber": {}}}
+            }},
+            {"$match": {"location_lat": {"$nin": [None, 0]}, "location_lon": {"$nin": [None, 0]}}},
+            {"$project": {**KML_RECORD_PROJECTION, "call_number": 1}}
+        ], allowDiskUse=True, batchSize=KML_CURSOR_BATCH_SIZE)
 
-    # Document name
-    name = ET.SubElement(document, "name")
+    # Collect coordinates for path
+    coordinates = []
+    record_count = 0
+
+    # Serialize into an in-memory buffer that is drained to the caller after every batch
+    buffer = io.BytesIO()
+    with ET.xmlfile(buffer, encoding="utf-8") as xf:
+        xf.write_declaration()
+        with xf.element("kml", nsmap={None: KML_NAMESPACE}):
+            with xf.element("Document"):
+                # Placemarks are built on the event loop and serialized in batches on a worker thread
+                placemarks = _document_header(suspect_name)
+
+                # Process records and get coordinates
+                async for record in cursor:
+                    idx = record.get("call_number", record_count + 1) - 1
+                    record_count += 1
+                    lat = record.get("location_lat")
+                    lon = record.get("location_lon")
+
+                    if cell_coordinates and not (lat and lon):
+                        try:
+                            coords = cell_coordinates.get(_cell_tower_key(record))
+                        except (ValueError, TypeError):
+                            coords = None
+                        if coords:
+                            lat = coords["lat"]
+                            lon = coords["lon"]
+                            # Update record in database for future use
+                            location_updates.append(UpdateOne(
+                                {"_id": record["_id"]},
+                                {"$set": {"location_lat": lat, "location_lon": lon}}
+                            ))
+                            if len(location_updates) >= KML_CURSOR_BATCH_SIZE:
+                                await db.cdr_records.bulk_write(location_updates, ordered=False)
+                                location_updates = []
+
+                    if lat and lon:
+                        coordinates.append(f"{lon},{lat},0")
+                        placemarks.append(_build_placemark(idx, record, lat, lon))
+                        if len(placemarks) >= KML_CURSOR_BATCH_SIZE:
+                            await asyncio.to_thread(_write_elements, xf, placemarks)
+                            placemarks = []
+                            yield _drain(buffer)
+
+                # Create path line if we have coordinates
+                if len(coordinates) > 1:
+                    placemarks.append(_build_path_placemark(suspect_name, coordinates))
+                await asyncio.to_thread(_write_elements, xf, placemarks)
+
+    if location_updates:
+        await db.cdr_records.bulk_write(location_updates, ordered=False)
+
+    # Remaining placemarks plus the closing tags
+    yield _drain(buffer)
+
+
+def _write_elements(xf, elements: List) -> None:
+    """Serialize a batch of elements into the open KML stream"""
+    for element in elements:
+        xf.write(element, pretty_print=True)
+    xf.flush()
+
+
+def _drain(buffer: io.BytesIO) -> bytes:
+    """Take everything written to the buffer so far and reset it"""
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def _text_element(parent, tag: str, text: str, **attrib):
+    """Append a child element holding text"""
+    element = ET.SubElement(parent, tag, **attrib)
+    element.text = text
+    return element
+
+
+def _document_header(suspect_name: str) -> List:
+    """Document name, description and the shared path/marker styles"""
+    name = ET.Element("name")
     name.text = f"CDR Path - {suspect_name}"
 
     # Description
-    description = ET.SubElement(document, "description")
+    description = ET.Element("description")
     description.text = f"Call Detail Records visualization for {suspect_name}. Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 
     # Style for path line
-    style = ET.SubElement(document, "Style", id="pathStyle")
+    style = ET.Element("Style", id="pathStyle")
     line_style = ET.SubElement(style, "LineStyle")
-    color = ET.SubElement(line_style, "color")
-    color.text = "ff00ffff"  # Yellow color (ABGR format)
-    width = ET.SubElement(line_style, "width")
-    width.text = "3"
+    _text_element(line_style, "color", "ff00ffff")  # Yellow color (ABGR format)
+    _text_element(line_style, "width", "3")
 
     # Style for markers
-    marker_style = ET.SubElement(document, "Style", id="markerStyle")
+    marker_style = ET.Element("Style", id="markerStyle")
     icon_style = ET.SubElement(marker_style, "IconStyle")
     icon = ET.SubElement(icon_style, "Icon")
-    href = ET.SubElement(icon, "href")
-    href.text = "http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png"
-    scale = ET.SubElement(icon_style, "scale")
-    scale.text = "1.2"
+    _text_element(icon, "href", "http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png")
+    _text_element(icon_style, "scale", "1.2")
 
-    # Collect coordinates for path
-    coordinates = []
-    placemarks = []
+    return [name, description, style, marker_style]
 
-    # Process records and get coordinates
-    for idx, record in enumerate(records):
-        lat = record.get("location_lat")
-        lon = record.get("location_lon")
 
-        # If no coordinates, try to lookup using cell tower info
-        if lookup_coordinates and (not lat or not lon) and record.get("mcc") and record.get("mnc") and record.get("lac") and record.get("cell_tower_id"):
-            try:
-                mcc = int(record.get("mcc"))
-                mnc = int(record.get("mnc"))
-                lac = int(record.get("lac"))
-                cell_id_str = str(record.get("cell_tower_id"))
-                # Try to extract numeric cell ID
-                cell_id = None
-                if cell_id_str.isdigit():
-                    cell_id = int(cell_id_str)
-                else:
-                    # Try to extract numbers from string
-                    import re
-                    numbers = re.findall(r'\d+', cell_id_str)
-                    if numbers:
-                        cell_id = int(numbers[0])
-
-                if cell_id:
-                    coords = await lookup_cell_tower_coordinates(mcc, mnc, lac, cell_id, api_key)
-                    if coords:
-                        lat = coords["lat"]
-                        lon = coords["lon"]
-                        # Update record in database for future use
-                        await db.cdr_records.update_one(
-                            {"_id": record["_id"]},
-                            {"$set": {"location_lat": lat, "location_lon": lon}}
-                        )
-            except (ValueError, TypeError) as e:
-                print(f"Error parsing cell tower data for record {idx}: {e}")
-                continue
-            except Exception as e:
-                print(f"Error looking up coordinates for record {idx}: {e}")
-                continue
+def _build_placemark(idx: int, record: Dict, lat: float, lon: float):
+    """Placemark for a single call location"""
+    placemark = ET.Element("Placemark")
+    _text_element(placemark, "name", f"Call {idx + 1}")
 
-        if lat and lon:
-            coordinates.append(f"{lon},{lat},0")
+    call_time = record.get("call_start_time")
+    if isinstance(call_time, datetime):
+        time_str = call_time.isoformat(sep=" ", timespec="seconds")
+        begin = call_time.isoformat(timespec="seconds") + "Z"
+    else:
+        time_str = begin = str(call_time)
 
-            # Create placemark for this location
-            placemark = ET.SubElement(document, "Placemark")
-            pm_name = ET.SubElement(placemark, "name")
-            pm_name.text = f"Call {idx + 1}"
+    pm_description = ET.SubElement(placemark, "description")
+    pm_description.text = ET.CDATA(_DESC_TMPL.format_map({
+        "time_str": time_str,
+        "call_type": record.get("call_type", "N/A"),
+        "direction": record.get("direction", "N/A"),
+        "called_number": record.get("called_number", "N/A"),
+        "duration_seconds": record.get("duration_seconds", 0),
+        "cell_tower_id": record.get("cell_tower_id", "N/A"),
+        "lac": record.get("lac", "N/A"),
+    }))
 
-            pm_description = ET.SubElement(placemark, "description")
-            call_time = record.get("call_start_time")
-            if isinstance(call_time, datetime):
-                time_str = call_time.strftime("%Y-%m-%d %H:%M:%S")
-            else:
-                time_str = str(call_time)
+    _text_element(placemark, "styleUrl", "#markerStyle")
 
-            pm_description.text = f"""
-            <![CDATA[
-            <table>
-                <tr><td><b>Time:</b></td><td>{time_str}</td></tr>
-                <tr><td><b>Type:</b></td><td>{record.get('call_type', 'N/A')}</td></tr>
-                <tr><td><b>Direction:</b></td><td>{record.get('direction', 'N/A')}</td></tr>
-                <tr><td><b>Called:</b></td><td>{record.get('called_number', 'N/A')}</td></tr>
-                <tr><td><b>Duration:</b></td><td>{record.get('duration_seconds', 0)}s</td></tr>
-                <tr><td><b>Cell ID:</b></td><td>{record.get('cell_tower_id', 'N/A')}</td></tr>
-                <tr><td><b>LAC:</b></td><td>{record.get('lac', 'N/A')}</td></tr>
-            </table>
-            ]]>
-            """
+    point = ET.SubElement(placemark, "Point")
+    _text_element(point, "coordinates", f"{lon},{lat},0")
 
-            pm_style = ET.SubElement(placemark, "styleUrl")
-            pm_style.text = "#markerStyle"
-
-            point = ET.SubElement(placemark, "Point")
-            pm_coords = ET.SubElement(point, "coordinates")
-            pm_coords.text = f"{lon},{lat},0"
-
-            # Add timestamp
-            time_span = ET.SubElement(placemark, "TimeSpan")
-            begin = ET.SubElement(time_span, "begin")
-            if isinstance(call_time, datetime):
-                begin.text = call_time.strftime("%Y-%m-%dT%H:%M:%SZ")
-            else:
-                begin.text = str(call_time)
-
-            placemarks.append(placemark)
-
-    # Create path line if we have coordinates
-    if len(coordinates) > 1:
-        path_placemark = ET.SubElement(document, "Placemark")
-        path_name = ET.SubElement(path_placemark, "name")
-        path_name.text = f"Path - {suspect_name}"
-
-        path_style = ET.SubElement(path_placemark, "styleUrl")
-        path_style.text = "#pathStyle"
-
-        line_string = ET.SubElement(path_placemark, "LineString")
-        tessellate = ET.SubElement(line_string, "tessellate")
-        tessellate.text = "1"
-        path_coords = ET.SubElement(line_string, "coordinates")
-        path_coords.text = " ".join(coordinates)
-
-    # Create exports directory
-    exports_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "exports")
-    os.makedirs(exports_dir, exist_ok=True)
-
-    # Save KML file
-    filename = os.path.join(
-        exports_dir,
-        f"{suspect_name}_cdr_path_{datetime.now().strftime('%Y%m%d_%H%M%S')}.kml"
-    )
+    # Add timestamp
+    time_span = ET.SubElement(placemark, "TimeSpan")
+    _text_element(time_span, "begin", begin)
+
+    return placemark
+
+
+def _build_path_placemark(suspect_name: str, coordinates: List[str]):
+    """Placemark drawing the path through every located call"""
+    path_placemark = ET.Element("Placemark")
+    _text_element(path_placemark, "name", f"Path - {suspect_name}")
+    _text_element(path_placemark, "styleUrl", "#pathStyle")
 
-    # Write KML file
-    kml_string = prettify_xml(kml)
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(kml_string)
+    line_string = ET.SubElement(path_placemark, "LineString")
+    _text_element(line_string, "tessellate", "1")
+    _text_element(line_string, "coordinates", " ".join(coordinates))
 
-    return filename
+    return path_placemark
@@ -1,52 +1,68 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query, WebSocket
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.staticfiles import NotModifiedResponse
+from fastapi.responses import ORJSONResponse, FileResponse, Response, StreamingResponse
 from contextlib import asynccontextmanager
 import os
+import asyncio
+import hashlib
+import traceback
+import mimetypes
 from typing import List, Optional
 import json
-from datetime import datetime, date
+from datetime import datetime
+import orjson
+import aiofiles
 
-from database import get_database, test_connection
+from database import get_database, get_suspect_names, test_connection
 from models import CDRRecord
 from cdr_processor import process_cdr_file, detect_format
+from compression import GZipMiddleware, accepts_encoding
+
+# JSON responses are encoded in one pass by orjson, which handles datetime/date natively
+def _json_default(obj):
+    """Encode values orjson does not handle natively"""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # Datetime-like objects (e.g. pandas Timestamp)
+    if hasattr(obj, 'isoformat') and callable(getattr(obj, 'isoformat')):
+        return obj.isoformat()
+    return str(obj)
+
+def _dumps(content) -> bytes:
+    """Encode content with the options shared by every JSON response"""
+    return orjson.dumps(
+        content,
+        default=_json_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+class CDRJSONResponse(ORJSONResponse):
+    """orjson response that also encodes sets and other datetime-like values"""
+    def render(self, content) -> bytes:
+        return _dumps(content)
+
+# Large graph/map payloads can be requested as newline-delimited JSON (?format=ndjson)
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+async def _iter_ndjson(data: dict):
+    """A meta line (scalar fields + list sizes), then one line per list item tagged with its key"""
+    lists = {key: value for key, value in data.items() if isinstance(value, list)}
+    meta = {key: value for key, value in data.items() if key not in lists}
+    yield _dumps({"kind": "meta", **meta, "counts": {key: len(items) for key, items in lists.items()}}) + b"\n"
+    for key, items in lists.items():
+        for item in items:
+            yield _dumps({"kind": key, "data": item}) + b"\n"
+
+def _intelligence_response(data: dict, format: str) -> Response:
+    """Standard JSON envelope, or an NDJSON stream when format=ndjson"""
+    if format == "ndjson":
+        return StreamingResponse(_iter_ndjson(data), media_type=NDJSON_MEDIA_TYPE)
+    return CDRJSONResponse({"success": True, "data": data})
 
-# Helper function to convert datetime objects to strings for JSON serialization
-def convert_datetime_to_str(obj):
-    """Recursively convert datetime objects to ISO format strings"""
-    # Handle datetime objects
-    if isinstance(obj, datetime):
-        try:
-            return obj.isoformat()
-        except Exception:
-            return str(obj)
-    # Handle date objects (but not datetime, since datetime is a subclass of date)
-    elif isinstance(obj, date) and not isinstance(obj, datetime):
-        try:
-            return obj.isoformat()
-        except Exception:
-            return str(obj)
-    # Handle dictionaries
-    elif isinstance(obj, dict):
-        return {key: convert_datetime_to_str(value) for key, value in obj.items()}
-    # Handle lists
-    elif isinstance(obj, list):
-        return [convert_datetime_to_str(item) for item in obj]
-    # Handle tuples
-    elif isinstance(obj, tuple):
-        return tuple(convert_datetime_to_str(item) for item in obj)
-    # Handle sets
-    elif isinstance(obj, set):
-        return {convert_datetime_to_str(item) for item in obj}
-    # Check for datetime-like objects (has isoformat method)
-    elif hasattr(obj, 'isoformat') and callable(getattr(obj, 'isoformat')):
-        try:
-            return obj.isoformat()
-        except Exception:
-            return str(obj)
-    else:
-        return obj
 from analytics import (
     analyze_imei,
     analyze_cell_towers,
@@ -56,24 +72,14 @@ from analytics import (
     find_common_numbers,
     find_common_towers,
     find_common_imei,
+    shutdown_compute_pool,
 )
-from cdr_analytics import (
-    generate_all_analytics,
-    generate_summary,
-    generate_corrected,
-    generate_max_call,
-    generate_max_circle_call,
-    generate_daily_first_last,
-    generate_max_duration,
-    generate_max_imei,
-    generate_daily_imei_tracking,
-    generate_max_location,
-    generate_daily_first_last_location
-)
+from cdr_analytics import ANALYTICS_VIEWS, generate_all_analytics, warm_analytics_cache
 from excel_export import export_to_excel
-from utils import generate_sample_data, export_to_json, export_to_csv
+from paths import FRONTEND_DIR, UPLOADS_DIR, EXPORTS_DIR
+from utils import generate_sample_data, iter_json_export, iter_csv_export, suspect_has_records
 from pdf_export import create_pdf_report
-from kml_export import export_to_kml
+from kml_export import iter_kml_bytes, create_http_client
 from geofencing import router as geofencing_router, manager as geofence_manager
 from intelligence_analytics import (
     generate_intelligence_overview,
@@ -83,12 +89,53 @@ from intelligence_analytics import (
     generate_movement_map,
     generate_colocation_analysis,
     generate_anomalies,
-    generate_audit_trail
+    generate_audit_trail,
+    generate_dashboard
 )
 
-# Create uploads directory (use absolute path)
-uploads_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
-os.makedirs(uploads_dir, exist_ok=True)
+# Uploads are copied to disk in 1 MiB chunks rather than read into memory whole
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Generated PDF/Excel exports are sent in 1 MiB chunks
+EXPORT_FILE_CHUNK_SIZE = 1 << 20
+
+frontend_index = os.path.join(FRONTEND_DIR, "index.html")
+
+# The SPA shell is served from memory with an ETag instead of reopening the file per request
+with open(frontend_index, "rb") as f:
+    FRONTEND_INDEX_BYTES = f.read()
+FRONTEND_INDEX_ETAG = f'"{hashlib.md5(FRONTEND_INDEX_BYTES).hexdigest()}"'
+
+# Text assets are served from .gz sidecars when precompress.py has built them
+SIDECAR_ENCODINGS = (("gzip", ".gz"),)
+
+def _precompressed_file_response(file_path: str, accept_encoding: str, headers: Optional[dict] = None) -> FileResponse:
+    """FileResponse for file_path, swapped for a fresh sidecar the client accepts"""
+    media_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    for encoding, suffix in SIDECAR_ENCODINGS:
+        sidecar = file_path + suffix
+        if accepts_encoding(accept_encoding, encoding) and os.path.isfile(sidecar) \
+                and os.path.getmtime(sidecar) >= os.path.getmtime(file_path):
+            headers["Content-Encoding"] = encoding
+            return FileResponse(sidecar, media_type=media_type, headers=headers)
+    return FileResponse(file_path, media_type=media_type, headers=headers)
+
+class ExportFileResponse(FileResponse):
+    """FileResponse that streams multi-MB PDF/Excel exports in 1 MiB reads instead of 64 KiB"""
+    chunk_size = EXPORT_FILE_CHUNK_SIZE
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that prefers pre-compressed .gz sidecars"""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        response = _precompressed_file_response(str(full_path), request_headers.get("accept-encoding", ""))
+        response.status_code = status_code
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -99,21 +146,27 @@ async def lifespan(app: FastAPI):
         print("✓ MongoDB connection successful")
     except Exception as e:
         print(f"✗ MongoDB connection failed: {e}")
+    # Uploads and generated reports
+    for directory in (UPLOADS_DIR, EXPORTS_DIR):
+        os.makedirs(directory, exist_ok=True)
+    # Keep-alive HTTP client shared by cell tower lookups
+    app.state.http = create_http_client()
     yield
-    # Shutdown (if needed)
-    pass
+    # Shutdown
+    await app.state.http.aclose()
+    shutdown_compute_pool()
 
 app = FastAPI(
     title="CDR Intelligence Platform",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=CDRJSONResponse
 )
 
 app.include_router(geofencing_router, prefix="/api", tags=["geofencing"])
 
 # Mount static files
-frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend")
-app.mount("/static", StaticFiles(directory=frontend_dir), name="static")
+app.mount("/static", PrecompressedStaticFiles(directory=FRONTEND_DIR), name="static")
 
 # CORS middleware
 app.add_middleware(
@@ -125,26 +178,54 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Compress JSON, NDJSON, CSV, KML and text assets for clients that accept gzip; xlsx/pdf
+# exports and pre-compressed static sidecars pass through untouched
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+# CORS headers for error responses, which may bypass CORSMiddleware
+ERROR_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "*",
+    "Access-Control-Allow-Headers": "*",
+}
+
 # Add exception handler for HTTPException to ensure CORS headers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc: HTTPException):
     """HTTP exception handler to ensure CORS headers are always present"""
-    return JSONResponse(
+    return CDRJSONResponse(
         content={"success": False, "error": exc.detail},
         status_code=exc.status_code,
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "*",
-            "Access-Control-Allow-Headers": "*",
-        }
+        headers=ERROR_CORS_HEADERS
     )
 
+# Turn any unhandled endpoint error into the same JSON error envelope with a 500
+@app.middleware("http")
+async def unhandled_exception_middleware(request, call_next):
+    """Log unhandled exceptions and return them as a JSON 500 response"""
+    try:
+        return await call_next(request)
+    except Exception as e:
+        print(f"Error handling {request.method} {request.url.path}: {e}")
+        print(traceback.format_exc())
+        return CDRJSONResponse(
+            content={"success": False, "error": str(e)},
+            status_code=500,
+            headers=ERROR_CORS_HEADERS
+        )
+
+def _index_response(request: Request) -> Response:
+    """Cached index.html, or 304 when the client already holds this version"""
+    headers = {"ETag": FRONTEND_INDEX_ETAG, "Cache-Control": "public, max-age=60"}
+    if request.headers.get("if-none-match") == FRONTEND_INDEX_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(FRONTEND_INDEX_BYTES, media_type="text/html", headers=headers)
+
 # Serve frontend files
 @app.get("/", include_in_schema=False)
-async def serve_frontend():
+async def serve_frontend(request: Request):
     """Serve the frontend index.html"""
-    frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend")
-    return FileResponse(os.path.join(frontend_dir, "index.html"))
+    return _index_response(request)
 
 @app.get("/health")
 async def health_check():
@@ -163,13 +244,28 @@ async def health_check():
             "timestamp": datetime.utcnow().isoformat()
         }
 
+# Background analytics runs started by uploads, referenced until they finish
+_analytics_tasks = set()
+
+async def _warm_and_broadcast_analytics(session_id: str, suspect_name: Optional[str]):
+    """Precompute (and cache) a new session's analytics, then notify WebSocket clients"""
+    try:
+        await warm_analytics_cache(session_id=session_id, suspect_name=suspect_name)
+        event = {"event": "analytics_ready", "session_id": session_id, "suspect_name": suspect_name}
+    except Exception as analytics_error:
+        # If analytics generation fails, the upload itself still stands
+        print(f"Analytics generation error: {analytics_error}")
+        traceback.print_exc()
+        event = {"event": "analytics_failed", "session_id": session_id, "error": str(analytics_error)}
+    await geofence_manager.broadcast(orjson.dumps(event).decode())
+
 @app.post("/api/upload")
 async def upload_cdr(
     file: UploadFile = File(...),
     suspect_name: Optional[str] = None,
     auto_detect: bool = True
 ):
-    """Upload and process CDR file - auto-analyzes and returns results"""
+    """Upload and process CDR file - analytics are generated in the background"""
     try:
         # Validate file
         if not file.filename:
@@ -185,58 +281,40 @@ async def upload_cdr(
             )
 
         # Save uploaded file (use absolute path)
-        uploads_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "uploads")
-        os.makedirs(uploads_dir, exist_ok=True)
-        file_path = os.path.join(uploads_dir, file.filename)
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        file_path = os.path.join(UPLOADS_DIR, file.filename)
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await f.write(chunk)
 
         # Detect format if auto_detect is enabled
         format_info = None
         if auto_detect:
             format_info = await detect_format(file_path)
 
-        # Process CDR file
+        # Process CDR file; inserts are acknowledged, so the analytics warm below sees every record
         result = await process_cdr_file(file_path, suspect_name, format_info, geofence_manager)
 
-        # Auto-generate analytics
+        # Auto-generate analytics in the background; clients are notified over the WebSocket
         session_id = result.get("session_id")
-        try:
-            analytics = await generate_all_analytics(session_id=session_id, suspect_name=suspect_name)
-            analytics = convert_datetime_to_str(analytics)
-        except Exception as analytics_error:
-            # If analytics generation fails, return empty analytics but don't fail the upload
-            print(f"Analytics generation error: {analytics_error}")
-            import traceback
-            traceback.print_exc()
-            analytics = {}
-
-        # Convert result dictionary as well (might contain datetime objects)
-        result_clean = convert_datetime_to_str(result)
-
-        # Convert format_info as well (might contain datetime objects)
-        format_info_clean = convert_datetime_to_str(format_info) if format_info else None
+        task = asyncio.create_task(_warm_and_broadcast_analytics(session_id, suspect_name))
+        _analytics_tasks.add(task)
+        task.add_done_callback(_analytics_tasks.discard)
 
         response = {
             "success": True,
-            "message": f"Processed {result_clean.get('records_inserted', 0)} records",
+            "status": "processing",
+            "message": f"Processed {result.get('records_inserted', 0)} records",
             "session_id": session_id,
-            "suspect_name": result_clean.get("suspect_name"),
-            "format_detected": format_info_clean,
-            "records_inserted": result_clean.get("records_inserted", 0),
-            "analytics": analytics  # Include analytics in response
+            "suspect_name": result.get("suspect_name"),
+            "format_detected": format_info or None,
+            "records_inserted": result.get("records_inserted", 0)
         }
 
-        # Ensure entire response is JSON serializable (double-check)
-        response = convert_datetime_to_str(response)
-
-        # Use JSONResponse to ensure proper serialization
-        return JSONResponse(content=response)
+        # orjson encodes datetimes in the detected format directly
+        return CDRJSONResponse(content=response, status_code=202)
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
         error_detail = str(e)
         print(f"Upload error: {error_detail}")
         print(traceback.format_exc())
@@ -255,20 +333,14 @@ async def upload_cdr(
 @app.get("/api/cdr/format-detect")
 async def detect_file_format(file_path: str):
     """Detect CDR file format"""
-    try:
-        format_info = await detect_format(file_path)
-        return {"success": True, "format": format_info}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    format_info = await detect_format(file_path)
+    return {"success": True, "format": format_info}
 
 @app.get("/api/analytics/single/imei")
 async def get_imei_analysis(suspect_name: str):
     """Get IMEI analysis for a single suspect"""
-    try:
-        result = await analyze_imei(suspect_name)
-        return {"success": True, "data": result}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await analyze_imei(suspect_name)
+    return {"success": True, "data": result}
 
 @app.get("/api/analytics/single/cell-towers")
 async def get_cell_tower_analysis(
@@ -277,523 +349,422 @@ async def get_cell_tower_analysis(
     end_date: Optional[str] = None
 ):
     """Get cell tower analysis for a single suspect with optional date filters"""
-    try:
-        from datetime import datetime
-        start_dt = datetime.fromisoformat(start_date) if start_date else None
-        end_dt = datetime.fromisoformat(end_date) if end_date else None
-        result = await analyze_cell_towers(suspect_name, start_dt, end_dt)
-        return {"success": True, "data": result}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    start_dt = datetime.fromisoformat(start_date) if start_date else None
+    end_dt = datetime.fromisoformat(end_date) if end_date else None
+    result = await analyze_cell_towers(suspect_name, start_dt, end_dt)
+    return {"success": True, "data": result}
 
 @app.get("/api/analytics/single/contacts")
 async def get_contact_analysis(suspect_name: str):
     """Get contact analysis for a single suspect"""
-    try:
-        result = await analyze_contacts(suspect_name)
-        return JSONResponse(
-            content={"success": True, "data": result},
-            status_code=200
-        )
-    except Exception as e:
-        import traceback
-        error_detail = str(e)
-        print(f"Error in contact analysis: {error_detail}")
-        print(traceback.format_exc())
-        return JSONResponse(
-            content={"success": False, "error": error_detail},
-            status_code=500
-        )
+    result = await analyze_contacts(suspect_name)
+    return CDRJSONResponse(
+        content={"success": True, "data": result},
+        status_code=200
+    )
 
 @app.get("/api/analytics/single/sms-services")
 async def get_sms_analysis(suspect_name: str):
     """Get SMS service detection for a single suspect"""
-    try:
-        result = await analyze_sms_services(suspect_name)
-        return {"success": True, "data": result}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await analyze_sms_services(suspect_name)
+    return {"success": True, "data": result}
 
 @app.get("/api/analytics/single/international")
 async def get_international_analysis(suspect_name: str):
     """Get international calls analysis for a single suspect"""
-    try:
-        result = await analyze_international_calls(suspect_name)
-        return {"success": True, "data": result}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await analyze_international_calls(suspect_name)
+    return {"success": True, "data": result}
 
 @app.get("/api/analytics/multiple/common-numbers")
 async def get_common_numbers(suspect_names: List[str] = Query(...)):
     """Get common numbers network graph for multiple suspects"""
-    try:
-        result = await find_common_numbers(suspect_names)
-        return {"success": True, "data": result}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await find_common_numbers(suspect_names)
+    return {"success": True, "data": result}
 
 @app.get("/api/analytics/multiple/common-towers")
 async def get_common_towers(suspect_names: List[str] = Query(...)):
     """Get common cell towers map for multiple suspects"""
-    try:
-        result = await find_common_towers(suspect_names)
-        return {"success": True, "data": result}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await find_common_towers(suspect_names)
+    return {"success": True, "data": result}
 
 @app.get("/api/analytics/multiple/common-imei")
 async def get_common_imei(suspect_names: List[str] = Query(...)):
     """Get common IMEI devices for multiple suspects"""
-    try:
-        result = await find_common_imei(suspect_names)
-        return {"success": True, "data": result}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await find_common_imei(suspect_names)
+    return {"success": True, "data": result}
 
 @app.get("/api/suspects")
 async def get_all_suspects():
     """Get list of all suspects in database"""
-    try:
-        db = await get_database()
-        suspects = await db.cdr_records.distinct("suspect_name")
-        return {"success": True, "suspects": [s for s in suspects if s]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    suspects = await get_suspect_names()
+    return {"success": True, "suspects": suspects}
 
 @app.get("/api/export")
 async def export_data(format: str = "json", session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Export data to JSON, CSV, KML, or Excel"""
-    try:
-        identifier = session_id or suspect_name or "cdr"
-        if format.lower() == "csv":
-            file_path = await export_to_csv(suspect_name or identifier)
-            return FileResponse(
-                file_path,
-                media_type="text/csv",
-                filename=f"{identifier}_cdr_export.csv"
-            )
-        elif format.lower() == "kml":
-            api_key = os.getenv("OPENCELLID_API_KEY")
-            file_path = await export_to_kml(suspect_name or identifier, api_key)
-            return FileResponse(
-                file_path,
-                media_type="application/vnd.google-earth.kml+xml",
-                filename=f"{identifier}_cdr_path.kml"
-            )
-        elif format.lower() == "excel" or format.lower() == "xlsx":
-            file_path = await export_to_excel(session_id=session_id, suspect_name=suspect_name)
-            return FileResponse(
-                file_path,
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                filename=f"{identifier}_cdr_analysis.xlsx"
-            )
-        else:
-            file_path = await export_to_json(suspect_name or identifier)
-            return FileResponse(
-                file_path,
-                media_type="application/json",
-                filename=f"{identifier}_cdr_export.json"
-            )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    identifier = session_id or suspect_name or "cdr"
+    export_suspect = suspect_name or identifier
+    # CSV, KML and JSON exports are streamed as they are generated instead of written to exports/ first
+    if format.lower() == "csv":
+        if not await suspect_has_records(export_suspect):
+            raise HTTPException(status_code=404, detail=f"No records found for suspect: {export_suspect}")
+        return StreamingResponse(
+            iter_csv_export(export_suspect),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{identifier}_cdr_export.csv"'}
+        )
+    elif format.lower() == "kml":
+        if not await suspect_has_records(export_suspect):
+            raise HTTPException(status_code=404, detail=f"No records found for suspect: {export_suspect}")
+        api_key = os.getenv("OPENCELLID_API_KEY")
+        return StreamingResponse(
+            iter_kml_bytes(export_suspect, api_key, client=app.state.http),
+            media_type="application/vnd.google-earth.kml+xml",
+            headers={"Content-Disposition": f'attachment; filename="{identifier}_cdr_path.kml"'}
+        )
+    elif format.lower() == "excel" or format.lower() == "xlsx":
+        file_path = await export_to_excel(session_id=session_id, suspect_name=suspect_name)
+        return ExportFileResponse(
+            file_path,
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            filename=f"{identifier}_cdr_analysis.xlsx"
+        )
+    else:
+        return StreamingResponse(
+            iter_json_export(export_suspect),
+            media_type="application/json",
+            headers={"Content-Disposition": f'attachment; filename="{identifier}_cdr_export.json"'}
+        )
 
 @app.post("/api/utils/generate-sample")
 async def generate_sample(suspect_name: str, record_count: int = 100):
     """Generate sample CDR data"""
-    try:
-        result = await generate_sample_data(suspect_name, record_count)
-        return {
-            "success": True,
-            "message": f"Generated {result} sample records",
-            "records_generated": result
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    result = await generate_sample_data(suspect_name, record_count)
+    return {
+        "success": True,
+        "message": f"Generated {result} sample records",
+        "records_generated": result
+    }
 
 # Comprehensive CDR Analytics Endpoints
 @app.get("/api/analytics/comprehensive")
 async def get_comprehensive_analytics(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get all 10 analytical views at once"""
-    try:
-        analytics = await generate_all_analytics(session_id=session_id, suspect_name=suspect_name)
-        analytics = convert_datetime_to_str(analytics)
-        return {"success": True, "data": analytics}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    analytics = await generate_all_analytics(session_id=session_id, suspect_name=suspect_name)
+    return CDRJSONResponse({"success": True, "data": analytics})
 
 @app.get("/api/analytics/comprehensive/{identifier}")
 async def get_comprehensive_analytics_by_id(identifier: str):
     """Get all 10 analytical views by session_id or suspect_name"""
-    try:
-        # Try as session_id first, fallback to suspect_name
-        analytics = await generate_all_analytics(session_id=identifier, suspect_name=identifier)
-        analytics = convert_datetime_to_str(analytics)
-        return {"success": True, "data": analytics}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Try as session_id first, fallback to suspect_name
+    analytics = await generate_all_analytics(session_id=identifier, suspect_name=identifier)
+    return CDRJSONResponse({"success": True, "data": analytics})
+
+# URL slug of each single-view endpoint -> view name in ANALYTICS_VIEWS
+ANALYTICS_VIEW_SLUGS = {
+    "summary": "Summary",
+    "corrected": "Corrected",
+    "max-call": "MaxCall",
+    "max-circle-call": "MaxCircleCall",
+    "daily-first-last": "DailyFirstLast",
+    "max-duration": "MaxDuration",
+    "max-imei": "MaxIMEI",
+    "daily-imei-tracking": "DailyIMEIATracking",
+    "max-location": "MaxLocation",
+    "daily-first-last-location": "DailyFirstLastLocation"
+}
+
+@app.get("/api/analytics/view/{view}")
+async def get_analytics_view(view: str, session_id: Optional[str] = None, suspect_name: Optional[str] = None):
+    """Get a single analytical view by its URL slug"""
+    view_name = ANALYTICS_VIEW_SLUGS.get(view)
+    if not view_name:
+        raise HTTPException(status_code=404, detail=f"Unknown analytics view: {view}")
+    data = await ANALYTICS_VIEWS[view_name](session_id=session_id, suspect_name=suspect_name)
+    return CDRJSONResponse({"success": True, "data": data})
 
 @app.get("/api/analytics/summary")
 async def get_summary(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get Summary analytics"""
-    try:
-        data = await generate_summary(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return JSONResponse(content={"success": True, "data": data})
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await get_analytics_view("summary", session_id=session_id, suspect_name=suspect_name)
 
 @app.get("/api/analytics/corrected")
 async def get_corrected(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get Corrected dataset"""
-    try:
-        data = await generate_corrected(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await get_analytics_view("corrected", session_id=session_id, suspect_name=suspect_name)
 
 @app.get("/api/analytics/max-call")
 async def get_max_call(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get MaxCall analytics"""
-    try:
-        data = await generate_max_call(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await get_analytics_view("max-call", session_id=session_id, suspect_name=suspect_name)
 
 @app.get("/api/analytics/max-circle-call")
 async def get_max_circle_call(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get MaxCircleCall analytics"""
-    try:
-        data = await generate_max_circle_call(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await get_analytics_view("max-circle-call", session_id=session_id, suspect_name=suspect_name)
 
 @app.get("/api/analytics/daily-first-last")
 async def get_daily_first_last(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get DailyFirstLast analytics"""
-    try:
-        data = await generate_daily_first_last(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await get_analytics_view("daily-first-last", session_id=session_id, suspect_name=suspect_name)
 
 @app.get("/api/analytics/max-duration")
 async def get_max_duration(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get MaxDuration analytics"""
-    try:
-        data = await generate_max_duration(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await get_analytics_view("max-duration", session_id=session_id, suspect_name=suspect_name)
 
 @app.get("/api/analytics/max-imei")
 async def get_max_imei(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get MaxIMEI analytics"""
-    try:
-        data = await generate_max_imei(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await get_analytics_view("max-imei", session_id=session_id, suspect_name=suspect_name)
 
 @app.get("/api/analytics/daily-imei-tracking")
 async def get_daily_imei_tracking(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get DailyIMEIATracking analytics"""
-    try:
-        data = await generate_daily_imei_tracking(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await get_analytics_view("daily-imei-tracking", session_id=session_id, suspect_name=suspect_name)
 
 @app.get("/api/analytics/max-location")
 async def get_max_location(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get MaxLocation analytics"""
-    try:
-        data = await generate_max_location(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await get_analytics_view("max-location", session_id=session_id, suspect_name=suspect_name)
 
 @app.get("/api/analytics/daily-first-last-location")
 async def get_daily_first_last_location(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get DailyFirstLastLocation analytics"""
-    try:
-        data = await generate_daily_first_last_location(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return await get_analytics_view("daily-first-last-location", session_id=session_id, suspect_name=suspect_name)
+
+async def _gather_report_sections(suspect_name: str) -> List[dict]:
+    """Run the per-suspect PDF analyses concurrently; a failed analysis yields an empty section"""
+    results = await asyncio.gather(
+        analyze_imei(suspect_name),
+        analyze_cell_towers(suspect_name),
+        analyze_contacts(suspect_name),
+        analyze_sms_services(suspect_name),
+        analyze_international_calls(suspect_name),
+        return_exceptions=True
+    )
+    sections = []
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"PDF report analysis error for {suspect_name}: {result}")
+            result = {}
+        sections.append(result)
+    return sections
 
 @app.get("/api/export-pdf-session")
 async def export_pdf_report_session(session_id: Optional[str] = None):
     """Export comprehensive PDF report for session with all analysis tabs"""
-    try:
-        if not session_id:
-            raise HTTPException(status_code=400, detail="session_id is required")
-
-        # Generate all analytics for the session
-        from cdr_analytics import generate_all_analytics
-        all_analytics = await generate_all_analytics(session_id=session_id)
-
-        # Get summary data
-        summary_data = all_analytics.get("Summary", {})
-
-        # Calculate additional statistics
-        from database import get_database
-        db = await get_database()
-
-        total_records = summary_data.get("total_calls", 0)
-        date_range = f"{summary_data.get('first_activity_date', 'N/A')} to {summary_data.get('last_activity_date', 'N/A')}"
-
-        # Get IMEI, towers, contacts, SMS, and international data if available
-        # For session-based, we'll use the analytics data we already have
-        imei_data = {}
-        towers_data = {}
-        contacts_data = {}
-        sms_data = {}
-        intl_data = {}
-
-        # Try to get suspect name from session to fetch detailed analytics
-        session_record = await db.cdr_records.find_one({"session_id": session_id})
-        suspect_name = session_record.get("suspect_name") if session_record else None
-
-        if suspect_name:
-            try:
-                imei_data = await analyze_imei(suspect_name)
-                towers_data = await analyze_cell_towers(suspect_name)
-                contacts_data = await analyze_contacts(suspect_name)
-                sms_data = await analyze_sms_services(suspect_name)
-                intl_data = await analyze_international_calls(suspect_name)
-            except:
-                pass  # If detailed analytics fail, use summary data only
-
-        # Calculate total duration
-        duration_pipeline = [
-            {"$match": {"session_id": session_id}},
-            {"$group": {
-                "_id": None,
-                "total_duration": {"$sum": "$duration_seconds"}
-            }}
-        ]
-        duration_result = await db.cdr_records.aggregate(duration_pipeline).to_list(length=1)
-        total_duration_hours = (duration_result[0].get('total_duration', 0) or 0) / 3600 if duration_result else 0
-
-        unique_contacts = len(contacts_data.get('most_called', [])) if contacts_data else summary_data.get("unique_b_numbers", 0)
-
-        analytics_data = {
-            "summary": {
-                "total_records": total_records,
-                "date_range": date_range,
-                "unique_contacts": unique_contacts,
-                "total_duration_hours": total_duration_hours,
-                "unique_imeis": summary_data.get("unique_imeis", 0),
-                "unique_towers": summary_data.get("unique_locations", 0)
-            },
-            "imei": imei_data,
-            "towers": towers_data,
-            "contacts": contacts_data,
-            "sms": sms_data,
-            "international": intl_data
-        }
-
-        # Create PDF
-        exports_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "exports")
-        os.makedirs(exports_dir, exist_ok=True)
-        pdf_path = os.path.join(exports_dir, f"session_{session_id}_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-
-        report_name = f"Session {session_id}" if not suspect_name else suspect_name
-        create_pdf_report(report_name, analytics_data, pdf_path)
-
-        return FileResponse(
-            pdf_path,
-            media_type="application/pdf",
-            filename=f"cdr_analysis_{session_id}_report.pdf"
-        )
-    except Exception as e:
-        import traceback
-        print(f"Error generating PDF: {e}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=str(e))
+    if not session_id:
+        raise HTTPException(status_code=400, detail="session_id is required")
+
+    db = await get_database()
+
+    # One pass over the session yields its suspect name and total duration
+    session_pipeline = [
+        {"$match": {"session_id": session_id}},
+        {"$group": {
+            "_id": None,
+            "suspect_name": {"$first": "$suspect_name"},
+            "total_duration": {"$sum": "$duration_seconds"}
+        }}
+    ]
+
+    # Generate all analytics for the session alongside the session statistics
+    all_analytics, session_result = await asyncio.gather(
+        generate_all_analytics(session_id=session_id),
+        db.cdr_records.aggregate(session_pipeline).to_list(length=1)
+    )
+    session_stats = session_result[0] if session_result else {}
+
+    # Get summary data
+    summary_data = all_analytics.get("Summary", {})
+
+    total_records = summary_data.get("total_calls", 0)
+    date_range = f"{summary_data.get('first_activity_date', 'N/A')} to {summary_data.get('last_activity_date', 'N/A')}"
+    total_duration_hours = (session_stats.get('total_duration', 0) or 0) / 3600
+
+    # Get IMEI, towers, contacts, SMS, and international data if available
+    # For session-based, we'll use the analytics data we already have
+    imei_data = {}
+    towers_data = {}
+    contacts_data = {}
+    sms_data = {}
+    intl_data = {}
+
+    # Use the session's suspect name to fetch detailed analytics
+    suspect_name = session_stats.get("suspect_name")
+
+    if suspect_name:
+        # If a detailed analysis fails, its section falls back to summary data only
+        imei_data, towers_data, contacts_data, sms_data, intl_data = await _gather_report_sections(suspect_name)
+
+    unique_contacts = len(contacts_data.get('most_called', [])) if contacts_data else summary_data.get("unique_b_numbers", 0)
+
+    analytics_data = {
+        "summary": {
+            "total_records": total_records,
+            "date_range": date_range,
+            "unique_contacts": unique_contacts,
+            "total_duration_hours": total_duration_hours,
+            "unique_imeis": summary_data.get("unique_imeis", 0),
+            "unique_towers": summary_data.get("unique_locations", 0)
+        },
+        "imei": imei_data,
+        "towers": towers_data,
+        "contacts": contacts_data,
+        "sms": sms_data,
+        "international": intl_data
+    }
+
+    # Create PDF
+    pdf_path = os.path.join(EXPORTS_DIR, f"session_{session_id}_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+
+    report_name = f"Session {session_id}" if not suspect_name else suspect_name
+    await asyncio.to_thread(create_pdf_report, report_name, analytics_data, pdf_path)
+
+    return ExportFileResponse(
+        pdf_path,
+        media_type="application/pdf",
+        filename=f"cdr_analysis_{session_id}_report.pdf"
+    )
 
 @app.get("/api/export-pdf/{suspect_name}")
 async def export_pdf_report(suspect_name: str):
     """Export comprehensive PDF report for suspect"""
-    try:
-        # Gather all analytics data
-        imei_data = await analyze_imei(suspect_name)
-        towers_data = await analyze_cell_towers(suspect_name)
-        contacts_data = await analyze_contacts(suspect_name)
-        sms_data = await analyze_sms_services(suspect_name)
-        intl_data = await analyze_international_calls(suspect_name)
-
-        # Calculate summary statistics
-        from database import get_database
-        db = await get_database()
-
-        total_records = await db.cdr_records.count_documents({"suspect_name": suspect_name})
-
-        date_pipeline = [
-            {"$match": {"suspect_name": suspect_name}},
-            {"$group": {
-                "_id": None,
-                "min_date": {"$min": "$call_start_time"},
-                "max_date": {"$max": "$call_start_time"},
-                "total_duration": {"$sum": "$duration_seconds"}
-            }}
-        ]
-        date_result = await db.cdr_records.aggregate(date_pipeline).to_list(length=1)
-
-        date_range = "N/A"
-        total_duration_hours = 0
-        if date_result:
-            min_date = date_result[0].get('min_date')
-            max_date = date_result[0].get('max_date')
-            if min_date and max_date:
-                date_range = f"{min_date.strftime('%Y-%m-%d')} to {max_date.strftime('%Y-%m-%d')}"
-            total_duration_hours = (date_result[0].get('total_duration', 0) or 0) / 3600
-
-        unique_contacts = len(contacts_data.get('most_called', []))
-
-        analytics_data = {
-            "summary": {
-                "total_records": total_records,
-                "date_range": date_range,
-                "unique_contacts": unique_contacts,
-                "total_duration_hours": total_duration_hours,
-                "unique_imeis": imei_data.get('unique_imeis', 0),
-                "unique_towers": towers_data.get('unique_towers', 0)
-            },
-            "imei": imei_data,
-            "towers": towers_data,
-            "contacts": contacts_data,
-            "sms": sms_data,
-            "international": intl_data
-        }
-
-        # Create PDF
-        exports_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "exports")
-        os.makedirs(exports_dir, exist_ok=True)
-        pdf_path = os.path.join(exports_dir, f"{suspect_name}_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-
-        create_pdf_report(suspect_name, analytics_data, pdf_path)
+    db = await get_database()
+
+    date_pipeline = [
+        {"$match": {"suspect_name": suspect_name}},
+        {"$group": {
+            "_id": None,
+            "min_date": {"$min": "$call_start_time"},
+            "max_date": {"$max": "$call_start_time"},
+            "total_duration": {"$sum": "$duration_seconds"},
+            "count": {"$sum": 1}
+        }}
+    ]
+
+    # Gather all analytics data and summary statistics concurrently
+    (imei_data, towers_data, contacts_data, sms_data, intl_data), date_result = await asyncio.gather(
+        _gather_report_sections(suspect_name),
+        db.cdr_records.aggregate(date_pipeline).to_list(length=1)
+    )
 
-        return FileResponse(
-            pdf_path,
-            media_type="application/pdf",
-            filename=f"{suspect_name}_cdr_report.pdf"
-        )
-    except Exception as e:
-        import traceback
-        print(f"Error generating PDF: {e}")
-        print(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=str(e))
+    date_range = "N/A"
+    total_records = 0
+    total_duration_hours = 0
+    if date_result:
+        total_records = date_result[0].get('count', 0)
+        min_date = date_result[0].get('min_date')
+        max_date = date_result[0].get('max_date')
+        if min_date and max_date:
+            date_range = f"{min_date.strftime('%Y-%m-%d')} to {max_date.strftime('%Y-%m-%d')}"
+        total_duration_hours = (date_result[0].get('total_duration', 0) or 0) / 3600
+
+    unique_contacts = len(contacts_data.get('most_called', []))
+
+    analytics_data = {
+        "summary": {
+            "total_records": total_records,
+            "date_range": date_range,
+            "unique_contacts": unique_contacts,
+            "total_duration_hours": total_duration_hours,
+            "unique_imeis": imei_data.get('unique_imeis', 0),
+            "unique_towers": towers_data.get('unique_towers', 0)
+        },
+        "imei": imei_data,
+        "towers": towers_data,
+        "contacts": contacts_data,
+        "sms": sms_data,
+        "international": intl_data
+    }
+
+    # Create PDF
+    pdf_path = os.path.join(EXPORTS_DIR, f"{suspect_name}_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+
+    await asyncio.to_thread(create_pdf_report, suspect_name, analytics_data, pdf_path)
+
+    return ExportFileResponse(
+        pdf_path,
+        media_type="application/pdf",
+        filename=f"{suspect_name}_cdr_report.pdf"
+    )
 
 # Intelligence-Grade Analytics Endpoints
 @app.get("/api/analytics/intelligence/overview")
 async def get_intelligence_overview(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get intelligence overview with KPIs, story, and alerts"""
-    try:
-        data = await generate_intelligence_overview(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = await generate_intelligence_overview(session_id=session_id, suspect_name=suspect_name)
+    return CDRJSONResponse({"success": True, "data": data})
 
 @app.get("/api/analytics/intelligence/network")
-async def get_intelligence_network(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
+async def get_intelligence_network(session_id: Optional[str] = None, suspect_name: Optional[str] = None, format: str = "json"):
     """Get contact network graph"""
-    try:
-        data = await generate_contact_network(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = await generate_contact_network(session_id=session_id, suspect_name=suspect_name)
+    return _intelligence_response(data, format)
 
 @app.get("/api/analytics/intelligence/timeline")
-async def get_intelligence_timeline(session_id: Optional[str] = None, suspect_name: Optional[str] = None, call_type: str = "all"):
+async def get_intelligence_timeline(session_id: Optional[str] = None, suspect_name: Optional[str] = None, call_type: str = "all", format: str = "json"):
     """Get temporal activity heatmap"""
-    try:
-        data = await generate_temporal_heatmap(session_id=session_id, suspect_name=suspect_name, call_type=call_type)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = await generate_temporal_heatmap(session_id=session_id, suspect_name=suspect_name, call_type=call_type)
+    return _intelligence_response(data, format)
 
 @app.get("/api/analytics/intelligence/imei")
 async def get_intelligence_imei(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get IMEI switch timeline"""
-    try:
-        data = await generate_imei_timeline(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = await generate_imei_timeline(session_id=session_id, suspect_name=suspect_name)
+    return CDRJSONResponse({"success": True, "data": data})
 
 @app.get("/api/analytics/intelligence/location")
-async def get_intelligence_location(session_id: Optional[str] = None, suspect_name: Optional[str] = None, layer: str = "day"):
+async def get_intelligence_location(session_id: Optional[str] = None, suspect_name: Optional[str] = None, layer: str = "day", format: str = "json"):
     """Get geo-spatial movement map"""
-    try:
-        data = await generate_movement_map(session_id=session_id, suspect_name=suspect_name, layer=layer)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = await generate_movement_map(session_id=session_id, suspect_name=suspect_name, layer=layer)
+    return _intelligence_response(data, format)
 
 @app.get("/api/analytics/intelligence/colocation")
 async def get_intelligence_colocation(session_id: Optional[str] = None, suspect_name: Optional[str] = None, window_minutes: int = 15):
     """Get co-location analysis"""
-    try:
-        data = await generate_colocation_analysis(session_id=session_id, suspect_name=suspect_name, window_minutes=window_minutes)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = await generate_colocation_analysis(session_id=session_id, suspect_name=suspect_name, window_minutes=window_minutes)
+    return CDRJSONResponse({"success": True, "data": data})
 
 @app.get("/api/analytics/intelligence/anomalies")
 async def get_intelligence_anomalies(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get anomaly detection results"""
-    try:
-        data = await generate_anomalies(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = await generate_anomalies(session_id=session_id, suspect_name=suspect_name)
+    return CDRJSONResponse({"success": True, "data": data})
 
 @app.get("/api/analytics/intelligence/audit")
 async def get_intelligence_audit(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
     """Get forensic audit trail"""
-    try:
-        data = await generate_audit_trail(session_id=session_id, suspect_name=suspect_name)
-        data = convert_datetime_to_str(data)
-        return {"success": True, "data": data}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    data = await generate_audit_trail(session_id=session_id, suspect_name=suspect_name)
+    return CDRJSONResponse({"success": True, "data": data})
 
-# Catch-all route for frontend files (must be after all API routes)
-@app.get("/{path:path}", include_in_schema=False)
-async def serve_frontend_files(path: str):
-    """Serve frontend static files"""
-    # Don't serve API routes through this catch-all
-    if path.startswith("api"):
-        raise HTTPException(status_code=404, detail="Not found")
+@app.get("/api/analytics/intelligence/dashboard")
+async def get_intelligence_dashboard(session_id: Optional[str] = None, suspect_name: Optional[str] = None):
+    """Get all intelligence views in one request"""
+    data = await generate_dashboard(session_id=session_id, suspect_name=suspect_name)
+    return CDRJSONResponse({"success": True, "data": data})
 
-    frontend_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "frontend")
-    file_path = os.path.join(frontend_dir, path)
+# Frontend files at the site root (must be after all API routes)
+class FrontendStaticFiles(PrecompressedStaticFiles):
+    """Frontend assets, falling back to index.html for client-side routes"""
 
-    # If file exists, serve it
-    if os.path.exists(file_path) and os.path.isfile(file_path):
-        return FileResponse(file_path)
+    async def get_response(self, path: str, scope):
+        try:
+            return await super().get_response(path, scope)
+        except StarletteHTTPException as exc:
+            if exc.status_code != 404:
+                raise
+        # Don't serve the SPA shell for unknown API routes
+        if path.startswith("api"):
+            return CDRJSONResponse(
+                content={"success": False, "error": "Not found"},
+                status_code=404,
+                headers=ERROR_CORS_HEADERS
+            )
+        return _index_response(Request(scope))
 
-    # Otherwise, serve index.html for client-side routing
-    return FileResponse(os.path.join(frontend_dir, "index.html"))
+app.mount("/", FrontendStaticFiles(directory=FRONTEND_DIR), name="frontend")
 
 if __name__ == "__main__":
     import uvicorn
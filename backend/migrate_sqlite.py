@@ -7,32 +7,96 @@ Migrates CDR data from SQLite database to MongoDB
 import sqlite3
 import asyncio
 import sys
+import pandas as pd
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
+from pymongo.errors import BulkWriteError
 from database import get_database
-from models import CDRRecord, CallType, CallDirection, CallStatus
+from models import CallType, CallDirection, CallStatus
+
+# Accepted ISO-like layouts; strptime also takes the loose variants (e.g. single-digit fields)
+ISO_DATETIME_FORMATS = ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S")
+
+# Day-first wins for ambiguous slash dates, so this order is fixed
+SLASH_DATETIME_FORMATS = ("%d/%m/%Y %H:%M:%S", "%m/%d/%Y %H:%M:%S")
+
+def _strptime_any(value: str, formats) -> Optional[datetime]:
+    """Return the first successful strptime parse"""
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+def _is_iso_layout(value: str) -> bool:
+    """Whether value has one of the ISO_DATETIME_FORMATS layouts with zero-padded fields
+    (fromisoformat alone would also take date-only values, offsets and "T" with fractions)"""
+    if len(value) < 19 or value[4] != '-' or value[7] != '-' or value[13] != ':' or value[16] != ':':
+        return False
+    if len(value) == 19:
+        return value[10] in ' T'
+    # Fractions of 1-6 digits, space-separated only
+    return 21 <= len(value) <= 26 and value[10] == ' ' and value[19] == '.'
 
 def parse_datetime(value) -> Optional[datetime]:
     """Parse datetime from various formats"""
-    if value is None:
+    if not isinstance(value, str):
         return None
 
-    if isinstance(value, str):
-        formats = [
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%d %H:%M:%S.%f",
-            "%d/%m/%Y %H:%M:%S",
-            "%m/%d/%Y %H:%M:%S"
-        ]
-
-        for fmt in formats:
-            try:
-                return datetime.strptime(value, fmt)
-            except:
-                continue
-
-    return None
+    # The common zero-padded ISO layouts go through the C-implemented fromisoformat; naive results only
+    if _is_iso_layout(value):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            parsed = None
+        if parsed is not None and parsed.tzinfo is None:
+            return parsed
+
+    # Every ISO format has dashes and no slash format does, so only one family is tried
+    return _strptime_any(value, ISO_DATETIME_FORMATS if '-' in value else SLASH_DATETIME_FORMATS)
+
+# Documents per insert_many call; ~5000 CDR documents stay well under the 16 MB batch limit
+MIGRATION_BATCH_SIZE = 5000
+
+# Batches buffered between the SQLite reader and the inserts, and inserts kept in flight
+MIGRATION_QUEUE_SIZE = 2
+MIGRATION_INSERT_WORKERS = 4
+
+# Identifier columns SQLite may hand back as numbers
+STRING_FIELDS = ('calling_number', 'called_number', 'cell_tower_id', 'imei', 'imsi', 'sms_content')
+
+# Columns coerced to float
+NUMERIC_FIELDS = ('duration_seconds', 'cost', 'data_volume_mb', 'location_lat', 'location_lon')
+
+# Extra SELECT column holding end - start in seconds, computed by SQLite for
+# ISO-formatted times (julianday() yields NULL for anything else)
+COMPUTED_DURATION_COLUMN = "_duration_computed"
+
+async def insert_batch(db, records) -> int:
+    """Insert a batch unordered, logging rejected documents instead of aborting the migration"""
+    try:
+        result = await db.cdr_records.insert_many(records, ordered=False, bypass_document_validation=True)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        details = e.details
+        print(f"⚠️  {len(details.get('writeErrors', []))} records rejected in batch")
+        return details.get("nInserted", 0)
+
+# Exact (lower-cased) values resolved with one dict lookup; anything else falls back to a keyword scan
+CALL_TYPE_VALUES = {
+    "voice": CallType.VOICE, "call": CallType.VOICE,
+    "sms": CallType.SMS, "text": CallType.SMS,
+    "data": CallType.DATA, "internet": CallType.DATA
+}
+DIRECTION_VALUES = {
+    "incoming": CallDirection.INCOMING, "in": CallDirection.INCOMING, "received": CallDirection.INCOMING,
+    "outgoing": CallDirection.OUTGOING, "out": CallDirection.OUTGOING
+}
+STATUS_VALUES = {
+    "completed": CallStatus.COMPLETED, "failed": CallStatus.FAILED,
+    "missed": CallStatus.MISSED, "busy": CallStatus.BUSY
+}
 
 def normalize_call_type(value: str) -> CallType:
     """Normalize call type"""
@@ -40,6 +104,9 @@ def normalize_call_type(value: str) -> CallType:
         return CallType.VOICE
 
     value_lower = str(value).lower()
+    call_type = CALL_TYPE_VALUES.get(value_lower)
+    if call_type is not None:
+        return call_type
     if "sms" in value_lower or "text" in value_lower:
         return CallType.SMS
     elif "data" in value_lower or "internet" in value_lower:
@@ -52,7 +119,13 @@ def normalize_direction(value: str) -> CallDirection:
         return CallDirection.OUTGOING
 
     value_lower = str(value).lower()
-    if "incoming" in value_lower or "in" in value_lower or "received" in value_lower:
+    direction = DIRECTION_VALUES.get(value_lower)
+    if direction is not None:
+        return direction
+    # "out" is checked first: "outgoing"/"outbound" also contain the bare "in"
+    if "out" in value_lower:
+        return CallDirection.OUTGOING
+    if "in" in value_lower or "received" in value_lower:
         return CallDirection.INCOMING
     return CallDirection.OUTGOING
 
@@ -62,6 +135,9 @@ def normalize_status(value: str) -> CallStatus:
         return CallStatus.COMPLETED
 
     value_lower = str(value).lower()
+    status = STATUS_VALUES.get(value_lower)
+    if status is not None:
+        return status
     if "failed" in value_lower:
         return CallStatus.FAILED
     elif "missed" in value_lower:
@@ -70,11 +146,130 @@ def normalize_status(value: str) -> CallStatus:
         return CallStatus.BUSY
     return CallStatus.COMPLETED
 
+def _as_string(value) -> Optional[str]:
+    """Identifiers are stored as strings (integral floats lose their ".0")"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+def _parse_start_time(value):
+    """Parsed start time plus the call_id suffix derived from it, or (None, None)"""
+    start_time = parse_datetime(value)
+    if start_time is None:
+        return None, None
+    return start_time, "_" + str(start_time.timestamp())
+
+def _column_values(frame: pd.DataFrame, column: str) -> pd.Series:
+    """A SQLite column as an object Series, with NULL and '' both as None"""
+    series = frame[column].astype(object)
+    return series.where(series.notna() & (series != ''), None)
+
+def _map_distinct(series: pd.Series, func) -> list:
+    """Apply func once per distinct value in the chunk and broadcast the results to every row"""
+    lookup = {value: func(value) for value in series.unique()}
+    return [lookup[value] for value in series.tolist()]
+
+def _as_floats(series: pd.Series) -> list:
+    """Numeric coercion for a whole column; unparseable values become None"""
+    numbers = pd.to_numeric(series, errors="coerce")
+    return numbers.astype(object).where(numbers.notna(), None).tolist()
+
+def frame_to_documents(frame: pd.DataFrame, field_to_column: Dict[str, str], suspect_name: Optional[str] = None) -> List[dict]:
+    """Transform a chunk of SQLite rows into cdr_records documents, one column at a time"""
+    missing = pd.Series([None] * len(frame), index=frame.index, dtype=object)
+    columns = {field: _column_values(frame, column) for field, column in field_to_column.items()}
+
+    def column(field: str) -> pd.Series:
+        return columns.get(field, missing)
+
+    # Dates, enums and identifiers repeat heavily, so each distinct value is converted once
+    # call_id suffixes are derived alongside the parse, once per distinct start time
+    starts = _map_distinct(column('call_start_time'), _parse_start_time)
+    ends = _map_distinct(column('call_end_time'), parse_datetime)
+    call_types = _map_distinct(column('call_type'), lambda value: normalize_call_type(value).value)
+    directions = _map_distinct(column('direction'), lambda value: normalize_direction(value).value)
+    statuses = _map_distinct(column('call_status'), lambda value: normalize_status(value).value)
+    strings = {field: _map_distinct(column(field), _as_string) for field in STRING_FIELDS}
+    numbers = {field: _as_floats(column(field)) for field in NUMERIC_FIELDS}
+    computed_durations = _as_floats(
+        frame[COMPUTED_DURATION_COLUMN] if COMPUTED_DURATION_COLUMN in frame.columns else missing
+    )
+
+    documents = []
+    for idx, (start_time, call_id_suffix) in enumerate(starts):
+        calling = strings['calling_number'][idx]
+        called = strings['called_number'][idx]
+
+        # Validate required fields
+        if not calling or not called or not start_time:
+            continue
+
+        # Calculate duration if not present
+        duration = numbers['duration_seconds'][idx]
+        end_time = ends[idx]
+        if not duration and end_time:
+            duration = computed_durations[idx]
+            if duration is None:
+                # Times SQLite could not parse (e.g. slash dates)
+                try:
+                    duration = (end_time - start_time).total_seconds()
+                except TypeError:
+                    duration = None
+
+        # Build the document directly (rows are already normalized, so there is no
+        # Pydantic pass), deriving the time buckets CDRRecord would add and storing
+        # only populated fields, like CDRRecord.model_dump(exclude_none=True)
+        document = {
+            'call_id': calling + call_id_suffix,
+            'call_start_time': start_time,
+            'hour_of_day': start_time.hour,
+            'date_str': start_time.strftime("%Y-%m-%d"),
+            'call_type': call_types[idx],
+            'direction': directions[idx],
+            'call_status': statuses[idx],
+        }
+        for field in STRING_FIELDS:
+            if strings[field][idx] is not None:
+                document[field] = strings[field][idx]
+        for field in NUMERIC_FIELDS:
+            if numbers[field][idx] is not None:
+                document[field] = numbers[field][idx]
+        if end_time is not None:
+            document['call_end_time'] = end_time
+        if duration is not None:
+            document['duration_seconds'] = duration
+        if suspect_name:
+            document['suspect_name'] = suspect_name
+        documents.append(document)
+
+    return documents
+
+def chunk_to_documents(frame: pd.DataFrame, field_to_column: Dict[str, str], suspect_name: Optional[str] = None) -> List[dict]:
+    """frame_to_documents for a whole chunk, redone row by row if the chunk fails so one bad row only drops itself"""
+    try:
+        return frame_to_documents(frame, field_to_column, suspect_name)
+    except Exception as e:
+        print(f"⚠️  Error processing chunk, converting its rows one at a time: {e}")
+
+    documents = []
+    skipped = 0
+    for position in range(len(frame)):
+        try:
+            documents.extend(frame_to_documents(frame.iloc[position:position + 1], field_to_column, suspect_name))
+        except Exception:
+            skipped += 1
+    if skipped:
+        print(f"⚠️  Skipped {skipped} unconvertible rows")
+    return documents
+
 async def migrate_sqlite_to_mongodb(sqlite_path: str, suspect_name: Optional[str] = None):
     """Migrate CDR data from SQLite to MongoDB"""
 
     print(f"📂 Opening SQLite database: {sqlite_path}")
-    conn = sqlite3.connect(sqlite_path)
+    # Chunks are read from a worker thread (see produce below)
+    conn = sqlite3.connect(sqlite_path, check_same_thread=False)
     cursor = conn.cursor()
 
     # Get table name (assume 'cdr' or 'cdr_records')
@@ -101,10 +296,10 @@ async def migrate_sqlite_to_mongodb(sqlite_path: str, suspect_name: Optional[str
     columns = {row[1]: row[0] for row in cursor.fetchall()}
     print(f"📋 Columns: {list(columns.keys())}")
 
-    # Get all records
-    cursor.execute(f"SELECT * FROM {table_name}")
-    rows = cursor.fetchall()
-    print(f"📦 Found {len(rows)} records to migrate")
+    # Count up front for progress output; rows themselves are streamed in chunks below
+    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+    total_rows = cursor.fetchone()[0]
+    print(f"📦 Found {total_rows} records to migrate")
 
     # Get MongoDB database
     db = await get_database()
@@ -129,106 +324,70 @@ async def migrate_sqlite_to_mongodb(sqlite_path: str, suspect_name: Optional[str
         'sms_content': ['sms_content', 'message', 'text']
     }
 
-    def find_column(field_name):
-        """Find SQLite column name for a field"""
-        possible_names = column_mapping.get(field_name, [])
+    # Resolve each CDR field to the first of its candidate columns present in the table, once
+    field_to_column = {}
+    for field, possible_names in column_mapping.items():
         for name in possible_names:
             if name in columns:
-                return name
-        return None
+                field_to_column[field] = name
+                break
+
+    # Rows are read and transformed in a worker thread while earlier batches are
+    # being inserted; the bounded queue keeps at most a few batches in memory
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=MIGRATION_QUEUE_SIZE)
+
+    def put_batch(batch):
+        """Queue a batch from the worker thread, blocking while the queue is full"""
+        asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+
+    # Let SQLite work out call durations when both time columns are mapped
+    select_query = f"SELECT * FROM {table_name}"
+    if 'call_start_time' in field_to_column and 'call_end_time' in field_to_column:
+        start_col = field_to_column['call_start_time']
+        end_col = field_to_column['call_end_time']
+        select_query = (
+            f'SELECT *, ROUND((julianday("{end_col}") - julianday("{start_col}")) * 86400, 3) '
+            f'AS {COMPUTED_DURATION_COLUMN} FROM {table_name}'
+        )
+
+    def produce():
+        """Stream the table through the transform, one chunk per insert batch"""
+        try:
+            # dtype=object keeps SQLite integers intact in columns that also hold NULLs
+            chunks = pd.read_sql_query(
+                select_query, conn,
+                chunksize=MIGRATION_BATCH_SIZE, dtype=object
+            )
+            for chunk in chunks:
+                records = chunk_to_documents(chunk, field_to_column, suspect_name)
+                if records:
+                    put_batch(records)
+        finally:
+            # One stop marker per insert task
+            for _ in range(MIGRATION_INSERT_WORKERS):
+                put_batch(None)
 
-    # Process and insert records
-    records = []
     inserted = 0
 
-    for row in rows:
-        try:
-            # Create dictionary from row
-            row_dict = {col: row[idx] for col, idx in columns.items()}
-
-            # Map to CDR record
-            record_data = {}
-
-            # Map each field
-            for field, sqlite_col in [(k, find_column(k)) for k in column_mapping.keys()]:
-                if sqlite_col and sqlite_col in row_dict:
-                    value = row_dict[sqlite_col]
-                    if value is not None and value != '':
-                        record_data[field] = value
-
-            # Parse datetime fields
-            if 'call_start_time' in record_data:
-                record_data['call_start_time'] = parse_datetime(record_data['call_start_time'])
-            if 'call_end_time' in record_data:
-                record_data['call_end_time'] = parse_datetime(record_data['call_end_time'])
-
-            # Calculate duration if not present
-            if 'duration_seconds' not in record_data or not record_data['duration_seconds']:
-                if 'call_start_time' in record_data and 'call_end_time' in record_data:
-                    if record_data['call_start_time'] and record_data['call_end_time']:
-                        delta = record_data['call_end_time'] - record_data['call_start_time']
-                        record_data['duration_seconds'] = delta.total_seconds()
-
-            # Normalize enums
-            if 'call_type' in record_data:
-                record_data['call_type'] = normalize_call_type(record_data['call_type'])
-            else:
-                record_data['call_type'] = CallType.VOICE
-
-            if 'direction' in record_data:
-                record_data['direction'] = normalize_direction(record_data['direction'])
-            else:
-                record_data['direction'] = CallDirection.OUTGOING
-
-            if 'call_status' in record_data:
-                record_data['call_status'] = normalize_status(record_data['call_status'])
-            else:
-                record_data['call_status'] = CallStatus.COMPLETED
-
-            # Set suspect name
-            if suspect_name:
-                record_data['suspect_name'] = suspect_name
-
-            # Generate call_id if missing
-            if 'call_id' not in record_data or not record_data['call_id']:
-                calling = record_data.get('calling_number', 'unknown')
-                timestamp = record_data.get('call_start_time', datetime.now())
-                record_data['call_id'] = f"{calling}_{timestamp.timestamp()}"
-
-            # Convert numeric fields
-            for field in ['duration_seconds', 'cost', 'data_volume_mb', 'location_lat', 'location_lon']:
-                if field in record_data and record_data[field] is not None:
-                    try:
-                        record_data[field] = float(record_data[field])
-                    except:
-                        record_data[field] = None
-
-            # Validate required fields
-            if not record_data.get('calling_number') or not record_data.get('called_number'):
-                continue
-
-            if not record_data.get('call_start_time'):
-                continue
-
-            # Create CDR record
-            cdr_record = CDRRecord(**record_data)
-            records.append(cdr_record.dict())
-
-            # Insert in batches
-            if len(records) >= 1000:
-                await db.cdr_records.insert_many(records)
-                inserted += len(records)
-                print(f"✅ Inserted {inserted}/{len(rows)} records...")
-                records = []
-
-        except Exception as e:
-            print(f"⚠️  Error processing record: {e}")
-            continue
-
-    # Insert remaining records
-    if records:
-        await db.cdr_records.insert_many(records)
-        inserted += len(records)
+    async def consume():
+        """Insert queued batches until the stop marker arrives"""
+        nonlocal inserted
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            try:
+                count = await insert_batch(db, batch)
+                inserted += count
+                print(f"✅ Inserted {inserted}/{total_rows} records...")
+            except Exception as e:
+                print(f"⚠️  Error inserting batch: {e}")
+
+    await asyncio.gather(
+        asyncio.to_thread(produce),
+        *(consume() for _ in range(MIGRATION_INSERT_WORKERS))
+    )
 
     conn.close()
 
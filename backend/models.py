@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -34,6 +34,8 @@ class CDRRecord(BaseModel):
     call_type: CallType = CallType.VOICE  # incoming | outgoing | sms | data
     call_date: Optional[str] = None  # YYYY-MM-DD
     call_start_time: Optional[datetime] = None
+    hour_of_day: Optional[int] = None  # Derived from call_start_time for index-friendly hour filters
+    date_str: Optional[str] = None  # YYYY-MM-DD, derived from call_start_time for grouping by day
     call_end_time: Optional[datetime] = None
     call_duration_sec: Optional[float] = None
     duration_seconds: Optional[float] = None  # Legacy field
@@ -66,6 +68,15 @@ class CDRRecord(BaseModel):
     suspect_name: Optional[str] = None
     session_id: Optional[str] = None  # Primary identifier for each upload session
 
+    @model_validator(mode="after")
+    def _derive_time_buckets(self):
+        if self.call_start_time is not None:
+            if self.hour_of_day is None:
+                self.hour_of_day = self.call_start_time.hour
+            if self.date_str is None:
+                self.date_str = self.call_start_time.strftime("%Y-%m-%d")
+        return self
+
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
@@ -0,0 +1,17 @@
+"""
+Project directories shared by the API, the export modules and build scripts
+The uploads/exports directories are created in the API lifespan startup, not at import.
+"""
+
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Static frontend served by the API
+FRONTEND_DIR = os.path.join(BASE_DIR, "frontend")
+
+# Uploaded CDR files
+UPLOADS_DIR = os.path.join(BASE_DIR, "uploads")
+
+# Generated Excel/PDF reports
+EXPORTS_DIR = os.path.join(BASE_DIR, "exports")
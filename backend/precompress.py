@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Frontend pre-compression step
+Writes <file>.gz next to each text asset so the server can send it without
+compressing on every request. Run before starting the server (start.sh,
+Procfile and railway.json do); the server falls back to the plain file,
+compressed on the fly, for any asset without a fresh sidecar.
+"""
+
+import gzip
+import os
+from paths import FRONTEND_DIR
+
+# Text assets worth a sidecar
+PRECOMPRESS_EXTENSIONS = (".js", ".css", ".html", ".svg", ".json")
+
+def build_gzip_sidecars(directory: str) -> int:
+    """Write <file>.gz next to each text asset that is missing or stale; returns how many were written"""
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            source = os.path.join(root, name)
+            target = source + ".gz"
+            try:
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+                    continue
+                with open(source, "rb") as src, gzip.open(target, "wb", compresslevel=9) as dst:
+                    dst.write(src.read())
+                written += 1
+            except OSError as e:
+                print(f"Could not pre-compress {source}: {e}")
+    return written
+
+if __name__ == "__main__":
+    count = build_gzip_sidecars(FRONTEND_DIR)
+    print(f"✓ Pre-compressed {count} frontend assets")
@@ -1,10 +1,18 @@
-import random
+import numpy as np
 from datetime import datetime, timedelta
-from database import get_database
+from database import get_database, invalidate_latest_session
+from cache import invalidate_analytics_cache
 from models import CallType, CallDirection, CallStatus
-import json
-import os
+from typing import AsyncIterator
+import orjson
 import csv
+import io
+
+# Records per cursor batch and per yielded chunk of a streamed export
+EXPORT_BATCH_SIZE = 5000
+
+# Datetimes other than the call times fall through to str(), as in earlier exports
+_JSON_EXPORT_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME
 
 # Sample phone numbers by country
 SAMPLE_NUMBERS = {
@@ -39,183 +47,199 @@ SAMPLE_IMSIS = [
     "310150345678901"
 ]
 
+# Sample SMS bodies
+SMS_TEMPLATES = [
+    "Meeting at 3pm",
+    "Call me back",
+    "OTP: 123456",
+    "Payment received",
+    "See you soon"
+]
+
+# Numbers outside the frequent contacts: country picked uniformly, then one of its prefixes
+_SAMPLE_PREFIXES = [prefix for prefixes in SAMPLE_NUMBERS.values() for prefix in prefixes]
+_SAMPLE_PREFIX_WEIGHTS = [
+    1 / (len(SAMPLE_NUMBERS) * len(prefixes))
+    for prefixes in SAMPLE_NUMBERS.values() for _ in prefixes
+]
+
+CALL_TYPE_CHOICES = np.array([CallType.VOICE.value, CallType.SMS.value, CallType.DATA.value])
+CALL_TYPE_WEIGHTS = [0.7, 0.2, 0.1]
+
+def _random_numbers(rng: np.random.Generator, prefixes, size: int) -> np.ndarray:
+    """Phone numbers made of a random prefix and a 7-digit suffix"""
+    suffixes = rng.integers(1000000, 10000000, size).astype(str)
+    return np.char.add(np.asarray(prefixes, dtype=str), suffixes)
+
 async def generate_sample_data(suspect_name: str, record_count: int = 100) -> int:
     """Generate realistic sample CDR data"""
     db = await get_database()
 
-    records = []
+    # Every field is drawn as a whole array up front; records are only assembled at the end
+    rng = np.random.default_rng()
+    n = record_count
     base_time = datetime.now() - timedelta(days=30)
 
-    # Generate suspect's number
-    suspect_number = random.choice(SAMPLE_NUMBERS["US"]) + str(random.randint(1000000, 9999999))
-
-    # Generate frequent contacts
-    frequent_contacts = [
-        random.choice(SAMPLE_NUMBERS["US"]) + str(random.randint(1000000, 9999999))
-        for _ in range(5)
-    ]
-
-    for i in range(record_count):
-        # Random time within last 30 days
-        call_start = base_time + timedelta(
-            days=random.randint(0, 30),
-            hours=random.randint(0, 23),
-            minutes=random.randint(0, 59)
-        )
-
-        # Duration (seconds)
-        duration = random.randint(10, 3600)
-        call_end = call_start + timedelta(seconds=duration)
-
-        # Call type
-        call_type = random.choices(
-            [CallType.VOICE, CallType.SMS, CallType.DATA],
-            weights=[70, 20, 10]
-        )[0]
-
-        # Direction
-        direction = random.choice([CallDirection.INCOMING, CallDirection.OUTGOING])
-
-        # Numbers
-        if direction == CallDirection.OUTGOING:
-            calling_number = suspect_number
-            # 60% chance to call frequent contact
-            if random.random() < 0.6:
-                called_number = random.choice(frequent_contacts)
-            else:
-                called_number = random.choice(SAMPLE_NUMBERS[random.choice(list(SAMPLE_NUMBERS.keys()))]) + str(random.randint(1000000, 9999999))
-        else:
-            called_number = suspect_number
-            calling_number = random.choice(frequent_contacts) if random.random() < 0.5 else random.choice(SAMPLE_NUMBERS[random.choice(list(SAMPLE_NUMBERS.keys()))]) + str(random.randint(1000000, 9999999))
-
-        # Cell tower
-        tower = random.choice(SAMPLE_TOWERS)
-
-        # IMEI (sometimes same device, sometimes different)
-        imei = random.choice(SAMPLE_IMEIS) if random.random() < 0.8 else random.choice(SAMPLE_IMEIS)
-
-        # SMS content
-        sms_content = None
-        if call_type == CallType.SMS:
-            sms_templates = [
-                "Meeting at 3pm",
-                "Call me back",
-                "OTP: 123456",
-                "Payment received",
-                "See you soon"
-            ]
-            sms_content = random.choice(sms_templates)
-
-        # Data volume
-        data_volume = None
-        if call_type == CallType.DATA:
-            data_volume = random.uniform(0.1, 100.0)
-
-        record = {
-            "call_id": f"CDR_{suspect_name}_{i}_{int(call_start.timestamp())}",
+    # Generate suspect's number and frequent contacts
+    suspect_number = _random_numbers(rng, rng.choice(SAMPLE_NUMBERS["US"], 1), 1)[0]
+    frequent_contacts = _random_numbers(rng, rng.choice(SAMPLE_NUMBERS["US"], 5), 5)
+
+    # Random time within last 30 days (day, hour and minute granularity)
+    offsets = (
+        rng.integers(0, 31, n) * 86400
+        + rng.integers(0, 24, n) * 3600
+        + rng.integers(0, 60, n) * 60
+    )
+    durations = rng.integers(10, 3601, n)
+    base = np.datetime64(base_time, "us")
+    call_starts = (base + offsets.astype("timedelta64[s]")).tolist()
+    call_ends = (base + (offsets + durations).astype("timedelta64[s]")).tolist()
+    start_epochs = (int(base_time.timestamp()) + offsets).tolist()
+
+    call_types = rng.choice(CALL_TYPE_CHOICES, n, p=CALL_TYPE_WEIGHTS)
+    outgoing = rng.random(n) < 0.5
+    directions = np.where(outgoing, CallDirection.OUTGOING.value, CallDirection.INCOMING.value)
+
+    # Outgoing calls hit a frequent contact 60% of the time, incoming ones come from one 50% of the time
+    others = _random_numbers(rng, rng.choice(_SAMPLE_PREFIXES, n, p=_SAMPLE_PREFIX_WEIGHTS), n)
+    use_frequent = rng.random(n) < np.where(outgoing, 0.6, 0.5)
+    counterparts = np.where(use_frequent, rng.choice(frequent_contacts, n), others)
+    calling_numbers = np.where(outgoing, suspect_number, counterparts)
+    called_numbers = np.where(outgoing, counterparts, suspect_number)
+
+    # Cell tower, jittered around its position
+    tower_idx = rng.integers(0, len(SAMPLE_TOWERS), n)
+    tower_ids = np.array([tower["id"] for tower in SAMPLE_TOWERS])[tower_idx]
+    lats = np.array([tower["lat"] for tower in SAMPLE_TOWERS])[tower_idx] + rng.uniform(-0.01, 0.01, n)
+    lons = np.array([tower["lon"] for tower in SAMPLE_TOWERS])[tower_idx] + rng.uniform(-0.01, 0.01, n)
+
+    imeis = rng.choice(SAMPLE_IMEIS, n)
+    imsis = rng.choice(SAMPLE_IMSIS, n)
+    costs = rng.uniform(0.01, 5.0, n)
+
+    # SMS content and data volume only apply to their own call types
+    sms_contents = np.where(call_types == CallType.SMS.value, rng.choice(SMS_TEMPLATES, n), None)
+    data_volumes = np.where(call_types == CallType.DATA.value, rng.uniform(0.1, 100.0, n), None)
+
+    # tolist() hands back plain Python values that BSON can encode
+    call_id_prefix = f"CDR_{suspect_name}_"
+    records = [
+        {
+            "call_id": f"{call_id_prefix}{i}_{start_epoch}",
             "calling_number": calling_number,
             "called_number": called_number,
             "call_start_time": call_start,
+            "hour_of_day": call_start.hour,
+            "date_str": call_start.strftime("%Y-%m-%d"),
             "call_end_time": call_end,
             "duration_seconds": duration,
-            "call_type": call_type.value,
-            "direction": direction.value,
-            "cell_tower_id": tower["id"],
-            "location_lat": tower["lat"] + random.uniform(-0.01, 0.01),
-            "location_lon": tower["lon"] + random.uniform(-0.01, 0.01),
+            "call_type": call_type,
+            "direction": direction,
+            "cell_tower_id": tower_id,
+            "location_lat": lat,
+            "location_lon": lon,
             "imei": imei,
-            "imsi": random.choice(SAMPLE_IMSIS),
-            "cost": random.uniform(0.01, 5.0),
+            "imsi": imsi,
+            "cost": cost,
             "data_volume_mb": data_volume,
             "call_status": CallStatus.COMPLETED.value,
             "sms_content": sms_content,
             "suspect_name": suspect_name
         }
-
-        records.append(record)
+        for i, (
+            start_epoch, calling_number, called_number, call_start, call_end, duration,
+            call_type, direction, tower_id, lat, lon, imei, imsi, cost, data_volume, sms_content
+        ) in enumerate(zip(
+            start_epochs, calling_numbers.tolist(), called_numbers.tolist(), call_starts, call_ends,
+            durations.tolist(), call_types.tolist(), directions.tolist(), tower_ids.tolist(),
+            lats.tolist(), lons.tolist(), imeis.tolist(), imsis.tolist(), costs.tolist(),
+            data_volumes.tolist(), sms_contents.tolist()
+        ))
+    ]
 
     # Insert into database
     if records:
-        result = await db.cdr_records.insert_many(records)
+        result = await db.cdr_records.insert_many(records, ordered=False)
+        invalidate_latest_session()
+        invalidate_analytics_cache()
         return len(result.inserted_ids)
 
     return 0
 
-async def export_to_json(suspect_name: str) -> str:
-    """Export suspect data to JSON file"""
+async def suspect_has_records(suspect_name: str) -> bool:
+    """Whether the suspect has any records to export"""
     db = await get_database()
+    return await db.cdr_records.find_one({"suspect_name": suspect_name}, {"_id": 1}) is not None
 
-    # Get all records for suspect
-    cursor = db.cdr_records.find({"suspect_name": suspect_name})
-    records = await cursor.to_list(length=None)
-
-    # Convert ObjectId to string
-    for record in records:
+async def iter_json_export(suspect_name: str) -> AsyncIterator[bytes]:
+    """Stream a suspect's records as a JSON export document, one cursor batch at a time"""
+    db = await get_database()
+    record_count = await db.cdr_records.count_documents({"suspect_name": suspect_name})
+
+    header = orjson.dumps({
+        "suspect_name": suspect_name,
+        "export_date": datetime.now().isoformat(),
+        "record_count": record_count
+    }, option=orjson.OPT_INDENT_2)
+    # Reopen the header object and start the records array
+    yield header[:-2] + b',\n  "records": ['
+
+    cursor = db.cdr_records.find({"suspect_name": suspect_name}).batch_size(EXPORT_BATCH_SIZE)
+    chunk = []
+    first = True
+    async for record in cursor:
+        # Convert ObjectId to string
         record["_id"] = str(record["_id"])
         if isinstance(record.get("call_start_time"), datetime):
             record["call_start_time"] = record["call_start_time"].isoformat()
         if isinstance(record.get("call_end_time"), datetime):
             record["call_end_time"] = record["call_end_time"].isoformat()
 
-    # Create exports directory (use absolute path)
-    exports_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "exports")
-    os.makedirs(exports_dir, exist_ok=True)
-
-    # Save to file
-    filename = os.path.join(exports_dir, f"{suspect_name}_cdr_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-    with open(filename, "w") as f:
-        json.dump({
-            "suspect_name": suspect_name,
-            "export_date": datetime.now().isoformat(),
-            "record_count": len(records),
-            "records": records
-        }, f, indent=2, default=str)
+        encoded = orjson.dumps(record, default=str, option=_JSON_EXPORT_OPTIONS)
+        chunk.append((b"\n    " if first else b",\n    ") + encoded.replace(b"\n", b"\n    "))
+        first = False
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield b"".join(chunk)
+            chunk = []
 
-    return filename
+    chunk.append(b"]\n}" if first else b"\n  ]\n}")
+    yield b"".join(chunk)
 
-async def export_to_csv(suspect_name: str) -> str:
-    """Export suspect data to CSV file"""
+async def iter_csv_export(suspect_name: str) -> AsyncIterator[bytes]:
+    """Stream a suspect's records as CSV, one cursor batch at a time"""
     db = await get_database()
 
-    # Get all records for suspect
-    cursor = db.cdr_records.find({"suspect_name": suspect_name})
-    records = await cursor.to_list(length=None)
-
-    if not records:
-        raise ValueError(f"No records found for suspect: {suspect_name}")
-
-    # Create exports directory (use absolute path)
-    exports_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "exports")
-    os.makedirs(exports_dir, exist_ok=True)
-
-    # Save to CSV file
-    filename = os.path.join(exports_dir, f"{suspect_name}_cdr_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-
-    # Get all field names from records
-    fieldnames = set()
-    for record in records:
-        fieldnames.update(record.keys())
+    # Get all field names from records, collected server-side without transferring values
+    keys_pipeline = [
+        {"$match": {"suspect_name": suspect_name}},
+        {"$project": {"keys": {"$objectToArray": "$$ROOT"}}},
+        {"$unwind": "$keys"},
+        {"$group": {"_id": "$keys.k"}}
+    ]
+    fieldnames = await db.cdr_records.aggregate(keys_pipeline).to_list(length=None)
 
     # Remove MongoDB _id and convert to list
-    fieldnames = sorted([f for f in fieldnames if f != '_id'])
-
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for record in records:
-            # Convert ObjectId and datetime to strings
-            row = {}
-            for field in fieldnames:
-                value = record.get(field)
-                if value is None:
-                    row[field] = ''
-                elif isinstance(value, datetime):
-                    row[field] = value.isoformat()
-                elif hasattr(value, '__str__'):
-                    row[field] = str(value)
-                else:
-                    row[field] = value
-            writer.writerow(row)
-
-    return filename
+    fieldnames = sorted(f["_id"] for f in fieldnames if f["_id"] != '_id')
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fieldnames)
+
+    cursor = db.cdr_records.find(
+        {"suspect_name": suspect_name}, {"_id": 0}
+    ).batch_size(EXPORT_BATCH_SIZE)
+    rows = 0
+    async for record in cursor:
+        # csv.writer already writes None as '' and str()s other values; only datetimes need isoformat
+        writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in map(record.get, fieldnames)
+        ])
+
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
@@ -178,14 +178,14 @@ async function handleFiles(files) {
                     <div style="margin-bottom: 1rem; padding: 1.5rem; background: rgba(16, 185, 129, 0.1); border: 1px solid rgba(16, 185, 129, 0.3); border-radius: 12px; color: #10b981;">
                         <div style="display: flex; align-items: center; gap: 0.5rem; margin-bottom: 0.5rem;">
                             <span style="font-size: 1.5rem;">✓</span>
-                            <strong style="font-size: 1.1rem;">Upload & Analysis Complete!</strong>
+                            <strong style="font-size: 1.1rem;">Upload Complete!</strong>
                         </div>
                         <div style="margin-bottom: 0.5rem;">
                             <strong>${file.name}</strong>: ${result.message}
                             ${result.format_detected ? `<br><small>Format: ${result.format_detected.vendor || 'Unknown'}</small>` : ''}
                         </div>
                             <div style="margin-top: 1rem; padding-top: 1rem; border-top: 1px solid rgba(16, 185, 129, 0.2);">
-                            <p style="margin-bottom: 0.75rem; color: rgba(255, 255, 255, 0.9);">Analysis results are ready!</p>
+                            <p id="analysisStatus-${sessionId}" style="margin-bottom: 0.75rem; color: rgba(255, 255, 255, 0.9);">Analysis is being generated...</p>
                             <button class="btn btn-primary" onclick="showAnalysisResults('${sessionId}')" style="margin-right: 0.5rem;">
                                 View Analysis Results
                                 </button>
@@ -199,11 +199,11 @@ async function handleFiles(files) {
                 // Store session_id for later use
                 window.currentSessionId = sessionId;
 
-                // Auto-navigate to analysis view and load results
-                setTimeout(() => {
-                    navigateToSingleAnalysis();
-                    showAnalysisResults(sessionId);
-                }, 1000);
+                // The upload returns 202; results load when the analytics_ready event arrives
+                pendingAnalytics.add(sessionId);
+                if (analyticsEvents.has(sessionId)) {
+                    handleAnalyticsEvent(analyticsEvents.get(sessionId));
+                }
             } else {
                 resultsDiv.innerHTML += `<div style="color: #ef4444;">Error processing ${file.name}: ${result.message || result.detail || 'Unknown error'}</div>`;
             }
@@ -1681,6 +1681,37 @@ async function deleteGeofence(id) {
     }
 }
 
+// Sessions uploaded here whose background analytics have not reported back yet
+const pendingAnalytics = new Set();
+// Latest analytics event per session, kept in case it arrives before the upload response
+const analyticsEvents = new Map();
+
+function handleAnalyticsEvent(message) {
+    const sessionId = message.session_id;
+    analyticsEvents.set(sessionId, message);
+    if (!pendingAnalytics.has(sessionId)) {
+        return;
+    }
+    pendingAnalytics.delete(sessionId);
+
+    const statusEl = document.getElementById(`analysisStatus-${sessionId}`);
+    if (message.event === 'analytics_ready') {
+        if (statusEl) {
+            statusEl.textContent = 'Analysis results are ready!';
+        }
+        // Refresh the analysis view for the session the user uploaded last
+        if (sessionId === window.currentSessionId) {
+            navigateToSingleAnalysis();
+            showAnalysisResults(sessionId);
+        }
+    } else if (message.event === 'analytics_failed') {
+        if (statusEl) {
+            statusEl.textContent = `Analysis generation failed: ${message.error || 'Unknown error'}`;
+            statusEl.style.color = '#ef4444';
+        }
+    }
+}
+
 function setupWebSocket() {
     // Use the same protocol and host as the current page
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
@@ -1689,6 +1720,11 @@ function setupWebSocket() {
 
     socket.onmessage = function(event) {
         const alert = JSON.parse(event.data);
+        // Upload analytics notifications share this socket with geofence alerts
+        if (alert.event) {
+            handleAnalyticsEvent(alert);
+            return;
+        }
         const alertsDiv = document.getElementById('geofenceAlerts');
         const alertEl = document.createElement('div');
         alertEl.className = 'alert';
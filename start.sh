@@ -51,6 +51,10 @@ cleanup() {
 # Set up signal handlers for cleanup
 trap cleanup SIGINT SIGTERM
 
+# Pre-compress frontend assets so the server sends .gz sidecars as-is
+echo "🗜️  Pre-compressing frontend assets..."
+(cd backend && python precompress.py)
+
 # Start backend server
 echo "🌐 Starting FastAPI server..."
 
@@ -0,0 +1,28 @@
+import inspect
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import main
+
+
+def test_upload_does_not_expose_unacknowledged_writes():
+    parameters = inspect.signature(main.upload_cdr).parameters
+
+    assert "fast_insert" not in parameters
+    assert {"file", "suspect_name", "auto_detect"} <= set(parameters)
+
+
+@pytest.mark.parametrize("export_format", ["csv", "kml"])
+def test_export_for_unknown_suspect_is_json_404(monkeypatch, export_format):
+    from fastapi.testclient import TestClient
+
+    async def suspect_has_records(suspect_name):
+        return False
+
+    monkeypatch.setattr(main, "suspect_has_records", suspect_has_records)
+    response = TestClient(main.app).get("/api/export", params={"format": export_format, "suspect_name": "nobody"})
+
+    assert response.status_code == 404
+    assert response.json() == {"success": False, "error": "No records found for suspect: nobody"}
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+import cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    cache.invalidate_analytics_cache()
+    yield
+    cache.invalidate_analytics_cache()
+
+
+def make_counted():
+    calls = []
+
+    @cache.async_cached
+    async def view(session_id=None, suspect_name=None):
+        calls.append((session_id, suspect_name))
+        return {"session_id": session_id, "rows": [1, 2, 3]}
+
+    return view, calls
+
+
+def test_positional_and_keyword_calls_share_an_entry():
+    view, calls = make_counted()
+
+    asyncio.run(view("s1"))
+    asyncio.run(view(session_id="s1", suspect_name=None))
+
+    assert calls == [("s1", None)]
+
+
+def test_invalidate_drops_cached_results():
+    view, calls = make_counted()
+
+    asyncio.run(view("s1"))
+    cache.invalidate_analytics_cache()
+    asyncio.run(view("s1"))
+
+    assert len(calls) == 2
+
+
+def test_expired_entries_are_recomputed(monkeypatch):
+    view, calls = make_counted()
+    asyncio.run(view("s1"))
+
+    now = cache.time.monotonic()
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now + cache.ANALYTICS_CACHE_TTL_SECONDS + 1)
+    asyncio.run(view("s1"))
+
+    assert len(calls) == 2
+
+
+def test_callers_cannot_mutate_cached_results():
+    view, calls = make_counted()
+
+    first = asyncio.run(view("s1"))
+    first["rows"].append(4)
+    second = asyncio.run(view("s1"))
+    second["session_id"] = "changed"
+    third = asyncio.run(view("s1"))
+
+    assert len(calls) == 1
+    assert third == {"session_id": "s1", "rows": [1, 2, 3]}
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(cache, "ANALYTICS_CACHE_SIZE", 2)
+    view, calls = make_counted()
+
+    asyncio.run(view("s1"))
+    asyncio.run(view("s2"))
+    asyncio.run(view("s1"))
+    asyncio.run(view("s3"))
+    asyncio.run(view("s1"))
+    asyncio.run(view("s2"))
+
+    assert calls == [("s1", None), ("s2", None), ("s3", None), ("s2", None)]
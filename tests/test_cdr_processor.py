@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("motor")
+
+import cdr_processor
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-01-31 10:15:00", datetime(2024, 1, 31, 10, 15)),
+    ("2024-01-31T10:15:00", datetime(2024, 1, 31, 10, 15)),
+    ("2024-01-31 10:15:00.5", datetime(2024, 1, 31, 10, 15, 0, 500000)),
+    ("2024-01-31 10:15:00.123456", datetime(2024, 1, 31, 10, 15, 0, 123456)),
+    ("2024-01-31", datetime(2024, 1, 31)),
+    ("2024-1-5 9:05:00", datetime(2024, 1, 5, 9, 5)),
+    ("31/01/2024 10:15:00", datetime(2024, 1, 31, 10, 15)),
+    ("12/31/2024 10:15:00", datetime(2024, 12, 31, 10, 15)),
+    ("31-01-2024 10:15:00", datetime(2024, 1, 31, 10, 15)),
+    ("31/01/2024", datetime(2024, 1, 31)),
+    ("31-01-2024", datetime(2024, 1, 31)),
+    ("'2024-01-31 10:15:00'", datetime(2024, 1, 31, 10, 15)),
+    (pd.Timestamp("2024-01-31 10:15:00"), datetime(2024, 1, 31, 10, 15)),
+])
+def test_parse_datetime_accepts_supported_formats(value, expected):
+    parsed = cdr_processor.parse_datetime(value)
+
+    assert parsed == expected
+    assert parsed.tzinfo is None
+
+
+@pytest.mark.parametrize("value", [
+    None,
+    "",
+    float("nan"),
+    "20240131",
+    "2024-W05-3",
+    "2024-01-31T10:15",
+    "2024-01-31 10:15:00,5",
+    "2024-01-31T10:15:00.123",
+    "2024-01-31 10:15:00+05:30",
+    "2024-01-31T10:15:00Z",
+    "not a date",
+])
+def test_parse_datetime_rejects_other_values(value):
+    assert cdr_processor.parse_datetime(value) is None
@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("motor")
+
+import intelligence_analytics
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+
+class FakeRecords:
+    def __init__(self, rows):
+        self.rows = rows
+        self.pipelines = []
+
+    async def find_one(self, query):
+        return {"msisdn_a": "9876543210"}
+
+    def aggregate(self, pipeline, **kwargs):
+        self.pipelines.append(pipeline)
+        return FakeCursor(self.rows)
+
+
+class FakeDatabase:
+    def __init__(self, records):
+        self.cdr_records = records
+
+
+def test_colocation_windows_span_twice_the_window_minutes(monkeypatch):
+    records = FakeRecords([
+        {"_id": {"cell_id": "C1", "bucket": datetime(2024, 1, 1, 9, 30)}, "msisdns": ["9123456789"]},
+    ])
+
+    async def get_database():
+        return FakeDatabase(records)
+
+    monkeypatch.setattr(intelligence_analytics, "get_database", get_database)
+    result = asyncio.run(intelligence_analytics.generate_colocation_analysis.__wrapped__(
+        window_minutes=15, match_query={"session_id": "s1"}
+    ))
+
+    projection = next(stage["$project"] for stage in records.pipelines[0] if "$project" in stage)
+    assert projection["bucket"]["$dateTrunc"]["binSize"] == 30
+    assert len(result) == 1
+    assert result[0]["time_window"] == "±15 minutes"
+    assert sorted(result[0]["msisdns"]) == ["9123456789", "9876543210"]
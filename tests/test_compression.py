@@ -0,0 +1,100 @@
+import gzip
+
+import pytest
+
+pytest.importorskip("starlette")
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from compression import GZipMiddleware, accepts_encoding
+
+TEXT = b'{"value": "' + b"x" * 4096 + b'"}'
+
+
+async def json_endpoint(request):
+    return Response(TEXT, media_type="application/json")
+
+
+async def small_json_endpoint(request):
+    return Response(b'{"ok": true}', media_type="application/json")
+
+
+async def xlsx_endpoint(request):
+    return Response(b"PK" + b"\0" * 4096, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+
+async def encoded_endpoint(request):
+    return Response(gzip.compress(TEXT), media_type="application/javascript", headers={"Content-Encoding": "gzip"})
+
+
+async def streamed_csv_endpoint(request):
+    async def rows():
+        for idx in range(100):
+            yield f"{idx},value\n".encode()
+    return StreamingResponse(rows(), media_type="text/csv")
+
+
+app = Starlette(routes=[
+    Route("/json", json_endpoint),
+    Route("/small", small_json_endpoint),
+    Route("/xlsx", xlsx_endpoint),
+    Route("/encoded", encoded_endpoint),
+    Route("/csv", streamed_csv_endpoint),
+])
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+client = TestClient(app)
+
+
+def test_json_is_compressed():
+    response = client.get("/json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert response.content == TEXT
+
+
+def test_small_body_is_not_compressed():
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_binary_export_is_not_compressed():
+    response = client.get("/xlsx", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content.startswith(b"PK")
+
+
+def test_already_encoded_body_passes_through():
+    response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == TEXT
+
+
+def test_streamed_csv_is_compressed():
+    response = client.get("/csv", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text.splitlines()[99] == "99,value"
+
+
+def test_client_without_gzip_gets_identity():
+    response = client.get("/json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == TEXT
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("gzip, deflate, br", True),
+    ("GZIP;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, identity", False),
+    ("br", False),
+    ("x-gzip", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("", False),
+])
+def test_accepts_encoding_honours_q_values(header, expected):
+    assert accepts_encoding(header, "gzip") is expected
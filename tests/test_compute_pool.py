@@ -0,0 +1,38 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("phonenumbers")
+pytest.importorskip("motor")
+
+import analytics
+
+
+def count_records(records):
+    return len(records)
+
+
+def test_small_batches_run_in_process(monkeypatch):
+    def no_pool():
+        raise AssertionError("small batches must not start the worker pool")
+
+    monkeypatch.setattr(analytics, "_get_compute_pool", no_pool)
+    records = [{"called_number": "+14155550100"}] * analytics.COMPUTE_INLINE_MAX_RECORDS
+
+    assert asyncio.run(analytics._run_compute(count_records, records)) == len(records)
+
+
+def test_large_batches_use_the_worker_pool(monkeypatch):
+    pools = []
+
+    def thread_pool():
+        pools.append(ThreadPoolExecutor(max_workers=1))
+        return pools[-1]
+
+    monkeypatch.setattr(analytics, "_get_compute_pool", thread_pool)
+    records = [{}] * (analytics.COMPUTE_INLINE_MAX_RECORDS + 1)
+
+    assert asyncio.run(analytics._run_compute(count_records, records)) == len(records)
+    assert len(pools) == 1
+    pools[0].shutdown()
@@ -0,0 +1,48 @@
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+pytest.importorskip("motor")
+
+import excel_export
+
+MAX_IMEI_DATA = {
+    "max_imei": "351234567890123",
+    "max_imei_call_count": 42,
+    "total_imeis": 2,
+    "multi_device_usage": True,
+    "imei_ranking": [
+        {"imei": "351234567890123", "call_count": 42},
+        {"imei": "359876543210987", "call_count": 7},
+    ],
+}
+
+
+def write_sheet(name, data):
+    ws = openpyxl.Workbook().active
+    excel_export._write_sheet(ws, excel_export.SHEET_SPECS[name], data)
+    return ws
+
+
+def test_max_imei_sheet_layout():
+    ws = write_sheet("MaxIMEI", MAX_IMEI_DATA)
+
+    assert [list(row) for row in ws.iter_rows(values_only=True)] == [
+        ["IMEI Analysis", None],
+        [None, None],
+        ["Max IMEI", "351234567890123"],
+        ["Max IMEI Call Count", 42],
+        ["Total IMEIs", 2],
+        ["Multi-Device Usage", "Yes"],
+        [None, None],
+        ["IMEI Ranking", None],
+        ["IMEI", "Call Count"],
+        ["351234567890123", 42],
+        ["359876543210987", 7],
+    ]
+
+
+def test_max_imei_sheet_styles_the_ranking_header():
+    ws = write_sheet("MaxIMEI", MAX_IMEI_DATA)
+
+    assert all(cell.font.bold for cell in ws[9])
+    assert not any(cell.font.bold for cell in ws[7])
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("motor")
+
+import intelligence_analytics
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, length=None):
+        return self.rows
+
+
+class FakeRecords:
+    def __init__(self, timeline_rows, switch_rows):
+        self.timeline_rows = timeline_rows
+        self.switch_rows = switch_rows
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        stages = {stage_name for stage in pipeline for stage_name in stage}
+        return FakeCursor(self.switch_rows if "$setWindowFields" in stages else self.timeline_rows)
+
+
+class FakeDatabase:
+    def __init__(self, records):
+        self.cdr_records = records
+
+
+def run_timeline(monkeypatch, records):
+    async def get_database():
+        return FakeDatabase(records)
+
+    monkeypatch.setattr(intelligence_analytics, "get_database", get_database)
+    return asyncio.run(intelligence_analytics.generate_imei_timeline.__wrapped__(match_query={"session_id": "s1"}))
+
+
+def test_timeline_and_switches_run_as_separate_aggregations(monkeypatch):
+    records = FakeRecords(
+        timeline_rows=[
+            {"_id": "111", "dates": ["2024-01-01", "2024-01-02"], "call_counts": [3, 1], "first_seen": datetime(2024, 1, 1)},
+            {"_id": "222", "dates": ["2024-01-02"], "call_counts": [2], "first_seen": datetime(2024, 1, 2)},
+        ],
+        switch_rows=[
+            {"imei": "222", "previous_imei": "111", "call_start_time": datetime(2024, 1, 2, 9, 30), "cell_id": None},
+        ],
+    )
+
+    result = run_timeline(monkeypatch, records)
+
+    assert len(records.pipelines) == 2
+    assert all("$facet" not in stage for pipeline in records.pipelines for stage in pipeline)
+    assert result == {
+        "timeline": [
+            {"imei": "111", "dates": ["2024-01-01", "2024-01-02"], "call_counts": [3, 1]},
+            {"imei": "222", "dates": ["2024-01-02"], "call_counts": [2]},
+        ],
+        "switches": [
+            {"timestamp": "2024-01-02T09:30:00", "from_imei": "111", "to_imei": "222", "location": "Unknown"},
+        ],
+    }
+
+
+def test_timeline_without_imei_records_is_empty(monkeypatch):
+    result = run_timeline(monkeypatch, FakeRecords(timeline_rows=[], switch_rows=[]))
+
+    assert result == {"timeline": [], "switches": []}
@@ -0,0 +1,61 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("lxml")
+pytest.importorskip("motor")
+
+import kml_export
+
+
+class FakeCursor:
+    def __init__(self, records):
+        self.records = records
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self.records:
+            yield record
+
+
+class FakeRecords:
+    def __init__(self, records):
+        self.records = records
+        self.pipelines = []
+
+    def aggregate(self, pipeline, **kwargs):
+        self.pipelines.append(pipeline)
+        return FakeCursor(self.records)
+
+
+class FakeDatabase:
+    def __init__(self, records):
+        self.cdr_records = FakeRecords(records)
+
+
+def test_located_calls_keep_their_position_in_the_full_call_order(monkeypatch):
+    # Calls 1, 3 and 4 have no coordinates and are filtered out by the server
+    db = FakeDatabase([
+        {"_id": 2, "call_number": 2, "location_lat": 28.61, "location_lon": 77.20,
+         "call_start_time": datetime(2024, 1, 1, 9, 0)},
+        {"_id": 5, "call_number": 5, "location_lat": 28.70, "location_lon": 77.10,
+         "call_start_time": datetime(2024, 1, 1, 10, 0)},
+    ])
+
+    async def get_database():
+        return db
+
+    async def export():
+        return b"".join([chunk async for chunk in kml_export.iter_kml_bytes("alice", lookup_coordinates=False)])
+
+    monkeypatch.setattr(kml_export, "get_database", get_database)
+    kml = asyncio.run(export()).decode()
+
+    assert "<name>Call 2</name>" in kml
+    assert "<name>Call 5</name>" in kml
+    assert "<name>Call 1</name>" not in kml
+    stages = db.cdr_records.pipelines[0]
+    assert [next(iter(stage)) for stage in stages] == ["$match", "$setWindowFields", "$match", "$project"]
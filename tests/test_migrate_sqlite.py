@@ -0,0 +1,123 @@
+from datetime import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("motor")
+
+import migrate_sqlite
+
+FIELD_TO_COLUMN = {
+    "calling_number": "caller",
+    "called_number": "callee",
+    "call_start_time": "start_time",
+    "direction": "direction",
+    "duration_seconds": "duration",
+}
+
+
+def make_frame(rows):
+    return pd.DataFrame(rows, columns=["caller", "callee", "start_time", "direction", "duration"], dtype=object)
+
+
+def test_frame_to_documents_builds_normalized_documents():
+    frame = make_frame([
+        ["9876543210", 9123456789, "2024-01-31 10:15:00", "IN", "60"],
+        [None, "9123456789", "2024-01-31 11:00:00", "out", 5],
+    ])
+
+    documents = migrate_sqlite.frame_to_documents(frame, FIELD_TO_COLUMN, "alice")
+
+    assert documents == [{
+        "call_id": "9876543210_" + str(datetime(2024, 1, 31, 10, 15).timestamp()),
+        "call_start_time": datetime(2024, 1, 31, 10, 15),
+        "hour_of_day": 10,
+        "date_str": "2024-01-31",
+        "call_type": "voice",
+        "direction": "incoming",
+        "call_status": "completed",
+        "calling_number": "9876543210",
+        "called_number": "9123456789",
+        "duration_seconds": 60.0,
+        "suspect_name": "alice",
+    }]
+
+
+def test_chunk_with_a_bad_row_keeps_the_good_rows(monkeypatch):
+    normalize_direction = migrate_sqlite.normalize_direction
+
+    def failing_direction(value):
+        if value == "corrupt":
+            raise ValueError("unreadable direction")
+        return normalize_direction(value)
+
+    monkeypatch.setattr(migrate_sqlite, "normalize_direction", failing_direction)
+    frame = make_frame([
+        ["9876543210", "9123456789", "2024-01-31 10:15:00", "in", 60],
+        ["9876543211", "9123456789", "2024-01-31 10:20:00", "corrupt", 60],
+        ["9876543212", "9123456789", "2024-01-31 10:25:00", "out", 60],
+    ])
+
+    with pytest.raises(ValueError):
+        migrate_sqlite.frame_to_documents(frame, FIELD_TO_COLUMN)
+    documents = migrate_sqlite.chunk_to_documents(frame, FIELD_TO_COLUMN)
+
+    assert [document["calling_number"] for document in documents] == ["9876543210", "9876543212"]
+    assert [document["direction"] for document in documents] == ["incoming", "outgoing"]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-01-31 10:15:00", datetime(2024, 1, 31, 10, 15)),
+    ("2024-01-31T10:15:00", datetime(2024, 1, 31, 10, 15)),
+    ("2024-01-31 10:15:00.5", datetime(2024, 1, 31, 10, 15, 0, 500000)),
+    ("2024-01-31 10:15:00.123456", datetime(2024, 1, 31, 10, 15, 0, 123456)),
+    ("2024-1-5 9:05:00", datetime(2024, 1, 5, 9, 5)),
+    ("31/01/2024 10:15:00", datetime(2024, 1, 31, 10, 15)),
+    ("01/02/2024 10:15:00", datetime(2024, 2, 1, 10, 15)),
+    ("12/31/2024 10:15:00", datetime(2024, 12, 31, 10, 15)),
+    ("1/2/2024 3:04:05", datetime(2024, 2, 1, 3, 4, 5)),
+])
+def test_parse_datetime_accepts_supported_formats(value, expected):
+    parsed = migrate_sqlite.parse_datetime(value)
+
+    assert parsed == expected
+    assert parsed.tzinfo is None
+
+
+@pytest.mark.parametrize("value", [
+    None,
+    1706696100,
+    "",
+    "2024-01-31",
+    "2024-01-31T10:15",
+    "2024-01-31 10:15:00+05:30",
+    "2024-01-31T10:15:00Z",
+    "2024-01-31 10:15:00.12Z",
+    "2024-01-31T10:15:00.123",
+    "2024-01-31 10:15:00,123",
+    "2024-01-31 24:00:00",
+    "31-01-2024 10:15:00",
+    "not a date",
+])
+def test_parse_datetime_rejects_other_values(value):
+    assert migrate_sqlite.parse_datetime(value) is None
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("outgoing", "outgoing"),
+    ("OUT", "outgoing"),
+    ("incoming", "incoming"),
+    ("in", "incoming"),
+    ("received", "incoming"),
+    ("Outgoing Call", "outgoing"),
+    ("outbound", "outgoing"),
+    ("MO-Outgoing", "outgoing"),
+    ("Incoming Call", "incoming"),
+    ("inbound", "incoming"),
+    ("Call Received", "incoming"),
+    ("", "outgoing"),
+    (None, "outgoing"),
+    ("unknown", "outgoing"),
+])
+def test_normalize_direction_agrees_for_exact_and_free_text_values(value, expected):
+    assert migrate_sqlite.normalize_direction(value).value == expected
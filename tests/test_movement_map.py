@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("motor")
+
+import intelligence_analytics
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, length=None):
+        return self.rows
+
+
+class FakeRecords:
+    def __init__(self, marker_rows, path_rows):
+        self.marker_rows = marker_rows
+        self.path_rows = path_rows
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        stages = {stage_name for stage in pipeline for stage_name in stage}
+        return FakeCursor(self.path_rows if "$setWindowFields" in stages else self.marker_rows)
+
+
+class FakeDatabase:
+    def __init__(self, records):
+        self.cdr_records = records
+
+
+MARKER_ROWS = [
+    {"_id": "C1", "lat": 28.61, "lon": 77.20, "call_start_time": datetime(2024, 1, 1, 9, 0)},
+]
+PATH_ROWS = [
+    {"_id": "2024-01-01", "coordinates": [[77.20, 28.61], [77.10, 28.70]], "first_seen": datetime(2024, 1, 1, 9, 0)},
+    {"_id": "2024-01-02", "coordinates": [[77.10, 28.70]], "first_seen": datetime(2024, 1, 2, 9, 0)},
+]
+
+
+def run_movement_map(monkeypatch, records, layer):
+    async def get_database():
+        return FakeDatabase(records)
+
+    monkeypatch.setattr(intelligence_analytics, "get_database", get_database)
+    return asyncio.run(intelligence_analytics.generate_movement_map.__wrapped__(layer=layer, match_query={"session_id": "s1"}))
+
+
+def test_markers_and_paths_run_as_separate_aggregations(monkeypatch):
+    records = FakeRecords(MARKER_ROWS, PATH_ROWS)
+
+    result = run_movement_map(monkeypatch, records, "day")
+
+    assert len(records.pipelines) == 2
+    assert all("$facet" not in stage for pipeline in records.pipelines for stage in pipeline)
+    assert result == {
+        "paths": [{"coordinates": [[77.20, 28.61], [77.10, 28.70]], "color": "#6366f1", "label": "2024-01-01"}],
+        "markers": [{
+            "coordinates": [77.20, 28.61],
+            "color": "#ec4899",
+            "title": "Cell: C1",
+            "description": "Time: 2024-01-01 09:00:00",
+        }],
+    }
+
+
+def test_day_paths_are_keyed_on_a_projected_date(monkeypatch):
+    records = FakeRecords(MARKER_ROWS, PATH_ROWS)
+    run_movement_map(monkeypatch, records, "day")
+
+    paths_pipeline = next(pipeline for pipeline in records.pipelines if any("$setWindowFields" in stage for stage in pipeline))
+    projection = next(stage["$project"] for stage in paths_pipeline if "$project" in stage)
+
+    assert "date_str" in projection
+
+
+def test_unknown_layer_only_fetches_markers(monkeypatch):
+    records = FakeRecords(MARKER_ROWS, PATH_ROWS)
+
+    result = run_movement_map(monkeypatch, records, "none")
+
+    assert len(records.pipelines) == 1
+    assert result["paths"] == []
+    assert len(result["markers"]) == 1
@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("motor")
+
+import utils
+
+
+class FakeInsertResult:
+    def __init__(self, count):
+        self.inserted_ids = list(range(count))
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.documents.extend(documents)
+        return FakeInsertResult(len(documents))
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.cdr_records = FakeCollection()
+
+
+@pytest.fixture
+def generated(monkeypatch):
+    db = FakeDatabase()
+
+    async def get_database():
+        return db
+
+    monkeypatch.setattr(utils, "get_database", get_database)
+    monkeypatch.setattr(utils, "invalidate_latest_session", lambda: None)
+    monkeypatch.setattr(utils, "invalidate_analytics_cache", lambda: None)
+    before = datetime.now()
+    inserted = asyncio.run(utils.generate_sample_data("alice", 2000))
+    return inserted, db.cdr_records.documents, before
+
+
+def test_templates_include_service_messages():
+    assert utils.SMS_TEMPLATES == [
+        "Meeting at 3pm",
+        "Call me back",
+        "OTP: 123456",
+        "Payment received",
+        "See you soon"
+    ]
+
+
+def test_record_count_and_native_types(generated):
+    inserted, documents, _ = generated
+    assert inserted == len(documents) == 2000
+    native = (str, int, float, datetime, type(None))
+    for document in documents[:50]:
+        for key, value in document.items():
+            assert type(value) in native, (key, type(value))
+
+
+def test_field_consistency(generated):
+    _, documents, before = generated
+    base_time = before - timedelta(days=30)
+    suspect_numbers = set()
+    for document in documents:
+        start, end = document["call_start_time"], document["call_end_time"]
+        assert base_time - timedelta(seconds=1) <= start <= before + timedelta(days=1)
+        assert 10 <= document["duration_seconds"] <= 3600
+        assert end - start == timedelta(seconds=document["duration_seconds"])
+        assert document["hour_of_day"] == start.hour
+        assert document["date_str"] == start.strftime("%Y-%m-%d")
+        assert document["call_id"].startswith("CDR_alice_")
+
+        suspect_number = document["calling_number"] if document["direction"] == "outgoing" else document["called_number"]
+        suspect_numbers.add(suspect_number)
+
+        if document["call_type"] == "sms":
+            assert document["sms_content"] in utils.SMS_TEMPLATES
+        else:
+            assert document["sms_content"] is None
+        if document["call_type"] == "data":
+            assert 0.1 <= document["data_volume_mb"] <= 100.0
+        else:
+            assert document["data_volume_mb"] is None
+
+    # One suspect number on the suspect's side of every call
+    assert len(suspect_numbers) == 1
+
+
+def test_call_type_mix(generated):
+    _, documents, _ = generated
+    counts = {call_type: 0 for call_type in ("voice", "sms", "data")}
+    for document in documents:
+        counts[document["call_type"]] += 1
+    assert counts["voice"] > counts["sms"] > counts["data"] > 0
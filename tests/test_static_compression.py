@@ -0,0 +1,117 @@
+import gzip
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+
+import main
+import precompress
+from compression import GZipMiddleware
+
+
+@pytest.fixture(scope="module")
+def client():
+    # No lifespan: static serving needs neither MongoDB nor the HTTP client
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def assets(tmp_path):
+    (tmp_path / "app.js").write_bytes(b"console.log('cdr');\n" * 200)
+    (tmp_path / "styles.css").write_bytes(b"body { margin: 0; }\n" * 200)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG" + b"\x00" * 100)
+    return tmp_path
+
+
+@pytest.fixture
+def sidecar_client(assets):
+    precompress.build_gzip_sidecars(str(assets))
+    app = Starlette()
+    app.mount("/", main.PrecompressedStaticFiles(directory=str(assets)))
+    return TestClient(GZipMiddleware(app))
+
+
+def _read_frontend(name):
+    with open(os.path.join(main.FRONTEND_DIR, name), "rb") as f:
+        return f.read()
+
+
+def test_importing_main_writes_nothing_to_the_frontend():
+    before = {name: os.path.getmtime(os.path.join(main.FRONTEND_DIR, name)) for name in os.listdir(main.FRONTEND_DIR)}
+    subprocess.run([sys.executable, "-c", "import main"], cwd=os.path.dirname(main.__file__), check=True, capture_output=True)
+    after = {name: os.path.getmtime(os.path.join(main.FRONTEND_DIR, name)) for name in os.listdir(main.FRONTEND_DIR)}
+
+    assert after == before
+
+
+def test_build_gzip_sidecars_only_text_assets(assets):
+    assert precompress.build_gzip_sidecars(str(assets)) == 2
+    assert sorted(name for name in os.listdir(assets) if name.endswith(".gz")) == ["app.js.gz", "styles.css.gz"]
+    assert gzip.decompress((assets / "app.js.gz").read_bytes()) == (assets / "app.js").read_bytes()
+    # Fresh sidecars are left alone
+    assert precompress.build_gzip_sidecars(str(assets)) == 0
+
+
+@pytest.mark.parametrize("name", ["app.js", "styles.css"])
+def test_gzip_sidecar_is_not_compressed_twice(sidecar_client, assets, name):
+    response = sidecar_client.get(f"/{name}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    # httpx undoes one layer of gzip; a doubly compressed body would not match
+    assert response.content == (assets / name).read_bytes()
+
+
+def test_refused_gzip_gets_plain_file(sidecar_client, assets):
+    response = sidecar_client.get("/app.js", headers={"Accept-Encoding": "gzip;q=0, identity"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.content == (assets / "app.js").read_bytes()
+
+
+def test_frontend_asset_without_sidecar_is_compressed_on_the_fly(client):
+    response = client.get("/app.js", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == _read_frontend("app.js")
+
+
+def test_static_mount_serves_frontend(client):
+    response = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.content == _read_frontend("app.js")
+
+
+def test_identity_request_gets_plain_file(client):
+    response = client.get("/app.js", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.content == _read_frontend("app.js")
+
+
+def test_stale_sidecar_is_ignored(tmp_path):
+    source = tmp_path / "bundle.js"
+    source.write_bytes(b"console.log('new');" * 100)
+    sidecar = tmp_path / "bundle.js.gz"
+    sidecar.write_bytes(gzip.compress(b"console.log('old');"))
+    os.utime(sidecar, (0, 0))
+
+    response = main._precompressed_file_response(str(source), "gzip")
+    assert response.path == str(source)
+    assert "content-encoding" not in response.headers
+
+
+def test_unknown_route_falls_back_to_index(client):
+    response = client.get("/some/client/route")
+    assert response.status_code == 200
+    assert response.content == main.FRONTEND_INDEX_BYTES
+
+
+def test_unknown_api_route_is_json_404(client):
+    response = client.get("/api/does-not-exist")
+    assert response.status_code == 404
+    assert response.json()["success"] is False
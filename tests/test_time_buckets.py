@@ -0,0 +1,134 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("motor")
+
+import cdr_processor
+import database
+from models import CDRRecord
+
+
+def test_cdr_record_derives_time_buckets():
+    record = CDRRecord(call_start_time=datetime(2024, 3, 9, 23, 45, 10))
+
+    assert record.hour_of_day == 23
+    assert record.date_str == "2024-03-09"
+
+
+def test_cdr_record_keeps_explicit_time_buckets():
+    record = CDRRecord(call_start_time=datetime(2024, 3, 9, 23, 45), hour_of_day=5, date_str="2024-01-01")
+
+    assert record.hour_of_day == 5
+    assert record.date_str == "2024-01-01"
+
+
+def test_cdr_record_without_start_time_has_no_time_buckets():
+    record = CDRRecord()
+
+    assert record.hour_of_day is None
+    assert record.date_str is None
+
+
+class FakeRecords:
+    def __init__(self):
+        self.updates = []
+
+    async def update_many(self, query, update):
+        self.updates.append((query, update))
+
+
+class FakeMigrations:
+    def __init__(self):
+        self.applied = {}
+
+    async def distinct(self, field):
+        return list(self.applied)
+
+    async def update_one(self, query, update, upsert=False):
+        self.applied[query["_id"]] = update["$set"]
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.cdr_records = FakeRecords()
+        self.migrations = FakeMigrations()
+
+
+def test_data_migrations_run_once():
+    db = FakeDatabase()
+
+    asyncio.run(database.apply_data_migrations(db))
+    asyncio.run(database.apply_data_migrations(db))
+
+    assert len(db.cdr_records.updates) == 1
+    assert set(db.migrations.applied) == {name for name, _ in database.DATA_MIGRATIONS}
+
+
+
+def test_create_indexes_does_not_write_records():
+    writes = []
+
+    class IndexOnlyCollection:
+        async def create_index(self, *args, **kwargs):
+            return "index"
+
+        async def update_many(self, *args, **kwargs):
+            writes.append(args)
+
+    class IndexOnlyDatabase:
+        def __getattr__(self, name):
+            return IndexOnlyCollection()
+
+    asyncio.run(database.create_indexes(IndexOnlyDatabase()))
+
+    assert writes == []
+
+
+class FakeInsertResult:
+    def __init__(self, documents):
+        self.inserted_ids = [index for index, _ in enumerate(documents)]
+
+
+class FakeIngestCollection:
+    def __init__(self):
+        self.documents = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.documents.extend(documents)
+        return FakeInsertResult(documents)
+
+    async def update_one(self, *args, **kwargs):
+        return None
+
+
+class FakeIngestDatabase:
+    def __init__(self):
+        self.cdr_records = FakeIngestCollection()
+        self.sessions = FakeIngestCollection()
+
+
+def test_json_ingest_stores_time_buckets(monkeypatch, tmp_path):
+    db = FakeIngestDatabase()
+
+    async def get_database():
+        return db
+
+    monkeypatch.setattr(cdr_processor, "get_database", get_database)
+    monkeypatch.setattr(cdr_processor, "invalidate_latest_session", lambda: None)
+    monkeypatch.setattr(cdr_processor, "invalidate_analytics_cache", lambda: None)
+    path = tmp_path / "calls.json"
+    path.write_text(json.dumps([
+        {"calling_number": "9876543210", "called_number": "9123456789", "call_start_time": "2024-01-31 22:45:00"},
+        {"calling_number": "9876543210", "called_number": "9123456780", "call_start_time": "2024-02-01 00:05:00"},
+    ]))
+
+    result = asyncio.run(cdr_processor.process_json_file(str(path), "alice"))
+
+    assert result["records_inserted"] == 2
+    assert [(document["hour_of_day"], document["date_str"]) for document in db.cdr_records.documents] == [
+        (22, "2024-01-31"),
+        (0, "2024-02-01"),
+    ]